@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from database.database import get_db
+from database.database import get_db, get_pool_stats, engine, async_engine
 from models import AdminConfig, Tournament
 from schemas.admin import AdminLogin, AdminToken
 from schemas.tournament import TournamentCreate, ScheduleGenerated
@@ -9,6 +9,14 @@ from schemas.match import WinnerUpdate
 from services.auth import verify_password, create_access_token, verify_token
 from services.tournament_service import TournamentService
 from services.match_service import MatchService
+from services.live_match_store import live_matches
+from services.player_cache import player_views
+from services.state_version import state_versions
+from services.response_cache import response_cache
+from services.change_feed import change_feed
+from services.broadcast_bus import bus
+from services.health_buffer import health_buffer
+from api.websockets import manager as websocket_manager
 from datetime import datetime, timedelta
 import os
 
@@ -101,7 +109,7 @@ async def advance_round(
         
         # Broadcast round change to dashboard
         from api.websockets import broadcast_round_complete
-        await broadcast_round_complete(result["current_round"])
+        await broadcast_round_complete(result["current_round"], tournament_id)
         
         return result
     except ValueError as e:
@@ -176,8 +184,28 @@ def delete_tournament(
     # SQLAlchemy will cascade delete all related data (players, rounds, matches, events)
     db.delete(tournament)
     db.commit()
+    player_views.invalidate(tournament_id)
+    live_matches.discard_tournament(tournament_id)
+    health_buffer.discard_tournament(tournament_id)
+    state_versions.bump(tournament_id, summary=True)
+    response_cache.discard(lambda key: tournament_id in key[1:])
+    change_feed.discard(tournament_id)
     
     return {
         "message": f"Tournament '{tournament_name}' deleted successfully",
         "tournament_id": tournament_id
     }
+
+
+@router.get("/metrics")
+def get_metrics(_admin: dict = Depends(get_current_admin)):
+    """Runtime performance counters."""
+    return {
+        "response_cache": response_cache.stats(),
+        "websockets": websocket_manager.stats(),
+        "broadcast_bus": bus.stats(),
+        "health_write_behind": health_buffer.stats(),
+        "live_matches": live_matches.stats(),
+        "database_pool": get_pool_stats(engine),
+        "async_database_pool": get_pool_stats(async_engine.sync_engine if async_engine else None)
+    }
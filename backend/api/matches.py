@@ -1,9 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from database.database import get_db
-from models import Match, Player, Tournament
-from schemas.match import MatchJoin, MatchHealthUpdate, MatchDefeat, MatchResponse, MatchResult
+from database.database import get_db, get_live_db
+from models import Match
+from schemas.match import MatchJoin, MatchHealthUpdate, MatchHealthBatch, MatchDefeat, MatchResponse, MatchResult
 from services.match_service import MatchService
+from services.live_match_store import live_matches
+from typing import Union
 
 router = APIRouter(prefix="/api/matches", tags=["matches"])
 
@@ -14,27 +17,17 @@ def get_match_state(
     player_id: int,
     db: Session = Depends(get_db)
 ):
-    """Get current match state for a player."""
-    match = db.query(Match).filter(Match.id == match_id).first()
-    if not match:
-        raise HTTPException(status_code=404, detail="Match not found")
-
-    if player_id not in [match.player1_id, match.player2_id]:
-        raise HTTPException(status_code=400, detail="Player not in this match")
-
-    opponent_id = match.player2_id if match.player1_id == player_id else match.player1_id
-    opponent = db.query(Player).filter(Player.id == opponent_id).first()
-
-    your_health = match.player1_health if match.player1_id == player_id else match.player2_health
-    opponent_health = match.player2_health if match.player1_id == player_id else match.player1_health
+    """Get current match state for a player.
 
-    return {
-        "match_id": match.id,
-        "your_health": your_health,
-        "opponent_health": opponent_health,
-        "opponent_name": opponent.name,
-        "status": match.status
-    }
+    Served from the live match store; only a miss touches the database.
+    """
+    try:
+        state = live_matches.get_state(db, match_id, player_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if state is None:
+        raise HTTPException(status_code=404, detail="Match not found")
+    return state
 
 
 @router.post("/{match_id}/join", response_model=MatchResponse)
@@ -58,20 +51,7 @@ def join_match(
 
     try:
         updated_match = MatchService.join_match(db, match_id, join_data.player_id, starting_life)
-
-        opponent_id = updated_match.player2_id if updated_match.player1_id == join_data.player_id else updated_match.player1_id
-        opponent = db.query(Player).filter(Player.id == opponent_id).first()
-
-        your_health = updated_match.player1_health if updated_match.player1_id == join_data.player_id else updated_match.player2_health
-        opponent_health = updated_match.player2_health if updated_match.player1_id == join_data.player_id else updated_match.player1_health
-
-        return {
-            "match_id": updated_match.id,
-            "your_health": your_health,
-            "opponent_health": opponent_health,
-            "opponent_name": opponent.name,
-            "status": updated_match.status
-        }
+        return live_matches.get_state(db, updated_match.id, join_data.player_id)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -80,19 +60,56 @@ def join_match(
 async def update_health(
     match_id: int,
     health_data: MatchHealthUpdate,
-    db: Session = Depends(get_db)
+    db: Union[Session, AsyncSession] = Depends(get_live_db)
 ):
     """Update player health."""
     try:
-        result = MatchService.update_health(
-            db,
-            match_id,
-            health_data.player_id,
-            health_data.health_change
-        )
+        if isinstance(db, AsyncSession):
+            result = await MatchService.update_health_async(
+                db,
+                match_id,
+                health_data.player_id,
+                health_data.health_change
+            )
+        else:
+            result = MatchService.update_health(
+                db,
+                match_id,
+                health_data.player_id,
+                health_data.health_change
+            )
+        tournament_id = result.pop('tournament_id')
         # Broadcast health update to dashboard via WebSocket
         from api.websockets import broadcast_health_update
-        await broadcast_health_update(match_id, health_data.player_id, result['new_health'])
+        await broadcast_health_update(match_id, health_data.player_id, result['new_health'], tournament_id)
+        return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/{match_id}/health/batch")
+async def update_health_batch(
+    match_id: int,
+    batch: MatchHealthBatch,
+    db: Union[Session, AsyncSession] = Depends(get_live_db)
+):
+    """Apply a player's buffered health taps in one transaction.
+
+    Taps carry increasing client sequence numbers; ones already applied are
+    skipped, so a client can resend a batch whose response it never got.
+    Returns the new health and the last applied seq.
+    """
+    changes = [(delta.seq, delta.health_change) for delta in batch.deltas]
+    try:
+        if isinstance(db, AsyncSession):
+            result = await MatchService.update_health_batch_async(db, match_id, batch.player_id, changes)
+        else:
+            result = MatchService.update_health_batch(db, match_id, batch.player_id, changes)
+        tournament_id = result.pop('tournament_id')
+        # One broadcast for the whole batch; a replay changed nothing
+        if result['applied']:
+            from api.websockets import broadcast_health_update
+            await broadcast_health_update(match_id, batch.player_id, result['new_health'], tournament_id)
         return result
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -102,19 +119,23 @@ async def update_health(
 async def confirm_defeat(
     match_id: int,
     defeat_data: MatchDefeat,
-    db: Session = Depends(get_db)
+    db: Union[Session, AsyncSession] = Depends(get_live_db)
 ):
     """Player confirms defeat."""
     try:
-        result = MatchService.confirm_defeat(db, match_id, defeat_data.player_id)
+        if isinstance(db, AsyncSession):
+            result = await MatchService.confirm_defeat_async(db, match_id, defeat_data.player_id)
+        else:
+            result = MatchService.confirm_defeat(db, match_id, defeat_data.player_id)
+        tournament_id = result.pop('tournament_id')
         # Broadcast match completion to all connected clients
         from api.websockets import broadcast_match_complete, broadcast_round_complete
-        await broadcast_match_complete(match_id, result['winner_id'])
+        await broadcast_match_complete(match_id, result['winner_id'], tournament_id)
         
         # If round completed, broadcast that too
         round_info = result.pop('round_info', {})
         if round_info.get('round_completed'):
-            await broadcast_round_complete(round_info.get('new_round', 0))
+            await broadcast_round_complete(round_info.get('new_round', 0), tournament_id, round_info.get('pod'))
         
         return result
     except ValueError as e:
@@ -3,6 +3,11 @@ from sqlalchemy.orm import Session
 from database.database import get_db
 from models import Player, Match, Round, Tournament
 from schemas.player import PlayerJoin, PlayerResponse, PlayerMatches, CurrentMatch, UpcomingMatch, OpponentInfo
+from services.live_match_store import live_matches
+from services.player_cache import player_views
+from services.scheduler import opponent_of, round_count
+from services.state_version import state_versions
+from services.tournament_service import TournamentService
 from typing import Optional, List
 import json
 import os
@@ -46,6 +51,7 @@ def join_tournament(player_data: PlayerJoin, db: Session = Depends(get_db)):
     )
     db.add(player)
     db.commit()
+    state_versions.bump(player_data.tournament_id, summary=True)
     db.refresh(player)
 
     return {
@@ -109,6 +115,9 @@ async def update_profile(
 
     db.commit()
     db.refresh(player)
+    player_views.invalidate(player.tournament_id)
+    live_matches.discard_tournament(player.tournament_id)
+    state_versions.bump(player.tournament_id)
 
     colors_list = json.loads(player.colors) if player.colors else []
     
@@ -144,15 +153,10 @@ def get_profile(player_id: int, db: Session = Depends(get_db)):
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
 
-    # Count wins and losses
-    wins = db.query(Match).filter(Match.winner_id == player_id).count()
-
-    player_matches = db.query(Match).filter(
-        ((Match.player1_id == player_id) | (Match.player2_id == player_id)) &
-        (Match.status == "completed")
-    ).count()
-
-    losses = player_matches - wins
+    # Wins and losses from the materialized standings row
+    standing = player.standing
+    wins = standing.wins if standing else 0
+    losses = standing.losses if standing else 0
 
     colors_list = json.loads(player.colors) if player.colors else []
 
@@ -176,11 +180,18 @@ def get_player_matches(player_id: int, db: Session = Depends(get_db)):
 
     tournament = player.tournament
 
-    # Get current round
-    current_round = db.query(Round).filter(
-        Round.tournament_id == tournament.id,
-        Round.round_number == tournament.current_round
-    ).first()
+    # Get current round (in pod mode, the round the player's pod is on)
+    if tournament.pairing == "pods":
+        current_round = db.query(Round).filter(
+            Round.tournament_id == tournament.id,
+            Round.pod == player.pod,
+            Round.status == "in_progress"
+        ).first()
+    else:
+        current_round = db.query(Round).filter(
+            Round.tournament_id == tournament.id,
+            Round.round_number == tournament.current_round
+        ).first()
 
     current_match = None
     if current_round:
@@ -206,27 +217,29 @@ def get_player_matches(player_id: int, db: Session = Depends(get_db)):
                 status=match.status
             )
 
-    # Get upcoming matches
+    # Upcoming opponents come straight from the round-robin rotation,
+    # one O(1) lookup per remaining round (Swiss opponents are not known yet)
     upcoming_matches = []
-    future_rounds = db.query(Round).filter(
-        Round.tournament_id == tournament.id,
-        Round.round_number > tournament.current_round
-    ).all()
-
-    for round_obj in future_rounds:
-        match = db.query(Match).filter(
-            Match.round_id == round_obj.id,
-            ((Match.player1_id == player_id) | (Match.player2_id == player_id))
-        ).first()
-
-        if match:
-            opponent_id = match.player2_id if match.player1_id == player_id else match.player1_id
-            opponent = db.query(Player).filter(Player.id == opponent_id).first()
-
-            upcoming_matches.append(UpcomingMatch(
-                round_number=round_obj.round_number,
-                opponent=opponent.name
-            ))
+    if tournament.pairing == "pods" and current_round:
+        # Each pod is a round robin of its own players, at its own pace
+        players = player_views.get_players(db, tournament.id)
+        player_ids = TournamentService.get_player_ids(db, tournament.id, pod=player.pod)
+        after_round = current_round.round_number
+    elif tournament.current_round > 0 and tournament.pairing == "round_robin":
+        players = player_views.get_players(db, tournament.id)
+        player_ids = sorted(players)
+        after_round = tournament.current_round
+    else:
+        player_ids = []
+    if player_ids:
+        player_index = player_ids.index(player_id)
+        for round_number in range(after_round + 1, round_count(len(player_ids)) + 1):
+            opponent_index = opponent_of(len(player_ids), player_index, round_number - 1)
+            if opponent_index is not None:
+                upcoming_matches.append(UpcomingMatch(
+                    round_number=round_number,
+                    opponent=players[player_ids[opponent_index]].name
+                ))
 
     return PlayerMatches(
         current_match=current_match,
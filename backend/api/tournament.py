@@ -1,31 +1,55 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Query, Header
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func
+from sqlalchemy.orm import Session, selectinload
 from database.database import get_db
 from models import Tournament, Round, Match, Player
-from schemas.tournament import TournamentStatus, StandingsResponse, ScheduleResponse, RoundSchedule, MatchSchedule
+from schemas.tournament import (
+    TournamentStatus, StandingsResponse, ScheduleResponse, RoundSchedule, MatchSchedule, TournamentChanges
+)
 from schemas.match import CurrentRoundResponse, MatchDetails, MatchPlayerInfo
-from services.tournament_service import TournamentService, get_avatar_url
+from services.tournament_service import TournamentService
+from services.player_cache import player_views
+from services.state_version import state_versions
+from services.response_cache import response_cache
+from services.change_feed import change_feed
+from services.health_buffer import health_buffer
+from typing import AsyncIterator, Optional
 import json
 
 router = APIRouter(prefix="/api/tournament", tags=["tournament"])
 
+# Comment line sent on idle event streams so proxies keep them open
+SSE_KEEPALIVE_SECONDS = 15
+
 
 @router.get("/current", response_model=TournamentStatus)
-def get_current_tournament(db: Session = Depends(get_db)):
+def get_current_tournament(request: Request, db: Session = Depends(get_db)):
     """Get current tournament status."""
+    return response_cache.respond(
+        request,
+        ("current",),
+        state_versions.get_summary(),
+        TournamentStatus,
+        lambda: _build_current_tournament(db)
+    )
+
+
+def _build_current_tournament(db: Session) -> dict:
     tournament = TournamentService.get_current_tournament(db)
     if not tournament:
         raise HTTPException(status_code=404, detail="No tournament found")
 
     players_count = len(tournament.players)
 
-    # Count total rounds
-    total_rounds = db.query(Round).filter(Round.tournament_id == tournament.id).count()
+    # Count total rounds, including those not written yet
+    total_rounds = TournamentService.total_rounds(tournament, players_count) if tournament.current_round > 0 else 0
 
     return {
         "tournament_id": tournament.id,
         "name": tournament.name,
         "status": tournament.status,
+        "pairing": tournament.pairing,
         "current_round": tournament.current_round,
         "total_rounds": total_rounds,
         "players_count": players_count
@@ -33,13 +57,28 @@ def get_current_tournament(db: Session = Depends(get_db)):
 
 
 @router.get("/{tournament_id}/standings", response_model=StandingsResponse)
-def get_standings(tournament_id: int, db: Session = Depends(get_db)):
+def get_standings(
+    tournament_id: int,
+    request: Request,
+    pod: Optional[int] = Query(None, description="Pod mode: one pod's standings"),
+    db: Session = Depends(get_db)
+):
     """Get tournament standings."""
+    return response_cache.respond(
+        request,
+        ("standings", tournament_id, pod),
+        state_versions.get(tournament_id),
+        StandingsResponse,
+        lambda: _build_standings(db, tournament_id, pod)
+    )
+
+
+def _build_standings(db: Session, tournament_id: int, pod: Optional[int] = None) -> dict:
     tournament = TournamentService.get_tournament(db, tournament_id)
     if not tournament:
         raise HTTPException(status_code=404, detail="Tournament not found")
 
-    standings = TournamentService.get_standings(db, tournament_id)
+    standings = TournamentService.get_standings(db, tournament_id, pod)
     return {"standings": standings}
 
 
@@ -50,37 +89,64 @@ def get_schedule(tournament_id: int, db: Session = Depends(get_db)):
     if not tournament:
         raise HTTPException(status_code=404, detail="Tournament not found")
 
-    rounds = db.query(Round).filter(Round.tournament_id == tournament_id).order_by(Round.round_number).all()
+    # Rounds with their matches in two statements, plus one for player names
+    rounds = db.query(Round).options(selectinload(Round.matches)).filter(
+        Round.tournament_id == tournament_id
+    ).order_by(Round.pod, Round.round_number).all()
+
+    player_names = dict(
+        db.query(Player.id, Player.name).filter(Player.tournament_id == tournament_id).all()
+    )
 
     schedule = []
     for round_obj in rounds:
-        matches = db.query(Match).filter(Match.round_id == round_obj.id).all()
-
-        match_schedules = []
-        for match in matches:
-            player1 = db.query(Player).filter(Player.id == match.player1_id).first()
-            player2 = db.query(Player).filter(Player.id == match.player2_id).first()
-            winner = db.query(Player).filter(Player.id == match.winner_id).first() if match.winner_id else None
-
-            match_schedules.append(MatchSchedule(
+        match_schedules = [
+            MatchSchedule(
                 match_id=match.id,
-                player1=player1.name,
-                player2=player2.name,
-                winner=winner.name if winner else None
-            ))
+                player1=player_names[match.player1_id],
+                player2=player_names[match.player2_id],
+                winner=player_names.get(match.winner_id)
+            )
+            for match in sorted(round_obj.matches, key=lambda m: m.id)
+        ]
 
         schedule.append(RoundSchedule(
+            pod=round_obj.pod,
             round_number=round_obj.round_number,
             status=round_obj.status,
             matches=match_schedules
         ))
 
+    # Rounds held back by SCHEDULE_LOOKAHEAD are computed from the rotation;
+    # Swiss rounds depend on results, so they only appear once paired, and
+    # pods are always written in full
+    if rounds and tournament.pairing == "round_robin":
+        for round_number, pairings in TournamentService.planned_rounds(sorted(player_names), rounds[-1].round_number):
+            schedule.append(RoundSchedule(
+                round_number=round_number,
+                status="pending",
+                matches=[
+                    MatchSchedule(match_id=None, player1=player_names[p1], player2=player_names[p2], winner=None)
+                    for p1, p2 in pairings
+                ]
+            ))
+
     return {"rounds": schedule}
 
 
 @router.get("/{tournament_id}/current-round", response_model=CurrentRoundResponse)
-def get_current_round(tournament_id: int, db: Session = Depends(get_db)):
+def get_current_round(tournament_id: int, request: Request, db: Session = Depends(get_db)):
     """Get current round with live match data."""
+    return response_cache.respond(
+        request,
+        ("current-round", tournament_id),
+        state_versions.get(tournament_id),
+        CurrentRoundResponse,
+        lambda: _build_current_round(db, tournament_id)
+    )
+
+
+def _build_current_round(db: Session, tournament_id: int) -> dict:
     tournament = TournamentService.get_tournament(db, tournament_id)
     if not tournament:
         raise HTTPException(status_code=404, detail="Tournament not found")
@@ -88,46 +154,161 @@ def get_current_round(tournament_id: int, db: Session = Depends(get_db)):
     if tournament.current_round == 0:
         raise HTTPException(status_code=400, detail="Tournament has not started")
 
-    round_obj = db.query(Round).filter(
-        Round.tournament_id == tournament_id,
-        Round.round_number == tournament.current_round
-    ).first()
+    # In pod mode every pod plays its own round; all of them are live
+    if tournament.pairing == "pods":
+        live_rounds = db.query(Round).filter(
+            Round.tournament_id == tournament_id,
+            Round.status == "in_progress"
+        ).all()
+        if not live_rounds:
+            # Every pod has finished: show each pod's last round
+            last_rounds = db.query(
+                Round.pod, func.max(Round.round_number).label("round_number")
+            ).filter(Round.tournament_id == tournament_id).group_by(Round.pod).subquery()
+            live_rounds = db.query(Round).join(
+                last_rounds,
+                (Round.pod == last_rounds.c.pod) & (Round.round_number == last_rounds.c.round_number)
+            ).filter(Round.tournament_id == tournament_id).order_by(Round.pod).all()
+    else:
+        live_rounds = db.query(Round).filter(
+            Round.tournament_id == tournament_id,
+            Round.round_number == tournament.current_round
+        ).all()
 
-    if not round_obj:
+    if not live_rounds:
         raise HTTPException(status_code=404, detail="Current round not found")
 
-    matches = db.query(Match).filter(Match.round_id == round_obj.id).all()
+    pods = {round_obj.id: round_obj.pod for round_obj in live_rounds}
+    matches = db.query(Match).filter(Match.round_id.in_(pods)).order_by(Match.round_id, Match.id).all()
+
+    players = player_views.get_players(
+        db,
+        tournament_id,
+        required_ids=[pid for match in matches for pid in (match.player1_id, match.player2_id)]
+    )
 
     match_details = []
     for match in matches:
-        player1 = db.query(Player).filter(Player.id == match.player1_id).first()
-        player2 = db.query(Player).filter(Player.id == match.player2_id).first()
-
-        player1_colors = json.loads(player1.colors) if player1.colors else []
-        player2_colors = json.loads(player2.colors) if player2.colors else []
+        player1 = players[match.player1_id]
+        player2 = players[match.player2_id]
+        player1_health, player2_health = health_buffer.current_health(match)
 
         match_details.append(MatchDetails(
             match_id=match.id,
+            pod=pods[match.round_id],
             player1=MatchPlayerInfo(
-                player_id=player1.id,
+                player_id=player1.player_id,
                 name=player1.name,
-                avatar_url=get_avatar_url(player1.avatar_path),
-                colors=player1_colors,
-                health=match.player1_health
+                avatar_url=player1.avatar_url,
+                colors=list(player1.colors),
+                health=player1_health
             ),
             player2=MatchPlayerInfo(
-                player_id=player2.id,
+                player_id=player2.player_id,
                 name=player2.name,
-                avatar_url=get_avatar_url(player2.avatar_path),
-                colors=player2_colors,
-                health=match.player2_health
+                avatar_url=player2.avatar_url,
+                colors=list(player2.colors),
+                health=player2_health
             ),
             status=match.status,
             winner_id=match.winner_id
         ))
 
     return {
-        "round_number": round_obj.round_number,
-        "status": round_obj.status,
+        "round_number": tournament.current_round,
+        "status": "in_progress" if any(r.status == "in_progress" for r in live_rounds) else live_rounds[0].status,
         "matches": match_details
     }
+
+
+@router.get("/{tournament_id}/changes", response_model=TournamentChanges)
+async def get_changes(
+    tournament_id: int,
+    since: Optional[int] = Query(None, ge=0),
+    timeout: float = Query(25, ge=0, le=60),
+    db: Session = Depends(get_db)
+):
+    """Long-poll for changes after state version `since`.
+
+    Returns as soon as the tournament's state version moves past `since`, or
+    after `timeout` seconds with no changes. Without `since`, returns the
+    current version immediately. If `complete` is false the listed changes
+    do not cover everything that happened and the client should reload.
+    """
+    tournament = TournamentService.get_tournament(db, tournament_id)
+    # Don't hold a pooled connection while waiting
+    db.close()
+    if not tournament:
+        raise HTTPException(status_code=404, detail="Tournament not found")
+
+    if since is None:
+        since = state_versions.get(tournament_id)
+    else:
+        await change_feed.wait(tournament_id, since, timeout)
+
+    version, changes, complete = change_feed.changes_since(tournament_id, since)
+    return {
+        "tournament_id": tournament_id,
+        "epoch": state_versions.epoch,
+        "version": version,
+        "complete": complete,
+        "changes": changes
+    }
+
+
+@router.get("/{tournament_id}/events")
+async def stream_events(
+    tournament_id: int,
+    last_event_id: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Server-Sent Events stream of live tournament updates.
+
+    Streams the same health_update / match_complete / round_complete messages
+    as /ws/dashboard. Reconnecting clients send Last-Event-ID and receive the
+    events they missed from the replay buffer; if those are no longer
+    available a {"type": "resync"} message tells them to reload.
+    """
+    tournament = TournamentService.get_tournament(db, tournament_id)
+    # Don't hold a pooled connection for the lifetime of the stream
+    db.close()
+    if not tournament:
+        raise HTTPException(status_code=404, detail="Tournament not found")
+
+    return StreamingResponse(
+        _event_stream(tournament_id, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _sse_message(seq: int, message: dict) -> str:
+    return f"id: {state_versions.epoch}:{seq}\ndata: {json.dumps(message)}\n\n"
+
+
+async def _event_stream(tournament_id: int, last_event_id: Optional[str]) -> AsyncIterator[str]:
+    yield "retry: 3000\n\n"
+
+    # Event IDs are "<epoch>:<sequence>"; IDs from another process run can't be resumed
+    seq = change_feed.last_sequence(tournament_id)
+    if last_event_id:
+        epoch, _, last_seq = last_event_id.partition(":")
+        if epoch == state_versions.epoch and last_seq.isdigit():
+            seq = int(last_seq)
+        else:
+            yield _sse_message(seq, {"type": "resync"})
+
+    # The server cancels this generator when the client disconnects
+    while True:
+        events, complete = change_feed.events_after(tournament_id, seq)
+        if not complete:
+            seq = change_feed.last_sequence(tournament_id)
+            yield _sse_message(seq, {"type": "resync"})
+            continue
+
+        for seq, message in events:
+            yield _sse_message(seq, message)
+
+        await change_feed.wait_for_events(tournament_id, seq, SSE_KEEPALIVE_SECONDS)
+        if change_feed.last_sequence(tournament_id) == seq:
+            yield ": keep-alive\n\n"
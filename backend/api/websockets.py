@@ -1,62 +1,211 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from typing import List, Dict
+from services.broadcast_bus import bus
+from services.change_feed import change_feed
+from typing import Callable, List, Dict, Optional, Tuple
+import asyncio
 import json
+import os
 
 router = APIRouter()
 
+# Outbound messages buffered per socket before it counts as a slow consumer
+WS_SEND_QUEUE_SIZE = int(os.getenv("WS_SEND_QUEUE_SIZE", "64"))
+# Seconds a single send may take before the socket is dropped
+WS_SEND_TIMEOUT = float(os.getenv("WS_SEND_TIMEOUT", "5"))
+# What to do when a socket's queue is full: "disconnect" or "drop" (oldest message)
+WS_SLOW_CONSUMER_POLICY = os.getenv("WS_SLOW_CONSUMER_POLICY", "disconnect")
+# Window in ms for merging dashboard health updates into one frame (0 = off)
+WS_COALESCE_MS = float(os.getenv("WS_COALESCE_MS", "0"))
+
+
+class ClientConnection:
+    """A WebSocket with its own bounded send queue drained by a writer task.
+
+    Broadcasting only enqueues, so a slow or stalled client never delays
+    the broadcaster or other clients.
+    """
+
+    def __init__(self, websocket: WebSocket, on_close: Callable[["ClientConnection"], None]):
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=WS_SEND_QUEUE_SIZE)
+        self.dropped = 0
+        self.closed = False
+        self._on_close = on_close
+        self._writer = asyncio.create_task(self._drain())
+
+    def enqueue(self, text: str) -> bool:
+        """Queue a serialized message; returns False if the client is too slow."""
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(text)
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        if WS_SLOW_CONSUMER_POLICY == "drop":
+            # Keep the newest state: discard the oldest queued message
+            self.queue.get_nowait()
+            self.queue.put_nowait(text)
+            self.dropped += 1
+            return True
+
+        self.close()
+        return False
+
+    def close(self, code: int = 1013, close_socket: bool = True):
+        """Stop the writer and close the socket (1013: try again later)."""
+        if self.closed:
+            return
+        self.closed = True
+        self._writer.cancel()
+        self._on_close(self)
+        if close_socket:
+            asyncio.create_task(self._close_socket(code))
+
+    async def _close_socket(self, code: int):
+        try:
+            await asyncio.wait_for(self.websocket.close(code=code), WS_SEND_TIMEOUT)
+        except Exception:
+            pass
+
+    async def _drain(self):
+        try:
+            while True:
+                text = await self.queue.get()
+                await asyncio.wait_for(self.websocket.send_text(text), WS_SEND_TIMEOUT)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Send failed or timed out: treat the client as gone
+            self.close()
+
+
 # Connection manager for WebSocket connections
 class ConnectionManager:
-    def __init__(self):
-        self.dashboard_connections: List[WebSocket] = []
-        self.match_connections: Dict[int, List[WebSocket]] = {}
+    def __init__(self, coalesce_ms: float = WS_COALESCE_MS):
+        self.dashboard_connections: Dict[WebSocket, ClientConnection] = {}
+        self.match_connections: Dict[int, Dict[WebSocket, ClientConnection]] = {}
+        self.messages_sent = 0
+        self.slow_consumers = 0
+        self.coalesce_ms = coalesce_ms
+        self.health_updates_coalesced = 0
+        # Latest pending dashboard health update per (match_id, player_id)
+        self._pending_health: Dict[Tuple[int, int], dict] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
 
     async def connect_dashboard(self, websocket: WebSocket):
         await websocket.accept()
-        self.dashboard_connections.append(websocket)
+        self.dashboard_connections[websocket] = ClientConnection(
+            websocket,
+            lambda conn: self._remove(self.dashboard_connections, conn)
+        )
 
     def disconnect_dashboard(self, websocket: WebSocket):
-        self.dashboard_connections.remove(websocket)
+        connection = self.dashboard_connections.pop(websocket, None)
+        if connection:
+            connection.close(close_socket=False)
 
     async def connect_match(self, match_id: int, websocket: WebSocket):
         await websocket.accept()
         if match_id not in self.match_connections:
-            self.match_connections[match_id] = []
-        self.match_connections[match_id].append(websocket)
+            self.match_connections[match_id] = {}
+        self.match_connections[match_id][websocket] = ClientConnection(
+            websocket,
+            lambda conn: self._remove_match(match_id, conn)
+        )
 
     def disconnect_match(self, match_id: int, websocket: WebSocket):
-        if match_id in self.match_connections:
-            self.match_connections[match_id].remove(websocket)
-            if not self.match_connections[match_id]:
-                del self.match_connections[match_id]
+        connection = self.match_connections.get(match_id, {}).get(websocket)
+        if connection:
+            connection.close(close_socket=False)
+
+    def send_personal(self, websocket: WebSocket, message: dict):
+        """Queue a message for one socket (dashboard or match)."""
+        connection = self.dashboard_connections.get(websocket)
+        if connection is None:
+            for connections in self.match_connections.values():
+                connection = connections.get(websocket)
+                if connection:
+                    break
+        if connection:
+            self._fan_out([connection], json.dumps(message))
 
     async def broadcast_to_dashboard(self, message: dict):
-        """Broadcast message to all dashboard connections."""
-        disconnected = []
-        for connection in self.dashboard_connections:
-            try:
-                await connection.send_json(message)
-            except:
-                disconnected.append(connection)
-
-        # Clean up disconnected clients
-        for conn in disconnected:
-            self.dashboard_connections.remove(conn)
+        """Broadcast message to all dashboard connections.
+
+        With a coalescing window, health updates are held for up to
+        coalesce_ms and sent as one "health_batch" frame carrying only the
+        latest value per player. Any other message flushes the batch first,
+        so dashboards still see every match's events in order.
+        """
+        if self.coalesce_ms > 0 and message.get("type") == "health_update":
+            key = (message["match_id"], message["player_id"])
+            if key in self._pending_health:
+                self.health_updates_coalesced += 1
+            self._pending_health[key] = message
+            if self._flush_handle is None:
+                self._flush_handle = asyncio.get_running_loop().call_later(
+                    self.coalesce_ms / 1000, self.flush_dashboard
+                )
+            return
+
+        self.flush_dashboard()
+        self._fan_out(list(self.dashboard_connections.values()), json.dumps(message))
+
+    def flush_dashboard(self):
+        """Send pending coalesced health updates now."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending_health:
+            return
+        updates = list(self._pending_health.values())
+        self._pending_health.clear()
+        message = updates[0] if len(updates) == 1 else {"type": "health_batch", "updates": updates}
+        self._fan_out(list(self.dashboard_connections.values()), json.dumps(message))
 
     async def broadcast_to_match(self, match_id: int, message: dict):
         """Broadcast message to all connections for a specific match."""
         if match_id not in self.match_connections:
             return
+        self._fan_out(list(self.match_connections[match_id].values()), json.dumps(message))
+
+    def stats(self) -> dict:
+        """Connection and slow-consumer counters."""
+        return {
+            "dashboard_connections": len(self.dashboard_connections),
+            "match_connections": sum(len(c) for c in self.match_connections.values()),
+            "messages_sent": self.messages_sent,
+            "slow_consumers_disconnected": self.slow_consumers,
+            "messages_dropped": sum(c.dropped for c in self.dashboard_connections.values()) + sum(
+                c.dropped for conns in self.match_connections.values() for c in conns.values()
+            ),
+            "slow_consumer_policy": WS_SLOW_CONSUMER_POLICY,
+            "coalesce_ms": self.coalesce_ms,
+            "health_updates_coalesced": self.health_updates_coalesced
+        }
 
-        disconnected = []
-        for connection in self.match_connections[match_id]:
-            try:
-                await connection.send_json(message)
-            except:
-                disconnected.append(connection)
+    def _fan_out(self, connections: List[ClientConnection], text: str):
+        # Serialized once by the caller; each socket's writer task sends it
+        for connection in connections:
+            if connection.enqueue(text):
+                self.messages_sent += 1
+            else:
+                self.slow_consumers += 1
 
-        # Clean up disconnected clients
-        for conn in disconnected:
-            self.match_connections[match_id].remove(conn)
+    @staticmethod
+    def _remove(connections: Dict[WebSocket, ClientConnection], connection: ClientConnection):
+        if connections.get(connection.websocket) is connection:
+            del connections[connection.websocket]
+
+    def _remove_match(self, match_id: int, connection: ClientConnection):
+        connections = self.match_connections.get(match_id)
+        if connections is None:
+            return
+        self._remove(connections, connection)
+        if not connections:
+            del self.match_connections[match_id]
 
 
 manager = ConnectionManager()
@@ -71,8 +220,10 @@ async def dashboard_websocket(websocket: WebSocket):
             # Keep connection alive
             data = await websocket.receive_text()
             # Echo back to confirm connection
-            await websocket.send_json({"type": "ping", "message": "pong"})
+            manager.send_personal(websocket, {"type": "ping", "message": "pong"})
     except WebSocketDisconnect:
+        pass
+    finally:
         manager.disconnect_dashboard(websocket)
 
 
@@ -85,45 +236,76 @@ async def match_websocket(websocket: WebSocket, match_id: int):
             # Keep connection alive
             data = await websocket.receive_text()
             # Echo back to confirm connection
-            await websocket.send_json({"type": "ping", "message": "pong"})
+            manager.send_personal(websocket, {"type": "ping", "message": "pong"})
     except WebSocketDisconnect:
+        pass
+    finally:
         manager.disconnect_match(match_id, websocket)
 
 
+async def _deliver_broadcast(payload: dict):
+    """Send a broadcast to this worker's sockets (from any worker via the bus)."""
+    tournament_id = payload.get("tournament_id")
+    if tournament_id is not None:
+        change_feed.publish(tournament_id, payload["dashboard"])
+    await manager.broadcast_to_dashboard(payload["dashboard"])
+    if payload.get("match") is not None:
+        await manager.broadcast_to_match(payload["match_id"], payload["match"])
+
+
+bus.subscribe("broadcast", _deliver_broadcast)
+
+
 # Helper functions to broadcast events (called from services)
-async def broadcast_health_update(match_id: int, player_id: int, new_health: int):
+async def broadcast_health_update(
+    match_id: int,
+    player_id: int,
+    new_health: int,
+    tournament_id: Optional[int] = None
+):
     """Broadcast health update to dashboard and match connections."""
-    message = {
-        "type": "health_update",
+    await bus.publish("broadcast", {
+        "tournament_id": tournament_id,
         "match_id": match_id,
-        "player_id": player_id,
-        "new_health": new_health
-    }
-    await manager.broadcast_to_dashboard(message)
-    await manager.broadcast_to_match(match_id, {
-        "type": "health_update",
-        "your_health": new_health
+        "dashboard": {
+            "type": "health_update",
+            "match_id": match_id,
+            "player_id": player_id,
+            "new_health": new_health
+        },
+        "match": {
+            "type": "health_update",
+            "your_health": new_health
+        }
     })
 
 
-async def broadcast_match_complete(match_id: int, winner_id: int):
+async def broadcast_match_complete(match_id: int, winner_id: int, tournament_id: Optional[int] = None):
     """Broadcast match completion."""
-    message = {
-        "type": "match_complete",
+    await bus.publish("broadcast", {
+        "tournament_id": tournament_id,
         "match_id": match_id,
-        "winner_id": winner_id
-    }
-    await manager.broadcast_to_dashboard(message)
-    await manager.broadcast_to_match(match_id, {
-        "type": "match_end",
-        "winner_id": winner_id
+        "dashboard": {
+            "type": "match_complete",
+            "match_id": match_id,
+            "winner_id": winner_id
+        },
+        "match": {
+            "type": "match_end",
+            "winner_id": winner_id
+        }
     })
 
 
-async def broadcast_round_complete(round_number: int):
-    """Broadcast round completion."""
+async def broadcast_round_complete(round_number: int, tournament_id: Optional[int] = None, pod: Optional[int] = None):
+    """Broadcast round completion (of one pod's round in pod mode)."""
     message = {
         "type": "round_complete",
         "round_number": round_number
     }
-    await manager.broadcast_to_dashboard(message)
+    if pod is not None:
+        message["pod"] = pod
+    await bus.publish("broadcast", {
+        "tournament_id": tournament_id,
+        "dashboard": message
+    })
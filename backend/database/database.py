@@ -1,20 +1,158 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from database.pool_metrics import MeasuredAsyncQueuePool, MeasuredQueuePool, PoolMetrics
+from typing import List, Optional
 import os
 
+
+def _env_flag(name: str, default: str = "false") -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./mtg_tournament.db")
+# Serve the live-match hot path (health updates, defeats) from an AsyncSession.
+# On SQLite these requests share one connection: the event loop stays
+# responsive, but each request waits for the ones ahead of it (see README)
+DB_ASYNC = _env_flag("DB_ASYNC")
+
+# Connection pool (ignored for in-memory SQLite); defaults match SQLAlchemy's
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+# Seconds a request waits for a free connection before failing
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Test connections on checkout (drops ones the server closed)
+DB_POOL_PRE_PING = _env_flag("DB_POOL_PRE_PING")
+# Replace connections older than this many seconds (-1 = never)
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "-1"))
+
+# Async drivers used for DB_ASYNC when DATABASE_URL names a sync one
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+# PRAGMAs applied to every new SQLite connection, by SQLITE_PROFILE
+SQLITE_PROFILES = {
+    # SQLite defaults: rollback journal, writers block readers
+    "default": {},
+    # WAL lets polling readers run alongside a writer; NORMAL only syncs at
+    # checkpoints (a power cut can lose the last commits, never corrupt).
+    # WAL needs a local disk, not a network share.
+    "production": {
+        "journal_mode": "WAL",
+        "busy_timeout": 5000,
+        "synchronous": "NORMAL",
+        "cache_size": -64000,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+    },
+}
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "default")
+
+
+def apply_sqlite_pragmas(engine: Engine, profile: str = SQLITE_PROFILE):
+    """Run the profile's PRAGMAs on each new connection of a SQLite engine."""
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLITE_PROFILE {profile!r}, expected one of {sorted(SQLITE_PROFILES)}")
+    pragmas = SQLITE_PROFILES[profile]
+    if not pragmas or engine.url.get_backend_name() != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def _pool_args(database_url: str, poolclass) -> dict:
+    """Pool settings for database_url; in-memory SQLite keeps its default pool."""
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "pool_recycle": DB_POOL_RECYCLE,
+    }
+
+
+def _attach_pool_metrics(db_engine: Engine):
+    if isinstance(db_engine.pool, (MeasuredQueuePool, MeasuredAsyncQueuePool)):
+        db_engine.pool.metrics = PoolMetrics()
+
+
+def get_pool_stats(db_engine: Optional[Engine]) -> Optional[dict]:
+    """Checked-out/overflow counts and checkout wait times for an engine's pool."""
+    if db_engine is None:
+        return None
+    metrics = getattr(db_engine.pool, "metrics", None)
+    if metrics is None:
+        return {"pool": type(db_engine.pool).__name__}
+    return metrics.snapshot(db_engine.pool)
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
-)
+
+def create_db_engine(database_url: str = DATABASE_URL, sqlite_profile: str = SQLITE_PROFILE) -> Engine:
+    """Create the sync engine for database_url with its tuning applied."""
+    db_engine = create_engine(
+        database_url,
+        connect_args={"check_same_thread": False} if "sqlite" in database_url else {},
+        **_pool_args(database_url, MeasuredQueuePool)
+    )
+    apply_sqlite_pragmas(db_engine, sqlite_profile)
+    _attach_pool_metrics(db_engine)
+    return db_engine
+
+
+engine = create_db_engine()
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
 
+def get_async_database_url(database_url: str) -> str:
+    """Swap a sync driver in database_url for its async counterpart."""
+    url = make_url(database_url)
+    drivername = ASYNC_DRIVERS.get(url.drivername, url.drivername)
+    return url.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+def create_async_session_factory(database_url: str = DATABASE_URL):
+    """Build (async_engine, async_sessionmaker) for database_url.
+
+    Requires the async driver (aiosqlite or asyncpg). Objects stay loaded
+    after commit, since async sessions cannot lazy-load expired attributes.
+    SQLite allows one writer at a time, so its async pool holds a single
+    connection: concurrent hot-path writes queue without blocking the loop
+    instead of spinning on the database lock. The cost is latency: a request
+    waits for every one queued ahead of it (p50 ~60 ms against ~3 ms sync
+    with 16 concurrent players in benchmark_async_db). A wider pool lowers
+    the median, but writers then back off on the lock and p99 nears a
+    second.
+    """
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_url = make_url(get_async_database_url(database_url))
+    pool_args = _pool_args(database_url, MeasuredAsyncQueuePool)
+    if pool_args and async_url.get_backend_name() == "sqlite":
+        pool_args.update(pool_size=1, max_overflow=0)
+    async_engine = create_async_engine(async_url, **pool_args)
+    apply_sqlite_pragmas(async_engine.sync_engine)
+    _attach_pool_metrics(async_engine.sync_engine)
+    return async_engine, async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+async_engine, AsyncSessionLocal = create_async_session_factory() if DB_ASYNC else (None, None)
+
+
 def get_db():
     """Dependency for getting database session."""
     db = SessionLocal()
@@ -24,9 +162,28 @@ def get_db():
         db.close()
 
 
-def init_db():
-    """Initialize database tables."""
-    Base.metadata.create_all(bind=engine)
+async def get_live_db():
+    """Dependency for the live-match hot path.
+
+    Yields an AsyncSession when DB_ASYNC is enabled, so commits are awaited
+    instead of blocking the event loop shared with the WebSockets; otherwise
+    the regular Session.
+    """
+    if AsyncSessionLocal is None:
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+    else:
+        async with AsyncSessionLocal() as db:
+            yield db
+
+
+def init_db() -> List[int]:
+    """Bring the database schema up to date; returns the migrations applied."""
+    from database.migrations import run_migrations
+    return run_migrations(engine)
 
 
 def init_admin_user():
@@ -0,0 +1,269 @@
+"""
+Versioned schema migrations.
+
+Each migration has a version number and an upgrade function that runs in its
+own transaction; applied versions are recorded in the schema_migrations
+table. Migrations run on startup (init_db) and from scripts/init_db.py, so a
+schema change ships to existing databases without wiping data.
+
+Migrations must be idempotent: a fresh database gets every table from the
+current models in migration 1, so later migrations find their columns and
+indexes already there and skip them. Use the add_column and create_index
+helpers, which check first.
+
+Data migrations use plain SQL over the table definitions below, never the
+models or services, which keep changing after a migration has shipped.
+
+Adding a migration: append Migration(next_version, "description", upgrade)
+to MIGRATIONS. Never renumber or edit one that has shipped.
+"""
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, delete, insert, inspect, select, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.schema import CreateTable
+from sqlalchemy.sql import func
+from database.database import Base
+from dataclasses import dataclass
+from typing import Callable, List
+import models  # noqa: F401  (registers every table on Base.metadata)
+
+# Kept out of Base.metadata so create_all never touches it
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime(timezone=True), server_default=func.now())
+)
+
+
+# The columns data migrations read and write, as of the migration that wrote
+# them. Fixed here so later model changes cannot change what a shipped
+# migration does.
+_frozen = MetaData()
+_tournaments = Table("tournaments", _frozen, Column("id", Integer, primary_key=True), Column("pairing", String))
+_players = Table("players", _frozen, Column("id", Integer, primary_key=True), Column("tournament_id", Integer))
+_rounds = Table("rounds", _frozen, Column("id", Integer, primary_key=True), Column("tournament_id", Integer))
+_matches = Table(
+    "matches",
+    _frozen,
+    Column("id", Integer, primary_key=True),
+    Column("round_id", Integer),
+    Column("player1_id", Integer),
+    Column("player2_id", Integer),
+    Column("winner_id", Integer),
+    Column("status", String)
+)
+_standings = Table(
+    "standings",
+    _frozen,
+    Column("player_id", Integer, primary_key=True),
+    Column("tournament_id", Integer),
+    Column("matches_played", Integer),
+    Column("wins", Integer),
+    Column("losses", Integer),
+    Column("points", Integer)
+)
+
+
+class _AppliedElsewhere(Exception):
+    """Another worker recorded the migration first."""
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+def add_column(conn: Connection, table_name: str, column: Column):
+    """ALTER TABLE ... ADD COLUMN unless the column exists.
+
+    Adding a nullable column (or one with a server default) does not rewrite
+    the table on SQLite or Postgres, so it is safe on a live database.
+    """
+    if column.name in {c["name"] for c in inspect(conn).get_columns(table_name)}:
+        return
+    column_type = column.type.compile(dialect=conn.dialect)
+    ddl = f"ALTER TABLE {table_name} ADD COLUMN {column.name} {column_type}"
+    if column.server_default is not None:
+        default = column.server_default.arg
+        if isinstance(default, str):
+            default = "'" + default.replace("'", "''") + "'"
+        ddl += f" DEFAULT {default}"
+    if not column.nullable:
+        ddl += " NOT NULL"
+    conn.exec_driver_sql(ddl)
+
+
+def create_index(conn: Connection, table_name: str, index_name: str):
+    """Create an index declared on the models unless it exists."""
+    if index_name in {i["name"] for i in inspect(conn).get_indexes(table_name)}:
+        return
+    table = Base.metadata.tables[table_name]
+    index = next(i for i in table.indexes if i.name == index_name)
+    index.create(bind=conn)
+
+
+def _create_tables(conn: Connection):
+    Base.metadata.create_all(bind=conn)
+
+
+def _hot_path_indexes(conn: Connection):
+    for table_name, index_name in [
+        ("matches", "ix_matches_round_id_status"),
+        ("matches", "ix_matches_player1_id_status"),
+        ("matches", "ix_matches_player2_id_status"),
+        ("matches", "ix_matches_winner_id"),
+        ("match_events", "ix_match_events_match_id_timestamp"),
+        ("rounds", "ix_rounds_tournament_id_round_number"),
+        ("players", "ix_players_tournament_id_name"),
+        ("tournaments", "ix_tournaments_created_at"),
+    ]:
+        create_index(conn, table_name, index_name)
+
+
+def _swiss_pairing(conn: Connection):
+    table = Base.metadata.tables["tournaments"]
+    for column_name in ("pairing", "num_rounds"):
+        add_column(conn, "tournaments", table.c[column_name])
+
+
+def _draft_pods(conn: Connection):
+    for table_name, column_name in [("tournaments", "pod_size"), ("players", "pod"), ("rounds", "pod")]:
+        add_column(conn, table_name, Base.metadata.tables[table_name].c[column_name])
+
+
+def _round_completion_counters(conn: Connection):
+    rounds = Base.metadata.tables["rounds"]
+    matches = Base.metadata.tables["matches"]
+    add_column(conn, "rounds", rounds.c.remaining_matches)
+    # Backfill from the matches; recounting is harmless if it already ran
+    conn.execute(update(rounds).values(remaining_matches=select(func.count()).where(
+        matches.c.round_id == rounds.c.id,
+        matches.c.status != "completed"
+    ).scalar_subquery()))
+
+
+def _health_batch_sequences(conn: Connection):
+    matches = Base.metadata.tables["matches"]
+    for column_name in ("player1_health_seq", "player2_health_seq"):
+        add_column(conn, "matches", matches.c[column_name])
+
+
+def _rewrite_standings(conn: Connection, tournament_id: int, count_byes: bool):
+    """Replace a tournament's standings with totals from its matches.
+
+    3 points per win. With count_byes, each round a player is missing from
+    counts as a match won (the Swiss bye).
+    """
+    played, wins = {}, {}
+    for player_id in conn.execute(select(_players.c.id).where(_players.c.tournament_id == tournament_id)).scalars():
+        played[player_id] = wins[player_id] = 0
+    tournament_matches = select(
+        _matches.c.player1_id, _matches.c.player2_id, _matches.c.winner_id, _matches.c.status
+    ).join(_rounds, _matches.c.round_id == _rounds.c.id).where(_rounds.c.tournament_id == tournament_id)
+    appearances = dict.fromkeys(played, 0)
+    for player1_id, player2_id, winner_id, status in conn.execute(tournament_matches):
+        for player_id in (player1_id, player2_id):
+            if player_id not in played:
+                continue
+            appearances[player_id] += 1
+            if status == "completed":
+                played[player_id] += 1
+                wins[player_id] += player_id == winner_id
+    if count_byes:
+        rounds = conn.execute(
+            select(func.count()).select_from(_rounds).where(_rounds.c.tournament_id == tournament_id)
+        ).scalar()
+        for player_id in played:
+            byes = rounds - appearances[player_id]
+            played[player_id] += byes
+            wins[player_id] += byes
+
+    conn.execute(delete(_standings).where(_standings.c.tournament_id == tournament_id))
+    if played:
+        conn.execute(insert(_standings), [
+            {
+                "player_id": player_id,
+                "tournament_id": tournament_id,
+                "matches_played": played[player_id],
+                "wins": wins[player_id],
+                "losses": played[player_id] - wins[player_id],
+                "points": wins[player_id] * 3
+            }
+            for player_id in played
+        ])
+
+
+def _backfill_standings(conn: Connection):
+    # Databases from before the standings table got it empty; rewriting a
+    # consistent tournament changes nothing. Byes scored nothing then.
+    for tournament_id in conn.execute(select(_tournaments.c.id)).scalars().all():
+        _rewrite_standings(conn, tournament_id, count_byes=False)
+
+
+def _match_health_versions(conn: Connection):
+    add_column(conn, "matches", Base.metadata.tables["matches"].c.health_version)
+
+
+def _score_swiss_byes(conn: Connection):
+    # Byes used to score nothing; they now count as a win
+    swiss = select(_tournaments.c.id).where(_tournaments.c.pairing == "swiss")
+    for tournament_id in conn.execute(swiss).scalars().all():
+        _rewrite_standings(conn, tournament_id, count_byes=True)
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "create tables", _create_tables),
+    Migration(2, "hot-path indexes", _hot_path_indexes),
+    Migration(3, "swiss pairing", _swiss_pairing),
+    Migration(4, "draft pods", _draft_pods),
+    Migration(5, "round completion counters", _round_completion_counters),
+    Migration(6, "health batch sequence numbers", _health_batch_sequences),
+    Migration(7, "backfill standings", _backfill_standings),
+    Migration(8, "match health versions", _match_health_versions),
+    Migration(9, "score swiss byes", _score_swiss_byes),
+]
+
+
+def current_version(engine: Engine) -> int:
+    """Highest applied migration version (0 for a database never migrated)."""
+    if not inspect(engine).has_table(schema_migrations.name):
+        return 0
+    with engine.connect() as conn:
+        return conn.execute(select(func.max(schema_migrations.c.version))).scalar() or 0
+
+
+def run_migrations(engine: Engine) -> List[int]:
+    """Apply pending migrations in order; returns the versions applied.
+
+    Several workers may start at once: each migration first inserts its
+    version row, so the first worker holds the lock until it commits and the
+    others see the duplicate key and skip that migration.
+    """
+    with engine.begin() as conn:
+        conn.execute(CreateTable(schema_migrations, if_not_exists=True))
+    with engine.connect() as conn:
+        applied = set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+    ran = []
+    for migration in sorted(MIGRATIONS, key=lambda m: m.version):
+        if migration.version in applied:
+            continue
+        try:
+            with engine.begin() as conn:
+                try:
+                    conn.execute(schema_migrations.insert().values(
+                        version=migration.version,
+                        description=migration.description
+                    ))
+                except IntegrityError:
+                    raise _AppliedElsewhere()
+                migration.upgrade(conn)
+        except _AppliedElsewhere:
+            continue
+        ran.append(migration.version)
+    return ran
@@ -3,6 +3,8 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from database.database import init_db
 from api import admin, players, matches, tournament, websockets
+from services.broadcast_bus import bus
+from services.health_buffer import health_buffer
 from dotenv import load_dotenv
 import os
 
@@ -50,12 +52,37 @@ if os.path.exists(FRONTEND_DIR):
 def on_startup():
     """Initialize database on startup."""
     from database.database import init_admin_user
-    init_db()
+    applied = init_db()
+    if applied:
+        print(f"Applied database migrations: {', '.join(map(str, applied))}")
     init_admin_user()
     print("Database initialized successfully!")
     print(f"Server running. API docs available at http://localhost:8000/docs")
 
 
+@app.on_event("startup")
+async def start_broadcast_bus():
+    """Connect this worker to the broadcast bus (see BROADCAST_BUS)."""
+    await bus.start()
+
+
+@app.on_event("startup")
+async def start_health_buffer():
+    """Start flushing buffered health changes (see HEALTH_WRITE_BEHIND)."""
+    await health_buffer.start()
+
+
+@app.on_event("shutdown")
+async def stop_broadcast_bus():
+    await bus.stop()
+
+
+@app.on_event("shutdown")
+async def stop_health_buffer():
+    """Write any health changes still buffered."""
+    await health_buffer.stop()
+
+
 @app.get("/")
 def root():
     """Root endpoint."""
@@ -3,5 +3,6 @@ from .player import Player
 from .round import Round
 from .match import Match, MatchEvent
 from .admin import AdminConfig
+from .standing import Standing
 
-__all__ = ["Tournament", "Player", "Round", "Match", "MatchEvent", "AdminConfig"]
+__all__ = ["Tournament", "Player", "Round", "Match", "MatchEvent", "AdminConfig", "Standing"]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database.database import Base
@@ -13,6 +13,11 @@ class Match(Base):
     player2_id = Column(Integer, ForeignKey("players.id"), nullable=False)
     player1_health = Column(Integer, nullable=True)
     player2_health = Column(Integer, nullable=True)
+    # Last client sequence number applied by a health batch, per player
+    player1_health_seq = Column(Integer, nullable=False, default=0, server_default="0")
+    player2_health_seq = Column(Integer, nullable=False, default=0, server_default="0")
+    # Bumped by every health write, so cached copies can tell which is newer
+    health_version = Column(Integer, nullable=False, default=0, server_default="0")
     winner_id = Column(Integer, ForeignKey("players.id"), nullable=True)
     status = Column(String, nullable=False, default="pending")
     started_at = Column(DateTime(timezone=True), nullable=True)
@@ -24,6 +29,14 @@ class Match(Base):
     winner = relationship("Player", foreign_keys=[winner_id])
     events = relationship("MatchEvent", back_populates="match", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Open matches of a round (round completion), a player's matches by status
+        Index("ix_matches_round_id_status", "round_id", "status"),
+        Index("ix_matches_player1_id_status", "player1_id", "status"),
+        Index("ix_matches_player2_id_status", "player2_id", "status"),
+        Index("ix_matches_winner_id", "winner_id"),
+    )
+
 
 class MatchEvent(Base):
     __tablename__ = "match_events"
@@ -38,3 +51,8 @@ class MatchEvent(Base):
 
     match = relationship("Match", back_populates="events")
     player = relationship("Player")
+
+    __table_args__ = (
+        # A match's event history in order
+        Index("ix_match_events_match_id_timestamp", "match_id", "timestamp"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database.database import Base
@@ -12,6 +12,13 @@ class Player(Base):
     name = Column(String, nullable=False)
     avatar_path = Column(String, nullable=True)
     colors = Column(Text, nullable=True)  # JSON array: ["W", "U", "B", "R", "G"]
+    pod = Column(Integer, nullable=True)  # Pod number in pod mode, set when the schedule is generated
     joined_at = Column(DateTime(timezone=True), server_default=func.now())
 
     tournament = relationship("Tournament", back_populates="players")
+    standing = relationship("Standing", back_populates="player", uselist=False, cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # Name uniqueness check on join
+        Index("ix_players_tournament_id_name", "tournament_id", "name"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database.database import Base
@@ -9,10 +9,17 @@ class Round(Base):
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     tournament_id = Column(Integer, ForeignKey("tournaments.id"), nullable=False, index=True)
+    pod = Column(Integer, nullable=True)  # Pod the round belongs to in pod mode
     round_number = Column(Integer, nullable=False)
     status = Column(String, nullable=False, default="pending")
+    # Matches not completed yet; the completion that takes it to 0 advances the round
+    remaining_matches = Column(Integer, nullable=False, default=0, server_default="0")
     started_at = Column(DateTime(timezone=True), nullable=True)
     completed_at = Column(DateTime(timezone=True), nullable=True)
 
     tournament = relationship("Tournament", back_populates="rounds")
     matches = relationship("Match", back_populates="round", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        Index("ix_rounds_tournament_id_round_number", "tournament_id", "round_number"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy import Column, Integer, String, DateTime, Index, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database.database import Base
@@ -11,6 +11,9 @@ class Tournament(Base):
     name = Column(String, nullable=False)
     max_players = Column(Integer, nullable=False)
     starting_life = Column(Integer, nullable=False, default=20)
+    pairing = Column(String, nullable=False, default="round_robin", server_default="round_robin")  # round_robin | swiss | pods
+    num_rounds = Column(Integer, nullable=True)  # Swiss rounds; round robin derives them from the player count
+    pod_size = Column(Integer, nullable=True)  # Players per pod in pod mode
     status = Column(String, nullable=False, default="registration")
     current_round = Column(Integer, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -18,3 +21,8 @@ class Tournament(Base):
 
     players = relationship("Player", back_populates="tournament", cascade="all, delete-orphan")
     rounds = relationship("Round", back_populates="tournament", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # Current (most recent) tournament
+        Index("ix_tournaments_created_at", "created_at"),
+    )
@@ -1,6 +1,9 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 from typing import Optional, List
 
+# Taps a client may buffer into one health batch
+MAX_HEALTH_BATCH = 100
+
 
 class MatchJoin(BaseModel):
     player_id: int
@@ -11,6 +14,22 @@ class MatchHealthUpdate(BaseModel):
     health_change: int
 
 
+class HealthDelta(BaseModel):
+    seq: int = Field(..., ge=1)  # Client sequence number, increasing per player and match
+    health_change: int
+
+
+class MatchHealthBatch(BaseModel):
+    player_id: int
+    deltas: List[HealthDelta] = Field(..., min_length=1, max_length=MAX_HEALTH_BATCH)
+
+    @model_validator(mode="after")
+    def check_sequence_order(self):
+        if any(a.seq >= b.seq for a, b in zip(self.deltas, self.deltas[1:])):
+            raise ValueError("deltas must be in increasing seq order")
+        return self
+
+
 class MatchDefeat(BaseModel):
     player_id: int
 
@@ -18,6 +37,7 @@ class MatchDefeat(BaseModel):
 class MatchResponse(BaseModel):
     match_id: int
     your_health: Optional[int]
+    your_health_seq: int = 0  # Last health batch seq applied; clients number new taps above it
     opponent_health: Optional[int]
     opponent_name: str
     status: str
@@ -39,6 +59,7 @@ class MatchPlayerInfo(BaseModel):
 
 class MatchDetails(BaseModel):
     match_id: int
+    pod: Optional[int] = None
     player1: MatchPlayerInfo
     player2: MatchPlayerInfo
     status: str
@@ -1,12 +1,32 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional, List, Dict, Any, Literal
 from datetime import datetime
 
+# A round robin plays n-1 rounds, so it stays small; Swiss plays ~log2(n)
+# and pods play a small round robin each
+MAX_ROUND_ROBIN_PLAYERS = 20
+MAX_SWISS_PLAYERS = 4096
+
 
 class TournamentCreate(BaseModel):
     name: str = Field(..., min_length=1, max_length=200)
-    max_players: int = Field(..., ge=2, le=20)
+    max_players: int = Field(..., ge=2, le=MAX_SWISS_PLAYERS)
     starting_life: int = Field(default=20, ge=1, le=100)
+    pairing: Literal["round_robin", "swiss", "pods"] = "round_robin"
+    num_rounds: Optional[int] = Field(default=None, ge=1, le=50)  # Swiss only; defaults to ceil(log2(players))
+    pod_size: Optional[int] = Field(default=None, ge=2, le=MAX_ROUND_ROBIN_PLAYERS)  # Pods only; defaults to 8
+
+    @model_validator(mode="after")
+    def check_pairing_limits(self):
+        if self.pairing == "round_robin" and self.max_players > MAX_ROUND_ROBIN_PLAYERS:
+            raise ValueError(
+                f"Round robin allows at most {MAX_ROUND_ROBIN_PLAYERS} players; use Swiss pairing for larger events"
+            )
+        if self.pairing != "swiss" and self.num_rounds is not None:
+            raise ValueError("num_rounds only applies to Swiss pairing")
+        if self.pairing != "pods" and self.pod_size is not None:
+            raise ValueError("pod_size only applies to pod mode")
+        return self
 
 
 class TournamentResponse(BaseModel):
@@ -25,6 +45,7 @@ class TournamentStatus(BaseModel):
     tournament_id: int
     name: str
     status: str
+    pairing: str = "round_robin"
     current_round: int
     total_rounds: int
     players_count: int
@@ -39,6 +60,7 @@ class PlayerStanding(BaseModel):
     wins: int
     losses: int
     points: int
+    pod: Optional[int] = None  # Pod mode: ranks are within the pod
 
 
 class StandingsResponse(BaseModel):
@@ -46,13 +68,14 @@ class StandingsResponse(BaseModel):
 
 
 class MatchSchedule(BaseModel):
-    match_id: int
+    match_id: Optional[int]  # None for rounds not written to the database yet
     player1: str
     player2: str
     winner: Optional[str]
 
 
 class RoundSchedule(BaseModel):
+    pod: Optional[int] = None
     round_number: int
     status: str
     matches: List[MatchSchedule]
@@ -66,3 +89,11 @@ class ScheduleGenerated(BaseModel):
     rounds_created: int
     total_matches: int
     message: str
+
+
+class TournamentChanges(BaseModel):
+    tournament_id: int
+    epoch: str
+    version: int
+    complete: bool
+    changes: List[Dict[str, Any]]
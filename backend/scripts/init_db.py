@@ -8,7 +8,8 @@ import os
 # Add parent directory to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from database.database import init_db, SessionLocal
+from database.database import init_db, engine, SessionLocal
+from database.migrations import current_version
 from models import AdminConfig
 from services.auth import get_password_hash
 from dotenv import load_dotenv
@@ -19,9 +20,11 @@ load_dotenv()
 def main():
     print("Initializing database...")
 
-    # Create all tables
-    init_db()
-    print("✓ Database tables created")
+    # Create tables or migrate an existing database
+    applied = init_db()
+    if applied:
+        print(f"✓ Applied migrations: {', '.join(map(str, applied))}")
+    print(f"✓ Database schema at version {current_version(engine)}")
 
     # Create admin user
     db = SessionLocal()
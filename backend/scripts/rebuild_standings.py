@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Rebuild the materialized standings table from recorded matches.
+
+Usage:
+    python scripts/rebuild_standings.py                  # all tournaments
+    python scripts/rebuild_standings.py --tournament 3   # a single tournament
+
+Reports every player whose stored standings row was missing or out of sync
+with the matches table, so it doubles as a consistency check.
+"""
+import argparse
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.database import init_db, SessionLocal
+from models import Tournament
+from services.standings_service import StandingsService
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild standings from matches")
+    parser.add_argument("--tournament", type=int, help="Only rebuild this tournament ID")
+    args = parser.parse_args()
+
+    # Make sure the standings table exists on older databases
+    init_db()
+
+    db = SessionLocal()
+    try:
+        query = db.query(Tournament.id, Tournament.name)
+        if args.tournament is not None:
+            query = query.filter(Tournament.id == args.tournament)
+        tournaments = query.order_by(Tournament.id).all()
+
+        if not tournaments:
+            print("No tournaments found")
+            return
+
+        total_corrected = 0
+        for tournament_id, name in tournaments:
+            corrected = StandingsService.rebuild(db, tournament_id)
+            total_corrected += len(corrected)
+            if corrected:
+                print(f"✓ {name} (ID {tournament_id}): corrected {len(corrected)} player(s): {corrected}")
+            else:
+                print(f"✓ {name} (ID {tournament_id}): standings consistent")
+
+        print(f"\n✓ Rebuilt {len(tournaments)} tournament(s), {total_corrected} row(s) corrected")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
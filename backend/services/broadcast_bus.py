@@ -0,0 +1,296 @@
+from services.state_version import state_versions
+from services.player_cache import player_views
+from services.live_match_store import live_matches
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional
+import asyncio
+import json
+import os
+import socket
+import tempfile
+
+# "memory" (single worker) or "unix" (several workers on one host)
+BROADCAST_BUS = os.getenv("BROADCAST_BUS", "memory")
+# Directory holding one Unix datagram socket per worker process
+BROADCAST_BUS_PATH = os.getenv(
+    "BROADCAST_BUS_PATH",
+    os.path.join(tempfile.gettempdir(), "mtg-tracker-bus")
+)
+
+Handler = Callable[[dict], Awaitable[None]]
+
+
+class BroadcastBus:
+    """Delivers broadcast messages to this process only.
+
+    The default for a single uvicorn worker. Handlers are registered per
+    message kind and run on the event loop; publish() runs the local handler
+    and hands the message to any other workers (none here).
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        self._handlers: Dict[str, Handler] = {}
+        self.sent = 0
+        self.received = 0
+        self.dropped = 0
+
+    def subscribe(self, kind: str, handler: Handler):
+        """Register the coroutine handling messages of a kind."""
+        self._handlers[kind] = handler
+
+    async def publish(self, kind: str, payload: dict):
+        """Deliver a message in this process and to every other worker."""
+        self.send_to_peers(kind, payload)
+        await self._dispatch(kind, payload)
+
+    def send_to_peers(self, kind: str, payload: dict):
+        """Send a message to the other workers only. Safe from any thread."""
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "peers": 0,
+            "sent": self.sent,
+            "received": self.received,
+            "dropped": self.dropped
+        }
+
+    async def _dispatch(self, kind: str, payload: dict):
+        handler = self._handlers.get(kind)
+        if handler is not None:
+            await handler(payload)
+
+
+class _Peer:
+    """Connected socket to one other worker plus messages waiting to be sent."""
+
+    def __init__(self, address: str):
+        self.address = address
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        self.sock.connect(address)
+        self.pending: Deque[bytes] = deque()
+
+
+class UnixSocketBus(BroadcastBus):
+    """Broadcast bus between worker processes on one host.
+
+    Each worker binds a Unix datagram socket in a shared directory and sends
+    every message to the other sockets found there, so there is no broker to
+    run or lose. Datagrams from one worker to another keep their order; when
+    a peer's receive queue is full, messages wait in a bounded per-peer
+    backlog instead of blocking the sender, and are dropped (and counted)
+    only if that overflows. Sockets of dead workers are removed.
+    """
+
+    name = "unix"
+
+    def __init__(self, path: str, max_backlog: int = 10000):
+        super().__init__()
+        self.path = path
+        self.address = os.path.join(path, f"{os.getpid()}.sock")
+        self.max_backlog = max_backlog
+        self._sock: Optional[socket.socket] = None
+        self._peers: Dict[str, _Peer] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._on_start: Callable[[], None] = lambda: None
+
+    def on_start(self, callback: Callable[[], None]):
+        """Run callback once the socket is bound (e.g. to announce this worker)."""
+        self._on_start = callback
+
+    async def start(self):
+        os.makedirs(self.path, exist_ok=True)
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.bind(self.address)
+        sock.setblocking(False)
+        self._sock = sock
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(sock.fileno(), self._on_readable)
+
+        for name in os.listdir(self.path):
+            if name.endswith(".sock"):
+                self._add_peer(os.path.join(self.path, name))
+        self._on_start()
+
+    async def stop(self):
+        sock, self._sock = self._sock, None
+        if sock is None:
+            return
+        self._loop.remove_reader(sock.fileno())
+        sock.close()
+        for address in list(self._peers):
+            self._remove_peer(address, unlink=False)
+        try:
+            os.unlink(self.address)
+        except FileNotFoundError:
+            pass
+
+    def send_to_peers(self, kind: str, payload: dict):
+        if self._sock is None:
+            return
+        data = json.dumps({"kind": kind, "from": self.address, "payload": payload}).encode()
+        try:
+            on_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self._send(data)
+        else:
+            # Sockets and backlogs are only touched on the loop thread
+            self._loop.call_soon_threadsafe(self._send, data)
+
+    def stats(self) -> dict:
+        return dict(
+            super().stats(),
+            peers=len(self._peers),
+            backlog=sum(len(peer.pending) for peer in self._peers.values())
+        )
+
+    def _send(self, data: bytes):
+        for peer in list(self._peers.values()):
+            if peer.pending:
+                self._queue(peer, data)
+                continue
+            try:
+                peer.sock.send(data)
+                self.sent += 1
+            except BlockingIOError:
+                self._queue(peer, data)
+                self._loop.add_writer(peer.sock.fileno(), self._flush, peer)
+            except (ConnectionRefusedError, FileNotFoundError):
+                self._remove_peer(peer.address)
+            except OSError:
+                # e.g. message too large
+                self.dropped += 1
+
+    def _queue(self, peer: _Peer, data: bytes):
+        if len(peer.pending) >= self.max_backlog:
+            self.dropped += 1
+        else:
+            peer.pending.append(data)
+
+    def _flush(self, peer: _Peer):
+        while peer.pending:
+            try:
+                peer.sock.send(peer.pending[0])
+            except BlockingIOError:
+                return
+            except OSError:
+                self._remove_peer(peer.address)
+                return
+            peer.pending.popleft()
+            self.sent += 1
+        self._loop.remove_writer(peer.sock.fileno())
+
+    def _add_peer(self, address: str):
+        if address == self.address or address in self._peers:
+            return
+        try:
+            self._peers[address] = _Peer(address)
+        except (ConnectionRefusedError, FileNotFoundError):
+            # Socket file left behind by a worker that is gone
+            try:
+                os.unlink(address)
+            except OSError:
+                pass
+
+    def _remove_peer(self, address: str, unlink: bool = True):
+        peer = self._peers.pop(address, None)
+        if peer is None:
+            return
+        self.dropped += len(peer.pending)
+        self._loop.remove_writer(peer.sock.fileno())
+        peer.sock.close()
+        if unlink:
+            # The worker behind this socket is gone
+            try:
+                os.unlink(address)
+            except OSError:
+                pass
+
+    def _on_readable(self):
+        while self._sock is not None:
+            try:
+                data = self._sock.recv(65536)
+            except (BlockingIOError, InterruptedError):
+                return
+            try:
+                message = json.loads(data)
+            except ValueError:
+                continue
+            self.received += 1
+            self._add_peer(message["from"])
+            # Tasks start in creation order, so per-sender ordering is kept
+            self._loop.create_task(self._dispatch(message["kind"], message["payload"]))
+
+
+def _share_state(bus: UnixSocketBus):
+    """Keep state versions, player caches and live match state consistent across workers."""
+
+    def forward_bump(tournament_id: int, version: int, summary_version: Optional[int]):
+        bus.send_to_peers("bump", {
+            "tournament_id": tournament_id,
+            "version": version,
+            "summary_version": summary_version
+        })
+
+    async def on_bump(payload: dict):
+        state_versions.merge_remote(payload["tournament_id"], payload["version"], payload["summary_version"])
+
+    async def on_hello(payload: dict):
+        state_versions.adopt(payload)
+        bus.send_to_peers("sync", state_versions.snapshot())
+
+    async def on_sync(payload: dict):
+        state_versions.adopt(payload)
+
+    async def on_players_changed(payload: dict):
+        player_views.invalidate(payload["tournament_id"], forward=False)
+
+    async def on_live_match_changed(payload: dict):
+        if payload["match_id"] is None:
+            live_matches.discard_tournament(payload["tournament_id"], forward=False)
+        else:
+            live_matches.discard(payload["match_id"], forward=False)
+
+    state_versions.add_forwarder(forward_bump)
+    player_views.add_forwarder(
+        lambda tournament_id: bus.send_to_peers("players_changed", {"tournament_id": tournament_id})
+    )
+    live_matches.add_forwarder(
+        lambda tournament_id, match_id: bus.send_to_peers(
+            "live_match_changed", {"tournament_id": tournament_id, "match_id": match_id}
+        )
+    )
+    bus.subscribe("bump", on_bump)
+    bus.subscribe("hello", on_hello)
+    bus.subscribe("sync", on_sync)
+    bus.subscribe("players_changed", on_players_changed)
+    bus.subscribe("live_match_changed", on_live_match_changed)
+    bus.on_start(lambda: bus.send_to_peers("hello", state_versions.snapshot()))
+
+
+def create_bus(backend: str = BROADCAST_BUS, path: str = BROADCAST_BUS_PATH) -> BroadcastBus:
+    """Build the bus selected by BROADCAST_BUS."""
+    if backend == "memory":
+        return BroadcastBus()
+    if backend == "unix":
+        unix_bus = UnixSocketBus(path)
+        _share_state(unix_bus)
+        return unix_bus
+    raise ValueError(f"Unknown BROADCAST_BUS backend: {backend!r} (expected 'memory' or 'unix')")
+
+
+bus = create_bus()
@@ -0,0 +1,135 @@
+from services.state_version import state_versions
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+import asyncio
+
+
+class ChangeFeed:
+    """Bounded replay buffer of recent change events per tournament.
+
+    Events are the messages sent by the WebSocket broadcast helpers. Each gets
+    a per-tournament sequence number (used as the SSE event ID) and is tagged
+    with the tournament state version current when it was published.
+    Long-poll waiters are woken by state version bumps, including bumps made
+    from worker threads; stream waiters are woken by new events.
+    """
+
+    def __init__(self, max_events: int = 500):
+        self.max_events = max_events
+        self._events: Dict[int, Deque[Tuple[int, int, dict]]] = {}
+        self._sequences: Dict[int, int] = {}
+        self._waiters: Dict[int, asyncio.Event] = {}
+        self._event_waiters: Dict[int, asyncio.Event] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        state_versions.add_listener(self._on_bump)
+
+    def publish(self, tournament_id: int, event: dict):
+        """Record an event for a tournament at its current state version.
+
+        Must be called from the event loop thread.
+        """
+        version = state_versions.get(tournament_id)
+        seq = self._sequences.get(tournament_id, 0) + 1
+        self._sequences[tournament_id] = seq
+        if tournament_id not in self._events:
+            self._events[tournament_id] = deque(maxlen=self.max_events)
+        self._events[tournament_id].append((seq, version, event))
+
+        waiter = self._event_waiters.pop(tournament_id, None)
+        if waiter is not None:
+            waiter.set()
+
+    def last_sequence(self, tournament_id: int) -> int:
+        """Sequence number of the most recent event for a tournament."""
+        return self._sequences.get(tournament_id, 0)
+
+    def events_after(self, tournament_id: int, seq: int) -> Tuple[List[Tuple[int, dict]], bool]:
+        """Return ([(seq, event)] published after seq, complete).
+
+        complete is False if events after seq were already evicted from the
+        buffer, or seq is ahead of the feed (e.g. from a previous process).
+        """
+        last = self.last_sequence(tournament_id)
+        if seq >= last:
+            return [], seq == last
+
+        buffered = self._events.get(tournament_id, ())
+        events = [(event_seq, event) for event_seq, _, event in buffered if event_seq > seq]
+        oldest = buffered[0][0] if buffered else last + 1
+        return events, oldest <= seq + 1
+
+    async def wait_for_events(self, tournament_id: int, seq: int, timeout: float):
+        """Wait until an event newer than seq is published, or timeout."""
+        if self.last_sequence(tournament_id) != seq:
+            return
+        waiter = self._event_waiters.get(tournament_id)
+        if waiter is None:
+            waiter = self._event_waiters[tournament_id] = asyncio.Event()
+        try:
+            await asyncio.wait_for(waiter.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def changes_since(self, tournament_id: int, since: int) -> Tuple[int, List[dict], bool]:
+        """Return (version, events newer than since, complete).
+
+        complete is False when the events do not account for every version in
+        (since, version] - older events were evicted, the change had no event
+        (e.g. a profile edit), or since is from a previous process run - and
+        the client should reload its state instead of applying the events.
+        """
+        version = state_versions.get(tournament_id)
+        if since >= version:
+            return version, [], since == version
+
+        events = [
+            dict(event, version=event_version)
+            for _, event_version, event in self._events.get(tournament_id, ())
+            if event_version > since
+        ]
+        covered = {event["version"] for event in events}
+        return version, events, len(covered) == version - since
+
+    async def wait(self, tournament_id: int, since: int, timeout: float):
+        """Wait until the tournament's version differs from since, or timeout."""
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        deadline = loop.time() + timeout
+
+        while state_versions.get(tournament_id) == since:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            waiter = self._waiters.get(tournament_id)
+            if waiter is None:
+                waiter = self._waiters[tournament_id] = asyncio.Event()
+            try:
+                await asyncio.wait_for(waiter.wait(), remaining)
+            except asyncio.TimeoutError:
+                return
+
+    def discard(self, tournament_id: int):
+        """Forget a tournament's events (e.g. after it is deleted)."""
+        self._events.pop(tournament_id, None)
+
+    def _on_bump(self, tournament_id: int, version: int):
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is loop:
+            self._wake(tournament_id)
+        else:
+            loop.call_soon_threadsafe(self._wake, tournament_id)
+
+    def _wake(self, tournament_id: int):
+        waiter = self._waiters.pop(tournament_id, None)
+        if waiter is not None:
+            waiter.set()
+
+
+change_feed = ChangeFeed()
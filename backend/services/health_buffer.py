@@ -0,0 +1,395 @@
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.orm import Session
+from database.database import SessionLocal
+from models import Match, MatchEvent, Round
+from services.state_version import state_versions
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set, Tuple
+import asyncio
+import os
+import threading
+
+# Keep in-progress health in memory and write it to the database in batches
+HEALTH_WRITE_BEHIND = os.getenv("HEALTH_WRITE_BEHIND", "false").lower() in ("1", "true", "yes")
+# Flush at least this often (ms) ...
+HEALTH_FLUSH_MS = int(os.getenv("HEALTH_FLUSH_MS", "200"))
+# ... or as soon as this many health changes are pending
+HEALTH_FLUSH_EVENTS = int(os.getenv("HEALTH_FLUSH_EVENTS", "100"))
+
+# Match columns every health write reports back, for the live match store
+HEALTH_STATE_FIELDS = ("player1_health", "player2_health", "player1_health_seq", "player2_health_seq", "health_version")
+
+
+@dataclass
+class _LiveHealth:
+    tournament_id: int
+    player1_id: int
+    player2_id: int
+    player1_health: int
+    player2_health: int
+    player1_health_seq: int = 0
+    player2_health_seq: int = 0
+    health_version: int = 0
+
+
+def health_state(source) -> dict:
+    """The HEALTH_STATE_FIELDS of a match, a buffered entry or a RETURNING row."""
+    return {field: getattr(source, field) for field in HEALTH_STATE_FIELDS}
+
+
+def apply_health_changes(health: int, last_seq: int, changes: List[Tuple[int, int]]) -> Tuple[List[Tuple[int, int]], int]:
+    """Apply (seq, health_change) pairs above last_seq in order, each clamped at 0.
+
+    Returns ([(old_health, new_health)] per applied change, last applied seq).
+    Changes at or below last_seq were applied by an earlier batch and are
+    skipped, so replaying a batch changes nothing.
+    """
+    applied = []
+    for seq, health_change in changes:
+        if seq <= last_seq:
+            continue
+        new_health = max(0, health + health_change)
+        applied.append((health, new_health))
+        health, last_seq = new_health, seq
+    return applied, last_seq
+
+
+class HealthWriteBehind:
+    """Write-behind buffer for health changes of in-progress matches.
+
+    While enabled, the in-memory health of a tracked match is authoritative:
+    update_health changes it and queues the MatchEvent without touching the
+    database, and reads overlay it on the stored values. Pending changes are
+    written as one batched INSERT into match_events plus one UPDATE per
+    changed match, in a single commit, every HEALTH_FLUSH_MS or
+    HEALTH_FLUSH_EVENTS changes, before any match result is recorded, and on
+    shutdown.
+
+    Crash safety: health changes acknowledged since the last flush (at most
+    HEALTH_FLUSH_MS or HEALTH_FLUSH_EVENTS of them) are lost if the process
+    dies; the match then resumes from the last flushed health. Match results
+    are never lost, because pending changes are flushed before a result is
+    committed. The store is per process, so it requires a single worker.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = HEALTH_WRITE_BEHIND,
+        session_factory: Callable[[], Session] = SessionLocal,
+        flush_ms: int = HEALTH_FLUSH_MS,
+        flush_events: int = HEALTH_FLUSH_EVENTS
+    ):
+        self.enabled = enabled
+        self.session_factory = session_factory
+        self.flush_ms = flush_ms
+        self.flush_events = flush_events
+        self._matches: Dict[int, _LiveHealth] = {}
+        self._pending: List[dict] = []
+        self._dirty: Dict[int, _LiveHealth] = {}
+        # Matches whose result is being recorded; never tracked again. Pruned
+        # (see prune_ended) once the result is committed.
+        self._ended: Set[int] = set()
+        self._ended_committed: Set[int] = set()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self.flushes = 0
+        self.events_flushed = 0
+
+    def update_health(self, match_id: int, player_id: int, health_change: int) -> dict:
+        """Apply a health change in memory; same result as MatchService.update_health."""
+        live = self._matches.get(match_id) or self._load(match_id)
+
+        with self._lock:
+            if self._matches.get(match_id) is not live:
+                raise ValueError("Match is not in progress")
+            if live.player1_id == player_id:
+                old_health = live.player1_health
+                live.player1_health = new_health = max(0, old_health + health_change)
+            elif live.player2_id == player_id:
+                old_health = live.player2_health
+                live.player2_health = new_health = max(0, old_health + health_change)
+            else:
+                raise ValueError("Player not in this match")
+            live.health_version += 1
+            state = health_state(live)
+
+            self._pending.append({
+                "match_id": match_id,
+                "player_id": player_id,
+                "event_type": "health_change",
+                "old_value": old_health,
+                "new_value": new_health,
+                "timestamp": datetime.utcnow()
+            })
+            self._dirty[match_id] = live
+            flush_now = len(self._pending) >= self.flush_events
+
+        # Readers overlay the in-memory health, so the new version is visible now
+        state_versions.bump(live.tournament_id)
+        if flush_now:
+            self._request_flush()
+
+        return {
+            "new_health": new_health,
+            "opponent_health": None,  # Players don't see opponent health
+            "tournament_id": live.tournament_id,
+            "health_state": state
+        }
+
+    def update_health_batch(self, match_id: int, player_id: int, changes: List[Tuple[int, int]]) -> dict:
+        """Apply (seq, health_change) pairs in memory; same result as MatchService.update_health_batch."""
+        live = self._matches.get(match_id) or self._load(match_id)
+
+        with self._lock:
+            if self._matches.get(match_id) is not live:
+                raise ValueError("Match is not in progress")
+            if live.player1_id == player_id:
+                applied, last_seq = apply_health_changes(live.player1_health, live.player1_health_seq, changes)
+                live.player1_health_seq = last_seq
+                if applied:
+                    live.player1_health = applied[-1][1]
+                new_health = live.player1_health
+            elif live.player2_id == player_id:
+                applied, last_seq = apply_health_changes(live.player2_health, live.player2_health_seq, changes)
+                live.player2_health_seq = last_seq
+                if applied:
+                    live.player2_health = applied[-1][1]
+                new_health = live.player2_health
+            else:
+                raise ValueError("Player not in this match")
+
+            if applied:
+                live.health_version += 1
+            state = health_state(live)
+
+            now = datetime.utcnow()
+            self._pending.extend({
+                "match_id": match_id,
+                "player_id": player_id,
+                "event_type": "health_change",
+                "old_value": old_health,
+                "new_value": changed_health,
+                "timestamp": now
+            } for old_health, changed_health in applied)
+            if applied:
+                self._dirty[match_id] = live
+            flush_now = len(self._pending) >= self.flush_events
+
+        if applied:
+            state_versions.bump(live.tournament_id)
+        if flush_now:
+            self._request_flush()
+
+        return {
+            "new_health": new_health,
+            "opponent_health": None,  # Players don't see opponent health
+            "applied": len(applied),
+            "last_seq": last_seq,
+            "tournament_id": live.tournament_id,
+            "health_state": state
+        }
+
+    def current_health(self, match: Match) -> Tuple[Optional[int], Optional[int]]:
+        """(player1_health, player2_health) for a match, preferring live values."""
+        live = self._matches.get(match.id)
+        if live is None:
+            return match.player1_health, match.player2_health
+        return live.player1_health, live.player2_health
+
+    def current_health_state(self, match: Match) -> dict:
+        """health_state of a match, preferring live values."""
+        with self._lock:
+            return health_state(self._matches.get(match.id) or match)
+
+    def flush(self) -> int:
+        """Write pending health changes in one transaction; returns how many.
+
+        Changes for matches deleted meanwhile are dropped, not retried.
+        """
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                events, self._pending = self._pending, []
+                dirty, self._dirty = self._dirty, {}
+
+            db = self.session_factory()
+            try:
+                existing = set(db.execute(select(Match.id).where(Match.id.in_(dirty))).scalars())
+                events = [event for event in events if event["match_id"] in existing]
+                with self._lock:
+                    healths = [
+                        {"match_id": match_id, **health_state(live)}
+                        for match_id, live in dirty.items()
+                        if match_id in existing
+                    ]
+                if events:
+                    db.execute(insert(MatchEvent), events)
+                    # Core executemany: a row deleted after the check above is skipped, not an error
+                    matches = Match.__table__
+                    db.execute(update(matches).where(matches.c.id == bindparam("match_id")), healths)
+                db.commit()
+            except Exception:
+                db.rollback()
+                # Put the changes back so the next flush retries them
+                with self._lock:
+                    self._pending[:0] = events
+                    for match_id, live in dirty.items():
+                        self._dirty.setdefault(match_id, live)
+                raise
+            finally:
+                db.close()
+
+            self.flushes += 1
+            self.events_flushed += len(events)
+            return len(events)
+
+    def end_match(self, match_id: int):
+        """Flush pending changes and stop tracking a match that is ending.
+
+        Called once the result is validated and before it is committed, so
+        the result never lands without the health history that led to it.
+        Health changes arriving afterwards are rejected. If the flush fails
+        the error propagates, so the result is not committed, and the match
+        stays live.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._ended.add(match_id)
+            live = self._matches.pop(match_id, None)
+        try:
+            self.flush()
+        except Exception:
+            with self._lock:
+                self._ended.discard(match_id)
+                if live is not None:
+                    self._matches.setdefault(match_id, live)
+            raise
+
+    def discard_tournament(self, tournament_id: int):
+        """Drop live health and pending changes of a deleted tournament."""
+        # The flush lock keeps an in-flight flush from putting them back
+        with self._flush_lock, self._lock:
+            match_ids = {
+                match_id
+                for tracked in (self._matches, self._dirty)
+                for match_id, live in tracked.items()
+                if live.tournament_id == tournament_id
+            }
+            for match_id in match_ids:
+                self._matches.pop(match_id, None)
+                self._dirty.pop(match_id, None)
+            self._pending = [event for event in self._pending if event["match_id"] not in match_ids]
+
+    def prune_ended(self):
+        """Forget ended matches whose result is committed (or that were deleted)."""
+        with self._lock:
+            ended = set(self._ended)
+        if not ended:
+            return
+        db = self.session_factory()
+        try:
+            live = set(db.execute(
+                select(Match.id).where(Match.id.in_(ended), Match.status == "in_progress")
+            ).scalars())
+        finally:
+            db.close()
+        with self._lock:
+            # A load that read the match just before its result committed
+            # checks _ended after its query; keeping ids one more pass covers it
+            committed = ended - live
+            self._ended -= committed & self._ended_committed
+            self._ended_committed = committed
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "tracked_matches": len(self._matches),
+            "ended_matches": len(self._ended),
+            "pending_events": len(self._pending),
+            "flushes": self.flushes,
+            "events_flushed": self.events_flushed
+        }
+
+    async def start(self):
+        """Start the periodic flusher on the running event loop."""
+        if not self.enabled or self._task is not None:
+            return
+        # Imported here: the broadcast bus imports the live match store, which imports this module
+        from services.broadcast_bus import BROADCAST_BUS
+        if BROADCAST_BUS != "memory":
+            raise RuntimeError("HEALTH_WRITE_BEHIND keeps health in one process; it cannot run with BROADCAST_BUS=unix")
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flusher and write whatever is still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.enabled:
+            await asyncio.to_thread(self.flush)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_ms / 1000)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await asyncio.to_thread(self.flush)
+                await asyncio.to_thread(self.prune_ended)
+            except Exception as e:
+                print(f"Health write-behind flush failed, retrying: {e}")
+
+    def _request_flush(self):
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            # No flusher running (scripts, benchmarks): flush inline
+            self.flush()
+            return
+        loop.call_soon_threadsafe(self._wake.set)
+
+    def _load(self, match_id: int) -> _LiveHealth:
+        db = self.session_factory()
+        try:
+            row = db.query(Match, Round.tournament_id).join(Round, Match.round_id == Round.id).filter(
+                Match.id == match_id
+            ).first()
+        finally:
+            db.close()
+        if not row:
+            raise ValueError("Match not found")
+        match, tournament_id = row
+        if match.status != "in_progress":
+            raise ValueError("Match is not in progress")
+
+        live = _LiveHealth(
+            tournament_id=tournament_id,
+            player1_id=match.player1_id,
+            player2_id=match.player2_id,
+            player1_health=match.player1_health,
+            player2_health=match.player2_health,
+            player1_health_seq=match.player1_health_seq,
+            player2_health_seq=match.player2_health_seq,
+            health_version=match.health_version
+        )
+        with self._lock:
+            if match_id in self._ended:
+                raise ValueError("Match is not in progress")
+            # Another request may have loaded it first
+            return self._matches.setdefault(match_id, live)
+
+
+health_buffer = HealthWriteBehind()
@@ -0,0 +1,175 @@
+from sqlalchemy.orm import Session
+from models import Match, Round
+from services.health_buffer import HEALTH_STATE_FIELDS, health_buffer
+from services.player_cache import player_views
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+import threading
+
+
+@dataclass
+class LiveMatch:
+    """State of a pending or in-progress match as shown to its players."""
+    match_id: int
+    tournament_id: int
+    player1_id: int
+    player2_id: int
+    player1_name: str
+    player2_name: str
+    player1_health: Optional[int]
+    player2_health: Optional[int]
+    status: str
+    # Last health batch seq applied per player, so a client can resume numbering
+    player1_health_seq: int = 0
+    player2_health_seq: int = 0
+    # Match.health_version the health fields above are from
+    health_version: int = 0
+
+    def state_for(self, player_id: int) -> dict:
+        """The GET /api/matches/{id}/state payload for one of the players."""
+        if player_id == self.player1_id:
+            your_health, opponent_health, opponent_name = self.player1_health, self.player2_health, self.player2_name
+            your_health_seq = self.player1_health_seq
+        elif player_id == self.player2_id:
+            your_health, opponent_health, opponent_name = self.player2_health, self.player1_health, self.player1_name
+            your_health_seq = self.player2_health_seq
+        else:
+            raise ValueError("Player not in this match")
+        return {
+            "match_id": self.match_id,
+            "your_health": your_health,
+            "your_health_seq": your_health_seq,
+            "opponent_health": opponent_health,
+            "opponent_name": opponent_name,
+            "status": self.status
+        }
+
+
+class LiveMatchStore:
+    """In-process registry of live match state, keyed by match ID.
+
+    Filled when a player joins a match and kept current by health updates,
+    so polling a live match's state needs no SQL. A miss loads the match
+    once from the database. Health patches carry the match's health_version
+    and only a newer one is applied, since requests finish in any order.
+    A defeat or any change made elsewhere (admin results, profile edits,
+    deleted tournaments) discards the entry instead of patching it, so
+    finished matches are read from the database; discards are forwarded to
+    other worker processes.
+    """
+
+    def __init__(self):
+        self._matches: Dict[int, LiveMatch] = {}
+        self._forwarders: List[Callable[[int, Optional[int]], None]] = []
+        # Bumped on every change, so a load racing with a change is not cached
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_state(self, db: Session, match_id: int, player_id: int) -> Optional[dict]:
+        """State payload for a player, or None if the match does not exist."""
+        live = self._matches.get(match_id)
+        if live is None:
+            self.misses += 1
+            live = self.load(db, match_id)
+            if live is None:
+                return None
+        else:
+            self.hits += 1
+        return live.state_for(player_id)
+
+    def load(self, db: Session, match_id: int) -> Optional[LiveMatch]:
+        """Build the entry for a match from the database and cache it if live."""
+        generation = self._generation
+        row = db.query(Match, Round.tournament_id).join(Round, Match.round_id == Round.id).filter(
+            Match.id == match_id
+        ).first()
+        if not row:
+            return None
+        match, tournament_id = row
+        live = self._build(db, match, tournament_id)
+        if match.status != "completed":
+            with self._lock:
+                if generation == self._generation:
+                    self._matches[match_id] = live
+        return live
+
+    def track(self, db: Session, match: Match, tournament_id: int) -> LiveMatch:
+        """Start tracking a match the caller has just changed and committed."""
+        live = self._build(db, match, tournament_id)
+        with self._lock:
+            self._generation += 1
+            current = self._matches.get(match.id)
+            if current is not None and current.health_version > live.health_version:
+                # A health update committed after the caller read the match
+                for field in HEALTH_STATE_FIELDS:
+                    setattr(live, field, getattr(current, field))
+            self._matches[match.id] = live
+        self._forward(tournament_id, match.id)
+        return live
+
+    def update_health(self, match_id: int, state: dict):
+        """Record a committed health write; state is its health_state.
+
+        Ignored if the entry already holds the same or a newer version.
+        """
+        with self._lock:
+            self._generation += 1
+            live = self._matches.get(match_id)
+            if live is not None and state["health_version"] > live.health_version:
+                for field, value in state.items():
+                    setattr(live, field, value)
+        if live is not None:
+            self._forward(live.tournament_id, match_id)
+
+    def discard(self, match_id: int, forward: bool = True):
+        with self._lock:
+            self._generation += 1
+            live = self._matches.pop(match_id, None)
+        if forward and live is not None:
+            self._forward(live.tournament_id, match_id)
+
+    def discard_tournament(self, tournament_id: int, forward: bool = True):
+        """Drop every entry of a tournament (player renamed, tournament deleted)."""
+        with self._lock:
+            self._generation += 1
+            for match_id in [mid for mid, live in self._matches.items() if live.tournament_id == tournament_id]:
+                del self._matches[match_id]
+        if forward:
+            self._forward(tournament_id, None)
+
+    def add_forwarder(self, callback: Callable[[int, Optional[int]], None]):
+        """Register callback(tournament_id, match_id), called on every local change.
+
+        match_id is None when the whole tournament was discarded.
+        """
+        self._forwarders.append(callback)
+
+    def stats(self) -> dict:
+        return {
+            "tracked_matches": len(self._matches),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+    def _forward(self, tournament_id: int, match_id: Optional[int]):
+        for callback in self._forwarders:
+            callback(tournament_id, match_id)
+
+    @staticmethod
+    def _build(db: Session, match: Match, tournament_id: int) -> LiveMatch:
+        players = player_views.get_players(db, tournament_id, (match.player1_id, match.player2_id))
+        return LiveMatch(
+            match_id=match.id,
+            tournament_id=tournament_id,
+            player1_id=match.player1_id,
+            player2_id=match.player2_id,
+            player1_name=players[match.player1_id].name,
+            player2_name=players[match.player2_id].name,
+            status=match.status,
+            **health_buffer.current_health_state(match)
+        )
+
+
+live_matches = LiveMatchStore()
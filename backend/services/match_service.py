@@ -1,7 +1,14 @@
+from sqlalchemy import and_, case, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from models import Match, MatchEvent, Round, Tournament
+from services.standings_service import StandingsService
+from services.health_buffer import HEALTH_STATE_FIELDS, apply_health_changes, health_buffer, health_state
+from services.live_match_store import live_matches
+from services.state_version import state_versions
 from datetime import datetime
-from typing import Optional
+import asyncio
+from typing import List, Optional, Tuple
 
 
 class MatchService:
@@ -20,8 +27,10 @@ class MatchService:
         # Initialize health if not set
         if match.player1_id == player_id and match.player1_health is None:
             match.player1_health = starting_life
+            match.health_version = Match.health_version + 1
         elif match.player2_id == player_id and match.player2_health is None:
             match.player2_health = starting_life
+            match.health_version = Match.health_version + 1
 
         # Only change to "in_progress" when BOTH players have joined (both health values set)
         if match.status == "pending" and match.player1_health is not None and match.player2_health is not None:
@@ -37,58 +46,340 @@ class MatchService:
         )
         db.add(event)
 
+        tournament_id = match.round.tournament_id
         db.commit()
+        state_versions.bump(tournament_id)
         db.refresh(match)
+        live_matches.track(db, match, tournament_id)
         return match
 
     @staticmethod
-    def update_health(db: Session, match_id: int, player_id: int, health_change: int) -> dict:
-        """Update player health in match."""
-        match = MatchService.get_match(db, match_id)
-        if not match:
-            raise ValueError("Match not found")
+    def _increment_health(match_id: int, player_id: int, health_change: int):
+        """UPDATE adding health_change to the player's health in the database.
+
+        The addition happens in SQL, so concurrent changes to one match add
+        up instead of overwriting each other. It only matches while the
+        result stays at or above 0, so the old value is new - change; a
+        change that would go below 0 goes through _set_health_if_unchanged.
+        Returns (new_health, tournament_id, *HEALTH_STATE_FIELDS).
+        """
+        is_player1 = Match.player1_id == player_id
+        is_player2 = Match.player2_id == player_id
+        return update(Match).where(
+            Match.id == match_id,
+            Match.status == "in_progress",
+            or_(
+                and_(is_player1, Match.player1_health + health_change >= 0),
+                and_(is_player2, Match.player2_health + health_change >= 0)
+            )
+        ).values(
+            player1_health=case((is_player1, Match.player1_health + health_change), else_=Match.player1_health),
+            player2_health=case((is_player2, Match.player2_health + health_change), else_=Match.player2_health),
+            health_version=Match.health_version + 1
+        ).returning(
+            case((is_player1, Match.player1_health), else_=Match.player2_health).label("new_health"),
+            MatchService._tournament_id_of_match().label("tournament_id"),
+            *MatchService._health_state_columns()
+        ).execution_options(synchronize_session=False)
 
-        if match.status != "in_progress":
+    @staticmethod
+    def _set_health_if_unchanged(match_id: int, player1: bool, old_health: int, new_health: int):
+        """UPDATE setting a player's health only if it still reads old_health.
+
+        Compare-and-set for changes clamped at 0; returns (tournament_id,
+        *HEALTH_STATE_FIELDS), or no row if another change got in first.
+        """
+        column = Match.player1_health if player1 else Match.player2_health
+        return update(Match).where(
+            Match.id == match_id,
+            Match.status == "in_progress",
+            column == old_health
+        ).values({column.key: new_health, "health_version": Match.health_version + 1}).returning(
+            MatchService._tournament_id_of_match().label("tournament_id"),
+            *MatchService._health_state_columns()
+        ).execution_options(synchronize_session=False)
+
+    @staticmethod
+    def _health_state_columns():
+        return [getattr(Match, field) for field in HEALTH_STATE_FIELDS]
+
+    @staticmethod
+    def _tournament_id_of_match():
+        return select(Round.tournament_id).where(Round.id == Match.round_id).scalar_subquery()
+
+    @staticmethod
+    def _health_row(match_id: int):
+        return select(
+            Match.status, Match.player1_id, Match.player2_id, Match.player1_health, Match.player2_health,
+            Match.player1_health_seq, Match.player2_health_seq,
+            MatchService._tournament_id_of_match().label("tournament_id")
+        ).where(Match.id == match_id)
+
+    @staticmethod
+    def _player_health(row, player_id: int) -> Tuple[bool, int, int]:
+        """(player1, health, last batch seq) of a player from a _health_row row."""
+        if not row:
+            raise ValueError("Match not found")
+        if row.status != "in_progress":
             raise ValueError("Match is not in progress")
+        if row.player1_id == player_id:
+            return True, row.player1_health, row.player1_health_seq
+        if row.player2_id == player_id:
+            return False, row.player2_health, row.player2_health_seq
+        raise ValueError("Player not in this match")
 
-        old_health = None
-        new_health = None
-
-        if match.player1_id == player_id:
-            old_health = match.player1_health
-            new_health = max(0, match.player1_health + health_change)
-            match.player1_health = new_health
-        elif match.player2_id == player_id:
-            old_health = match.player2_health
-            new_health = max(0, match.player2_health + health_change)
-            match.player2_health = new_health
-        else:
-            raise ValueError("Player not in this match")
+    @staticmethod
+    def _clamped_change(row, player_id: int, health_change: int) -> Optional[Tuple[bool, int]]:
+        """Check why the increment matched no row; returns (player1, old_health).
 
-        # Log health change event
-        event = MatchEvent(
+        Returns None if the change no longer goes below 0 (another change
+        raised the health meanwhile) and the increment should be retried.
+        """
+        player1, old_health, _ = MatchService._player_health(row, player_id)
+        if old_health + health_change >= 0:
+            return None
+        return player1, old_health
+
+    @staticmethod
+    def _apply_batch_if_unchanged(match_id: int, player1: bool, old_health: int, old_seq: int,
+                                  new_health: int, new_seq: int):
+        """UPDATE writing a batch's result only if health and seq are as read.
+
+        The seq check makes a replayed batch that raced with its original a
+        no-op; the health check catches single changes made meanwhile.
+        Returns the HEALTH_STATE_FIELDS, or no row if the match changed.
+        """
+        health = Match.player1_health if player1 else Match.player2_health
+        seq = Match.player1_health_seq if player1 else Match.player2_health_seq
+        return update(Match).where(
+            Match.id == match_id,
+            Match.status == "in_progress",
+            health == old_health,
+            seq == old_seq
+        ).values({
+            health.key: new_health,
+            seq.key: new_seq,
+            "health_version": Match.health_version + 1
+        }).returning(*MatchService._health_state_columns()).execution_options(synchronize_session=False)
+
+    @staticmethod
+    def _batch_events(match_id: int, player_id: int, applied: List[Tuple[int, int]]) -> List[dict]:
+        return [
+            {
+                "match_id": match_id,
+                "player_id": player_id,
+                "event_type": "health_change",
+                "old_value": old_health,
+                "new_value": new_health
+            }
+            for old_health, new_health in applied
+        ]
+
+    @staticmethod
+    def _health_event(match_id: int, player_id: int, old_health: int, new_health: int) -> MatchEvent:
+        return MatchEvent(
             match_id=match_id,
             player_id=player_id,
             event_type="health_change",
             old_value=old_health,
             new_value=new_health
         )
-        db.add(event)
 
+    @staticmethod
+    def _change_health(db: Session, match_id: int, player_id: int, health_change: int) -> Tuple[int, int, int, dict]:
+        """Apply a health change in the database.
+
+        Returns (old, new, tournament_id, health_state of the write).
+
+        No lock is taken on the match: the increment is atomic, and a clamped
+        change retries only if another change to the same health won the
+        compare-and-set, so some request always makes progress.
+        """
+        while True:
+            row = db.execute(MatchService._increment_health(match_id, player_id, health_change)).first()
+            if row:
+                return row.new_health - health_change, row.new_health, row.tournament_id, health_state(row)
+            clamped = MatchService._clamped_change(
+                db.execute(MatchService._health_row(match_id)).first(), player_id, health_change
+            )
+            if clamped is None:
+                continue
+            player1, old_health = clamped
+            row = db.execute(MatchService._set_health_if_unchanged(match_id, player1, old_health, 0)).first()
+            if row:
+                return old_health, 0, row.tournament_id, health_state(row)
+
+    @staticmethod
+    async def _change_health_async(
+        db: AsyncSession, match_id: int, player_id: int, health_change: int
+    ) -> Tuple[int, int, int, dict]:
+        """_change_health on an AsyncSession."""
+        while True:
+            row = (await db.execute(MatchService._increment_health(match_id, player_id, health_change))).first()
+            if row:
+                return row.new_health - health_change, row.new_health, row.tournament_id, health_state(row)
+            clamped = MatchService._clamped_change(
+                (await db.execute(MatchService._health_row(match_id))).first(), player_id, health_change
+            )
+            if clamped is None:
+                continue
+            player1, old_health = clamped
+            row = (await db.execute(
+                MatchService._set_health_if_unchanged(match_id, player1, old_health, 0)
+            )).first()
+            if row:
+                return old_health, 0, row.tournament_id, health_state(row)
+
+    @staticmethod
+    def update_health(db: Session, match_id: int, player_id: int, health_change: int) -> dict:
+        """Update player health in match."""
+        if health_buffer.enabled:
+            result = health_buffer.update_health(match_id, player_id, health_change)
+            live_matches.update_health(match_id, result.pop("health_state"))
+            return result
+
+        old_health, new_health, tournament_id, state = MatchService._change_health(
+            db, match_id, player_id, health_change
+        )
+        db.add(MatchService._health_event(match_id, player_id, old_health, new_health))
         db.commit()
+        state_versions.bump(tournament_id)
+        live_matches.update_health(match_id, state)
 
         return {
             "new_health": new_health,
-            "opponent_health": None  # Players don't see opponent health
+            "opponent_health": None,  # Players don't see opponent health
+            "tournament_id": tournament_id
         }
 
     @staticmethod
-    def confirm_defeat(db: Session, match_id: int, loser_id: int) -> dict:
-        """Player confirms defeat (health reached 0)."""
-        match = MatchService.get_match(db, match_id)
-        if not match:
+    def update_health_batch(db: Session, match_id: int, player_id: int, changes: List[Tuple[int, int]]) -> dict:
+        """Apply a player's buffered (seq, health_change) taps in one transaction.
+
+        Taps at or below the player's last applied seq are skipped, so a
+        replayed batch changes nothing. The new health, seq and one event per
+        tap are written with a compare-and-set, retried if another change to
+        the same health got in first.
+        """
+        if health_buffer.enabled:
+            result = health_buffer.update_health_batch(match_id, player_id, changes)
+            state = result.pop("health_state")
+            if result["applied"]:
+                live_matches.update_health(match_id, state)
+            return result
+
+        while True:
+            row = db.execute(MatchService._health_row(match_id)).first()
+            player1, health, last_seq = MatchService._player_health(row, player_id)
+            applied, new_seq = apply_health_changes(health, last_seq, changes)
+            if not applied:
+                # A replay; ends the transaction a lost compare-and-set opened
+                db.rollback()
+                break
+            new_health = applied[-1][1]
+            written = db.execute(MatchService._apply_batch_if_unchanged(
+                match_id, player1, health, last_seq, new_health, new_seq
+            )).first()
+            if written:
+                db.execute(insert(MatchEvent), MatchService._batch_events(match_id, player_id, applied))
+                db.commit()
+                state_versions.bump(row.tournament_id)
+                live_matches.update_health(match_id, health_state(written))
+                health, last_seq = new_health, new_seq
+                break
+
+        return {
+            "new_health": health,
+            "opponent_health": None,  # Players don't see opponent health
+            "applied": len(applied),
+            "last_seq": last_seq,
+            "tournament_id": row.tournament_id
+        }
+
+    @staticmethod
+    async def update_health_batch_async(
+        db: AsyncSession, match_id: int, player_id: int, changes: List[Tuple[int, int]]
+    ) -> dict:
+        """update_health_batch on an AsyncSession."""
+        if health_buffer.enabled:
+            result = health_buffer.update_health_batch(match_id, player_id, changes)
+            state = result.pop("health_state")
+            if result["applied"]:
+                live_matches.update_health(match_id, state)
+            return result
+
+        while True:
+            row = (await db.execute(MatchService._health_row(match_id))).first()
+            player1, health, last_seq = MatchService._player_health(row, player_id)
+            applied, new_seq = apply_health_changes(health, last_seq, changes)
+            if not applied:
+                await db.rollback()
+                break
+            new_health = applied[-1][1]
+            written = (await db.execute(MatchService._apply_batch_if_unchanged(
+                match_id, player1, health, last_seq, new_health, new_seq
+            ))).first()
+            if written:
+                await db.execute(insert(MatchEvent), MatchService._batch_events(match_id, player_id, applied))
+                await db.commit()
+                state_versions.bump(row.tournament_id)
+                live_matches.update_health(match_id, health_state(written))
+                health, last_seq = new_health, new_seq
+                break
+
+        return {
+            "new_health": health,
+            "opponent_health": None,  # Players don't see opponent health
+            "applied": len(applied),
+            "last_seq": last_seq,
+            "tournament_id": row.tournament_id
+        }
+
+    @staticmethod
+    async def _get_match_with_tournament(db: AsyncSession, match_id: int) -> Tuple[Match, int]:
+        """Load a match and its tournament ID in one query (AsyncSession).
+
+        Takes no row lock: completing the match goes through the guarded
+        UPDATEs of _completion_statements, which only one request can win.
+        """
+        row = (await db.execute(
+            select(Match, Round.tournament_id)
+            .join(Round, Match.round_id == Round.id)
+            .where(Match.id == match_id)
+        )).first()
+        if not row:
             raise ValueError("Match not found")
+        return row[0], row[1]
+
+    @staticmethod
+    async def update_health_async(db: AsyncSession, match_id: int, player_id: int, health_change: int) -> dict:
+        """update_health on an AsyncSession.
+
+        Every round-trip, including the commit, is awaited, so a slow fsync
+        or network hop does not stall the event loop.
+        """
+        if health_buffer.enabled:
+            result = health_buffer.update_health(match_id, player_id, health_change)
+            live_matches.update_health(match_id, result.pop("health_state"))
+            return result
+
+        old_health, new_health, tournament_id, state = await MatchService._change_health_async(
+            db, match_id, player_id, health_change
+        )
+        db.add(MatchService._health_event(match_id, player_id, old_health, new_health))
+        await db.commit()
+        state_versions.bump(tournament_id)
+        live_matches.update_health(match_id, state)
 
+        return {
+            "new_health": new_health,
+            "opponent_health": None,  # Players don't see opponent health
+            "tournament_id": tournament_id
+        }
+
+    @staticmethod
+    def _apply_defeat(match: Match, loser_id: int) -> MatchEvent:
+        """Complete a loaded match against loser_id; returns the event to log."""
         if match.status != "in_progress":
             raise ValueError("Match is not in progress")
 
@@ -104,43 +395,133 @@ class MatchService:
         match.completed_at = datetime.utcnow()
 
         # Log match end event
-        event = MatchEvent(
-            match_id=match_id,
+        return MatchEvent(
+            match_id=match.id,
             player_id=loser_id,
             event_type="match_end",
             new_value=0
         )
+
+    @staticmethod
+    def _completion_statements(match: Match):
+        """Guarded UPDATEs that count a match's completion exactly once.
+
+        The first marks the match completed only if it was not already, so
+        two requests finishing the same match cannot both count it. The
+        second takes one off its round's remaining matches and returns the
+        new count: whichever completion sees 0 advances the round, without a
+        COUNT over the round's matches.
+        """
+        claim = update(Match).where(
+            Match.id == match.id,
+            Match.status != "completed"
+        ).values(status="completed").execution_options(synchronize_session=False)
+        count_off = update(Round).where(
+            Round.id == match.round_id,
+            Round.remaining_matches > 0
+        ).values(
+            remaining_matches=Round.remaining_matches - 1
+        ).returning(Round.remaining_matches).execution_options(synchronize_session=False)
+        return claim, count_off
+
+    @staticmethod
+    def _record_completion(db: Session, match: Match) -> Optional[int]:
+        """Count a match's completion off its round; returns the matches left.
+
+        Raises ValueError if another request completed the match first.
+        """
+        claim, count_off = MatchService._completion_statements(match)
+        if db.execute(claim).rowcount == 0:
+            raise ValueError("Match is not in progress")
+        return db.execute(count_off).scalar()
+
+    @staticmethod
+    def confirm_defeat(db: Session, match_id: int, loser_id: int) -> dict:
+        """Player confirms defeat (health reached 0)."""
+        match = MatchService.get_match(db, match_id)
+        if not match:
+            raise ValueError("Match not found")
+
+        event = MatchService._apply_defeat(match, loser_id)
+        # Flush buffered health first: it writes on its own connection
+        health_buffer.end_match(match_id)
+        remaining_matches = MatchService._record_completion(db, match)
+        StandingsService.record_result(db, match)
         db.add(event)
 
+        tournament_id = match.round.tournament_id
         db.commit()
+        state_versions.bump(tournament_id)
+        live_matches.discard(match_id)
 
-        # Check if all matches in round are complete
-        round_info = MatchService.check_round_completion(db, match.round_id)
+        # Advance if this was the round's last match
+        round_info = MatchService.check_round_completion(db, match.round_id, remaining_matches)
 
         return {
             "match_id": match_id,
             "winner_id": match.winner_id,
             "status": "completed",
-            "round_info": round_info
+            "round_info": round_info,
+            "tournament_id": tournament_id
         }
 
     @staticmethod
-    def check_round_completion(db: Session, round_id: int) -> dict:
-        """Check if all matches in a round are complete and auto-advance if needed.
+    async def confirm_defeat_async(db: AsyncSession, match_id: int, loser_id: int) -> dict:
+        """confirm_defeat on an AsyncSession.
+
+        Standings and round advancement reuse the sync services through
+        run_sync, which still awaits their database I/O.
+        """
+        match, tournament_id = await MatchService._get_match_with_tournament(db, match_id)
+
+        event = MatchService._apply_defeat(match, loser_id)
+        await asyncio.to_thread(health_buffer.end_match, match_id)
+        claim, count_off = MatchService._completion_statements(match)
+        if (await db.execute(claim)).rowcount == 0:
+            raise ValueError("Match is not in progress")
+        remaining_matches = (await db.execute(count_off)).scalar()
+        await db.run_sync(StandingsService.record_result, match)
+        db.add(event)
+
+        await db.commit()
+        state_versions.bump(tournament_id)
+        live_matches.discard(match_id)
+
+        # Advance if this was the round's last match
+        round_info = await db.run_sync(MatchService.check_round_completion, match.round_id, remaining_matches)
+
+        return {
+            "match_id": match_id,
+            "winner_id": match.winner_id,
+            "status": "completed",
+            "round_info": round_info,
+            "tournament_id": tournament_id
+        }
+
+    @staticmethod
+    def check_round_completion(db: Session, round_id: int, remaining_matches: Optional[int]) -> dict:
+        """Auto-advance once the last match of a round has completed.
+
+        remaining_matches is what the completion's guarded decrement returned
+        (see _completion_statements), so exactly one completion per round
+        sees 0, even when the last defeats land at the same time. In pod mode
+        only the round's pod advances.
         Returns info about round advancement for broadcasting."""
-        round_obj = db.query(Round).filter(Round.id == round_id).first()
-        if not round_obj:
+        if remaining_matches != 0:
             return {"round_completed": False}
 
-        # Count incomplete matches
-        incomplete_matches = db.query(Match).filter(
-            Match.round_id == round_id,
-            Match.status != "completed"
-        ).count()
-
-        if incomplete_matches == 0:
+        round_obj = db.query(Round).filter(Round.id == round_id).first()
+        if round_obj:
             # All matches complete, advance to next round
             from services.tournament_service import TournamentService
+            if round_obj.pod is not None:
+                result = TournamentService.advance_pod(db, round_obj)
+                return {
+                    "round_completed": True,
+                    "new_round": result["pod_round"],
+                    "pod": round_obj.pod,
+                    "tournament_status": result["status"]
+                }
             result = TournamentService.advance_to_next_round(db, round_obj.tournament_id)
             return {
                 "round_completed": True,
@@ -157,11 +538,18 @@ class MatchService:
         if not match:
             raise ValueError("Match not found")
 
+        was_completed = match.status == "completed"
+        health_buffer.end_match(match_id)
+        remaining_matches = None if was_completed else MatchService._record_completion(db, match)
         match.status = "completed"
         match.completed_at = datetime.utcnow()
+        StandingsService.record_result(db, match, was_completed, match.winner_id)
+        tournament_id = match.round.tournament_id
         db.commit()
+        state_versions.bump(tournament_id)
+        live_matches.discard(match_id)
 
-        MatchService.check_round_completion(db, match.round_id)
+        MatchService.check_round_completion(db, match.round_id, remaining_matches)
 
     @staticmethod
     def update_match_result(db: Session, match_id: int, winner_id: int):
@@ -173,8 +561,20 @@ class MatchService:
         if winner_id not in [match.player1_id, match.player2_id]:
             raise ValueError("Winner must be one of the match players")
 
+        was_completed = match.status == "completed"
+        previous_winner_id = match.winner_id
+        health_buffer.end_match(match_id)
+        remaining_matches = None if was_completed else MatchService._record_completion(db, match)
+
         match.winner_id = winner_id
         match.status = "completed"
         match.completed_at = datetime.utcnow()
+        StandingsService.record_result(db, match, was_completed, previous_winner_id)
 
+        tournament_id = match.round.tournament_id
         db.commit()
+        state_versions.bump(tournament_id)
+        live_matches.discard(match_id)
+
+        # A result entered for an open match counts towards finishing the round
+        MatchService.check_round_completion(db, match.round_id, remaining_matches)
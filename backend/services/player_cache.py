@@ -0,0 +1,78 @@
+from sqlalchemy.orm import Session
+from models import Player
+from services.tournament_service import get_avatar_url
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import json
+import threading
+
+
+@dataclass(frozen=True)
+class PlayerView:
+    """Read-only player data needed to render a match card."""
+    player_id: int
+    name: str
+    avatar_url: Optional[str]
+    colors: Tuple[str, ...]
+
+
+class PlayerViewCache:
+    """Per-tournament cache of player view models.
+
+    Built with one query on first use and kept until a profile changes, so
+    polled endpoints never look players up per match or re-parse colors.
+    """
+
+    def __init__(self):
+        self._views: Dict[int, Dict[int, PlayerView]] = {}
+        self._forwarders: List[Callable[[int], None]] = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _build(db: Session, tournament_id: int) -> Dict[int, PlayerView]:
+        players = db.query(Player).filter(Player.tournament_id == tournament_id).all()
+        return {
+            player.id: PlayerView(
+                player_id=player.id,
+                name=player.name,
+                avatar_url=get_avatar_url(player.avatar_path),
+                colors=tuple(json.loads(player.colors)) if player.colors else ()
+            )
+            for player in players
+        }
+
+    def get_players(
+        self,
+        db: Session,
+        tournament_id: int,
+        required_ids: Iterable[int] = ()
+    ) -> Dict[int, PlayerView]:
+        """Return player views for a tournament, loading them on a miss.
+
+        If any of required_ids is missing (e.g. a player joined after the
+        cache was built) the tournament's entry is rebuilt once.
+        """
+        views = self._views.get(tournament_id)
+        if views is None or any(pid not in views for pid in required_ids):
+            views = self._build(db, tournament_id)
+            with self._lock:
+                self._views[tournament_id] = views
+        return views
+
+    def invalidate(self, tournament_id: int, forward: bool = True):
+        """Drop the cached views for a tournament.
+
+        Also forwarded to other worker processes unless forward is False.
+        """
+        with self._lock:
+            self._views.pop(tournament_id, None)
+        if forward:
+            for callback in self._forwarders:
+                callback(tournament_id)
+
+    def add_forwarder(self, callback: Callable[[int], None]):
+        """Register callback(tournament_id), called on every local invalidation."""
+        self._forwarders.append(callback)
+
+
+player_views = PlayerViewCache()
@@ -0,0 +1,103 @@
+from fastapi import Request, Response
+from pydantic import BaseModel
+from services.state_version import state_versions
+from typing import Callable, Dict, Hashable, Optional, Tuple, Type
+import threading
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header value against an ETag."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class ResponseCache:
+    """Serialized response bodies keyed by endpoint and state version.
+
+    Each key holds only the body for the version it was built at; a version
+    bump makes the entry stale and the next request rebuilds it. Idle polling
+    is answered from memory (or with 304 Not Modified) without touching the
+    database or re-serializing.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Hashable, Tuple[int, str, bytes]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def respond(
+        self,
+        request: Request,
+        key: Hashable,
+        version: int,
+        model: Type[BaseModel],
+        build: Callable[[], object]
+    ) -> Response:
+        """Return the response for key at version, building it on a miss.
+
+        build() returns the endpoint's content (validated against model) and
+        may raise HTTPException; errors are never cached.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            _, etag, body = entry
+            if _etag_matches(request.headers.get("if-none-match"), etag):
+                self._count("not_modified")
+                return Response(status_code=304, headers=self._headers(etag, version))
+            self._count("hits")
+        else:
+            body = model.model_validate(build()).model_dump_json().encode()
+            # The epoch keeps ETags from a previous process run from matching
+            etag = f'"{state_versions.epoch}-{version}"'
+            with self._lock:
+                self._entries[key] = (version, etag, body)
+            self._count("misses")
+
+        return Response(
+            content=body,
+            media_type="application/json",
+            headers=self._headers(etag, version)
+        )
+
+    def discard(self, predicate: Callable[[Hashable], bool]):
+        """Drop cached entries whose key matches predicate."""
+        with self._lock:
+            for key in [k for k in self._entries if predicate(k)]:
+                del self._entries[key]
+
+    def stats(self) -> dict:
+        """Hit/miss/304 counters and ratios since startup."""
+        total = self.hits + self.misses + self.not_modified
+        return {
+            "entries": len(self._entries),
+            "requests": total,
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            "miss_ratio": round(self.misses / total, 4) if total else 0.0,
+            "not_modified_ratio": round(self.not_modified / total, 4) if total else 0.0
+        }
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    @staticmethod
+    def _headers(etag: str, version: int) -> dict:
+        # no-cache: browsers may store the body but must revalidate every poll
+        return {"ETag": etag, "Cache-Control": "no-cache", "X-State-Version": str(version)}
+
+
+response_cache = ResponseCache()
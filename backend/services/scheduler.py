@@ -2,44 +2,71 @@ from typing import List, Tuple, Optional
 from models import Player
 
 
-def generate_round_robin_schedule(players: List[Player]) -> List[List[Tuple[Player, Player]]]:
-    """
-    Generates a round-robin tournament schedule.
-    If odd number of players, one player gets a bye each round (represented as None).
+def round_count(num_players: int) -> int:
+    """Number of rounds in a round-robin for num_players (odd counts add a bye)."""
+    if num_players < 2:
+        return 0
+    return num_players - 1 if num_players % 2 == 0 else num_players
 
-    Args:
-        players: List of Player objects
 
-    Returns:
-        List of rounds, where each round is a list of (player1, player2) tuples
+def _slots(num_players: int) -> int:
+    """Seats at the table: odd player counts get a bye seat (index num_players)."""
+    return num_players + num_players % 2
+
+
+def _seat(slots: int, player_index: int, round_index: int) -> int:
+    """Seat of a player in a round of the circle method.
+
+    Seat 0 is fixed; every other index moves one seat along each round.
     """
-    players_list = players.copy()
-    n = len(players_list)
+    if player_index == 0:
+        return 0
+    return (player_index - 1 + round_index) % (slots - 1) + 1
 
-    # Handle bye for odd number of players
-    has_bye = n % 2 == 1
-    if has_bye:
-        players_list.append(None)  # Bye placeholder
-        n += 1
 
-    rounds = []
-    num_rounds = n - 1
-    half = n // 2
+def _player_at(slots: int, seat: int, round_index: int) -> int:
+    """Inverse of _seat: which player index sits in a seat in a round."""
+    if seat == 0:
+        return 0
+    return (seat - 1 - round_index) % (slots - 1) + 1
 
-    for round_num in range(num_rounds):
-        round_matches = []
 
-        for i in range(half):
-            player1 = players_list[i]
-            player2 = players_list[n - 1 - i]
+def pairing_for_round(num_players: int, round_index: int) -> List[Tuple[int, int]]:
+    """
+    Pairings of one round as (player1_index, player2_index) tuples, in O(n).
 
-            # Skip matches where either player is None (bye)
-            if player1 is not None and player2 is not None:
-                round_matches.append((player1, player2))
+    Player indices are positions in join order; round_index is 0-based. The
+    player facing the bye sits out and is left out of the list.
+    """
+    slots = _slots(num_players)
+    pairs = []
+    for seat in range(slots // 2):
+        player1 = _player_at(slots, seat, round_index)
+        player2 = _player_at(slots, slots - 1 - seat, round_index)
+        if player1 < num_players and player2 < num_players:
+            pairs.append((player1, player2))
+    return pairs
 
-        rounds.append(round_matches)
 
-        # Rotate players (keep first player fixed, rotate the rest)
-        players_list = [players_list[0]] + [players_list[-1]] + players_list[1:-1]
+def opponent_of(num_players: int, player_index: int, round_index: int) -> Optional[int]:
+    """Opponent's index for one player in one round in O(1); None on a bye."""
+    slots = _slots(num_players)
+    opponent = _player_at(slots, slots - 1 - _seat(slots, player_index, round_index), round_index)
+    return opponent if opponent < num_players else None
 
-    return rounds
+
+def generate_round_robin_schedule(players: List[Player]) -> List[List[Tuple[Player, Player]]]:
+    """
+    Generates a round-robin tournament schedule.
+    If odd number of players, one player sits out each round (bye).
+
+    Args:
+        players: List of Player objects
+
+    Returns:
+        List of rounds, where each round is a list of (player1, player2) tuples
+    """
+    return [
+        [(players[i], players[j]) for i, j in pairing_for_round(len(players), round_index)]
+        for round_index in range(round_count(len(players)))
+    ]
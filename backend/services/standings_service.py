@@ -0,0 +1,193 @@
+from sqlalchemy import select, func, case, union_all
+from sqlalchemy.orm import Session
+from models import Player, Round, Match, Standing, Tournament
+from services.state_version import state_versions
+from typing import Dict, List, Optional, Tuple
+
+
+class StandingsService:
+    @staticmethod
+    def get_or_create(db: Session, player_id: int, tournament_id: int) -> Standing:
+        """Get a player's standings row, creating an empty one if missing."""
+        standing = db.query(Standing).filter(Standing.player_id == player_id).first()
+        if not standing:
+            standing = Standing(
+                player_id=player_id,
+                tournament_id=tournament_id,
+                matches_played=0,
+                wins=0,
+                losses=0,
+                points=0
+            )
+            db.add(standing)
+            db.flush()
+        return standing
+
+    @staticmethod
+    def record_result(
+        db: Session,
+        match: Match,
+        was_completed: bool = False,
+        previous_winner_id: Optional[int] = None
+    ) -> None:
+        """Apply a match result (or a correction of one) to the standings.
+
+        If the match was already completed, its previous result is reverted
+        first. Increments are issued as UPDATE statements so they join the
+        caller's transaction; the caller commits.
+        """
+        if match.status != "completed":
+            return
+        if was_completed and previous_winner_id == match.winner_id:
+            return
+
+        # Per-player [played, wins, losses] delta
+        deltas = {match.player1_id: [0, 0, 0], match.player2_id: [0, 0, 0]}
+
+        def apply(winner_id: Optional[int], sign: int):
+            for player_id, delta in deltas.items():
+                won = 1 if player_id == winner_id else 0
+                delta[0] += sign
+                delta[1] += sign * won
+                delta[2] += sign * (1 - won)
+
+        if was_completed:
+            apply(previous_winner_id, -1)
+        apply(match.winner_id, 1)
+
+        tournament_id = match.round.tournament_id
+        for player_id, (played, wins, losses) in deltas.items():
+            if not (played or wins or losses):
+                continue
+            StandingsService.get_or_create(db, player_id, tournament_id)
+            db.query(Standing).filter(Standing.player_id == player_id).update({
+                Standing.matches_played: Standing.matches_played + played,
+                Standing.wins: Standing.wins + wins,
+                Standing.losses: Standing.losses + losses,
+                Standing.points: Standing.points + wins * 3  # 3 points per win
+            })
+
+    @staticmethod
+    def record_bye(db: Session, tournament_id: int, player_id: int) -> None:
+        """Score a Swiss bye as a match won (3 points).
+
+        Joins the caller's transaction like record_result; compute_from_matches
+        counts byes the same way.
+        """
+        StandingsService.get_or_create(db, player_id, tournament_id)
+        db.query(Standing).filter(Standing.player_id == player_id).update({
+            Standing.matches_played: Standing.matches_played + 1,
+            Standing.wins: Standing.wins + 1,
+            Standing.points: Standing.points + 3
+        })
+
+    @staticmethod
+    def _swiss_byes(db: Session, tournament_id: int) -> Optional[Tuple[int, Dict[int, int]]]:
+        """(written rounds, {player_id: rounds played}) of a Swiss tournament.
+
+        A player missing from a written round had the bye in it. Returns
+        None for other pairing modes, whose byes score nothing.
+        """
+        if db.query(Tournament.pairing).filter(Tournament.id == tournament_id).scalar() != "swiss":
+            return None
+        rounds = db.query(func.count(Round.id)).filter(Round.tournament_id == tournament_id).scalar()
+        seats = union_all(*[
+            select(player_column.label("player_id"))
+            .join(Round, Match.round_id == Round.id)
+            .where(Round.tournament_id == tournament_id)
+            for player_column in (Match.player1_id, Match.player2_id)
+        ]).subquery()
+        appearances = dict(db.execute(
+            select(seats.c.player_id, func.count()).group_by(seats.c.player_id)
+        ).all())
+        return rounds, appearances
+
+    @staticmethod
+    def compute_from_matches(db: Session, tournament_id: int) -> Dict[int, dict]:
+        """Compute every player's results from the matches table.
+
+        Uses a single grouped aggregate over the tournament's completed
+        matches. Players without completed matches are included with zeros.
+        Swiss byes count as wins (see record_bye).
+        """
+        # One row per (participant, completed match) in this tournament
+        completed = [
+            select(
+                player_column.label("player_id"),
+                Match.winner_id.label("winner_id")
+            )
+            .join(Round, Match.round_id == Round.id)
+            .where(Round.tournament_id == tournament_id, Match.status == "completed")
+            for player_column in (Match.player1_id, Match.player2_id)
+        ]
+        participants = union_all(*completed).subquery()
+
+        stats = (
+            select(
+                participants.c.player_id,
+                func.count().label("played"),
+                func.sum(
+                    case((participants.c.winner_id == participants.c.player_id, 1), else_=0)
+                ).label("wins")
+            )
+            .group_by(participants.c.player_id)
+            .subquery()
+        )
+
+        rows = db.query(Player.id, stats.c.played, stats.c.wins).outerjoin(
+            stats, stats.c.player_id == Player.id
+        ).filter(Player.tournament_id == tournament_id).all()
+
+        swiss = StandingsService._swiss_byes(db, tournament_id)
+
+        results = {}
+        for player_id, played, wins in rows:
+            played = played or 0
+            wins = wins or 0
+            if swiss is not None:
+                rounds, appearances = swiss
+                byes = rounds - appearances.get(player_id, 0)
+                played += byes
+                wins += byes
+            results[player_id] = {
+                "matches_played": played,
+                "wins": wins,
+                "losses": played - wins,
+                "points": wins * 3
+            }
+        return results
+
+    @staticmethod
+    def rebuild(db: Session, tournament_id: int) -> List[int]:
+        """Regenerate a tournament's standings rows from the matches table.
+
+        Returns the IDs of players whose stored row was missing or differed
+        from the recomputed values.
+        """
+        expected = StandingsService.compute_from_matches(db, tournament_id)
+        existing = {
+            s.player_id: s
+            for s in db.query(Standing).filter(Standing.tournament_id == tournament_id).all()
+        }
+
+        corrected = []
+        for player_id, values in expected.items():
+            standing = existing.pop(player_id, None)
+            if standing is None:
+                standing = Standing(player_id=player_id, tournament_id=tournament_id)
+                db.add(standing)
+            elif all(getattr(standing, key) == value for key, value in values.items()):
+                continue
+
+            for key, value in values.items():
+                setattr(standing, key, value)
+            corrected.append(player_id)
+
+        # Rows for players no longer in the tournament
+        for standing in existing.values():
+            db.delete(standing)
+
+        db.commit()
+        if corrected:
+            state_versions.bump(tournament_id)
+        return corrected
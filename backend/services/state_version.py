@@ -0,0 +1,126 @@
+from typing import Callable, Dict, List, Optional
+import threading
+import time
+import uuid
+
+
+class TournamentStateVersions:
+    """Monotonically increasing per-tournament state versions.
+
+    Every write that can change what a client sees for a tournament bumps its
+    version. Writes that change tournament-level fields shown across
+    tournaments (status, round, player count, existence) also bump the
+    summary version used by "current tournament". Versions are process-local
+    and restart from zero with the process; epoch identifies the process so
+    clients can tell a restart from a version that went backwards.
+
+    With several worker processes, the broadcast bus forwards every bump to
+    the other workers (see services/broadcast_bus.py), which merge it like a
+    Lamport clock, and the workers agree on the epoch of the oldest one.
+    """
+
+    def __init__(self):
+        self._versions: Dict[int, int] = {}
+        self._summary_version = 0
+        self._listeners: List[Callable[[int, int], None]] = []
+        self._forwarders: List[Callable[[int, int, Optional[int]], None]] = []
+        self._lock = threading.Lock()
+        self.epoch = uuid.uuid4().hex[:8]
+        self.started_at = time.time()
+
+    def get(self, tournament_id: int) -> int:
+        """Current version of a tournament's state."""
+        return self._versions.get(tournament_id, 0)
+
+    def get_summary(self) -> int:
+        """Version of the tournament summaries (status, round, player count)."""
+        return self._summary_version
+
+    def bump(self, tournament_id: int, summary: bool = False) -> int:
+        """Record a state change for a tournament and return its new version.
+
+        Pass summary=True when the change also affects the tournament summary.
+        Call after the change is committed, so a reader that observes the new
+        version is guaranteed to read the new data.
+        """
+        with self._lock:
+            version = self._versions.get(tournament_id, 0) + 1
+            self._versions[tournament_id] = version
+            summary_version = None
+            if summary:
+                self._summary_version += 1
+                summary_version = self._summary_version
+
+        for listener in self._listeners:
+            listener(tournament_id, version)
+        for forward in self._forwarders:
+            forward(tournament_id, version, summary_version)
+        return version
+
+    def merge_remote(self, tournament_id: int, version: int, summary_version: Optional[int] = None) -> int:
+        """Apply a bump made by another worker process.
+
+        The local version moves past both its own and the remote value, so
+        every change still yields a new version here and idle workers
+        converge on the same numbers. Not forwarded again.
+        """
+        with self._lock:
+            version = max(self._versions.get(tournament_id, 0) + 1, version)
+            self._versions[tournament_id] = version
+            if summary_version is not None:
+                self._summary_version = max(self._summary_version + 1, summary_version)
+
+        for listener in self._listeners:
+            listener(tournament_id, version)
+        return version
+
+    def snapshot(self) -> dict:
+        """Epoch and versions, for sharing with other worker processes."""
+        with self._lock:
+            return {
+                "epoch": self.epoch,
+                "started_at": self.started_at,
+                "versions": dict(self._versions),
+                "summary_version": self._summary_version
+            }
+
+    def adopt(self, snapshot: dict):
+        """Merge another worker's snapshot.
+
+        Versions take the maximum of both sides, and the epoch of the
+        longest-running worker wins, so a worker joining a running group
+        takes over the group's epoch instead of forcing clients to resync.
+        """
+        changed = []
+        with self._lock:
+            if (snapshot["started_at"], snapshot["epoch"]) < (self.started_at, self.epoch):
+                self.epoch = snapshot["epoch"]
+                self.started_at = snapshot["started_at"]
+            for tournament_id, version in snapshot["versions"].items():
+                tournament_id = int(tournament_id)
+                if version > self._versions.get(tournament_id, 0):
+                    self._versions[tournament_id] = version
+                    changed.append((tournament_id, version))
+            self._summary_version = max(self._summary_version, snapshot["summary_version"])
+
+        for tournament_id, version in changed:
+            for listener in self._listeners:
+                listener(tournament_id, version)
+
+    def add_listener(self, callback: Callable[[int, int], None]):
+        """Register callback(tournament_id, version), called after every bump.
+
+        Callbacks run on the bumping thread and must not block.
+        """
+        self._listeners.append(callback)
+
+    def add_forwarder(self, callback: Callable[[int, int, Optional[int]], None]):
+        """Register callback(tournament_id, version, summary_version) for local bumps.
+
+        summary_version is None unless the bump also changed the summary.
+        Used to forward bumps to other worker processes; must not block.
+        """
+        self._forwarders.append(callback)
+
+
+state_versions = TournamentStateVersions()
@@ -0,0 +1,192 @@
+"""
+Swiss pairing.
+
+Players are ranked by points, then opponents' match-win percentage, then
+join order. Each round pairs down the ranking, so players meet others in
+their score group and the odd one out floats down to the next group. Nobody
+meets the same opponent twice; when the greedy pass leaves players that can
+only rematch, augmenting paths (Edmonds' blossom algorithm) re-pair the
+fewest players needed, starting next to them in the ranking. An odd field
+gives the bye to the lowest-ranked player who has not had one yet.
+"""
+
+import math
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+# Floor on each opponent's win rate in the tiebreaker, so losing to a
+# winless opponent is not punished twice
+MIN_OPPONENT_WIN_PCT = 1 / 3
+
+
+def swiss_round_count(num_players: int) -> int:
+    """Default number of Swiss rounds: enough for one undefeated player."""
+    if num_players < 2:
+        return 0
+    return math.ceil(math.log2(num_players))
+
+
+def opponent_match_win_pct(
+    player_id: int,
+    opponents: Dict[int, Set[int]],
+    records: Dict[int, Tuple[int, int]]
+) -> float:
+    """Average match-win rate of a player's opponents, each floored at 1/3.
+
+    records maps player_id to (wins, matches_played).
+    """
+    rates = []
+    for opponent_id in opponents.get(player_id, ()):
+        wins, played = records.get(opponent_id, (0, 0))
+        rates.append(max(MIN_OPPONENT_WIN_PCT, wins / played) if played else MIN_OPPONENT_WIN_PCT)
+    return sum(rates) / len(rates) if rates else 0.0
+
+
+def rank_players(
+    player_ids: List[int],
+    points: Dict[int, int],
+    opponents: Dict[int, Set[int]],
+    records: Dict[int, Tuple[int, int]]
+) -> List[int]:
+    """Player IDs best first: points, opponents' match-win %, then join order."""
+    seed = {player_id: index for index, player_id in enumerate(player_ids)}
+    tiebreak = {
+        player_id: opponent_match_win_pct(player_id, opponents, records)
+        for player_id in player_ids
+    }
+    return sorted(player_ids, key=lambda p: (-points.get(p, 0), -tiebreak[p], seed[p]))
+
+
+def pair_swiss_round(
+    ranked: List[int],
+    opponents: Dict[int, Set[int]],
+    had_bye: Set[int]
+) -> Tuple[List[Tuple[int, int]], Optional[int]]:
+    """
+    Pair one round; returns ([(player1_id, player2_id)], bye_player_id).
+
+    ranked is best first (see rank_players). opponents maps each player to
+    everyone they have already played. Raises ValueError if every pairing
+    would need a rematch.
+    """
+    if len(ranked) % 2 == 0:
+        return _pair_without_rematches(ranked, opponents), None
+
+    # Bye goes to the lowest-ranked player without one; players who already
+    # had a bye are only tried if nobody else leaves a valid pairing
+    candidates = [p for p in reversed(ranked) if p not in had_bye]
+    candidates += [p for p in reversed(ranked) if p in had_bye]
+    for bye_player in candidates:
+        try:
+            pairs = _pair_without_rematches([p for p in ranked if p != bye_player], opponents)
+        except ValueError:
+            continue
+        return pairs, bye_player
+    raise ValueError("No pairing without rematches is left")
+
+
+def _pair_without_rematches(ranked: List[int], opponents: Dict[int, Set[int]]) -> List[Tuple[int, int]]:
+    """Perfect matching of an even field with no rematches, ranking order kept where possible."""
+    count = len(ranked)
+    played = [opponents.get(player_id, set()) for player_id in ranked]
+
+    def allowed(u: int, v: int) -> bool:
+        return ranked[v] not in played[u]
+
+    # Greedy pass: each player takes the best-ranked free player below them
+    match = [-1] * count
+    for u in range(count):
+        if match[u] != -1:
+            continue
+        for v in range(u + 1, count):
+            if match[v] == -1 and allowed(u, v):
+                match[u], match[v] = v, u
+                break
+
+    # Players left over can only rematch among themselves; re-pair along
+    # augmenting paths. A root that finds no path now never will, so one
+    # pass decides whether a perfect matching exists.
+    for root in range(count):
+        if match[root] == -1:
+            end = _augmenting_path_end(root, match, allowed, count)
+            if end == -1:
+                raise ValueError("No pairing without rematches is left")
+
+    return [(ranked[u], ranked[match[u]]) for u in range(count) if u < match[u]]
+
+
+def _neighbours_by_rank(v: int, count: int) -> Iterator[int]:
+    """Indices ordered by distance from v in the ranking, nearest first."""
+    for distance in range(1, count):
+        if v - distance >= 0:
+            yield v - distance
+        if v + distance < count:
+            yield v + distance
+
+
+def _augmenting_path_end(root: int, match: List[int], allowed, count: int) -> int:
+    """Edmonds' blossom search from an unmatched root; augments match in place.
+
+    Returns the other end of the augmenting path, or -1 if there is none.
+    The ranking is almost a complete graph, so the search usually ends a
+    few players away from the root.
+    """
+    parent = [-1] * count
+    base = list(range(count))
+    used = [False] * count
+    used[root] = True
+    queue = [root]
+
+    def lowest_common_ancestor(a: int, b: int) -> int:
+        seen = [False] * count
+        while True:
+            a = base[a]
+            seen[a] = True
+            if match[a] == -1:
+                break
+            a = parent[match[a]]
+        while True:
+            b = base[b]
+            if seen[b]:
+                return b
+            b = parent[match[b]]
+
+    def mark_path(v: int, blossom_base: int, child: int, blossom: List[bool]):
+        while base[v] != blossom_base:
+            blossom[base[v]] = blossom[base[match[v]]] = True
+            parent[v] = child
+            child = match[v]
+            v = parent[match[v]]
+
+    head = 0
+    while head < len(queue):
+        v = queue[head]
+        head += 1
+        for to in _neighbours_by_rank(v, count):
+            if base[v] == base[to] or match[v] == to or not allowed(v, to):
+                continue
+            if to == root or (match[to] != -1 and parent[match[to]] != -1):
+                # Odd cycle: contract the blossom onto its base
+                blossom_base = lowest_common_ancestor(v, to)
+                blossom = [False] * count
+                mark_path(v, blossom_base, to, blossom)
+                mark_path(to, blossom_base, v, blossom)
+                for i in range(count):
+                    if blossom[base[i]]:
+                        base[i] = blossom_base
+                        if not used[i]:
+                            used[i] = True
+                            queue.append(i)
+            elif parent[to] == -1:
+                parent[to] = v
+                if match[to] == -1:
+                    # Flip the matched and unmatched edges along the path
+                    end = to
+                    while to != -1:
+                        previous = parent[to]
+                        next_to = match[previous]
+                        match[to], match[previous] = previous, to
+                        to = next_to
+                    return end
+                used[match[to]] = True
+                queue.append(match[to])
+    return -1
@@ -1,9 +1,23 @@
+from sqlalchemy import func, insert, select, update
 from sqlalchemy.orm import Session
-from models import Tournament, Player, Round, Match
-from services.scheduler import generate_round_robin_schedule
+from models import Tournament, Player, Round, Match, Standing
+from services.scheduler import pairing_for_round, round_count
+from services.standings_service import StandingsService
+from services.state_version import state_versions
+from services.swiss import pair_swiss_round, rank_players, swiss_round_count
+from collections import Counter
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
 import json
+import os
+
+# Rounds written to the database ahead of the current one; later rounds are
+# generated from the rotation as the tournament advances. -1 writes the whole
+# schedule up front.
+SCHEDULE_LOOKAHEAD = int(os.getenv("SCHEDULE_LOOKAHEAD", "-1"))
+
+# Players per pod when a pod-mode tournament does not set pod_size
+DEFAULT_POD_SIZE = 8
 
 
 def get_avatar_url(avatar_path: Optional[str]) -> Optional[str]:
@@ -22,6 +36,7 @@ class TournamentService:
         tournament = Tournament(**tournament_data, status="registration")
         db.add(tournament)
         db.commit()
+        state_versions.bump(tournament.id, summary=True)
         db.refresh(tournament)
         return tournament
 
@@ -37,73 +52,268 @@ class TournamentService:
 
     @staticmethod
     def get_tournament_players(db: Session, tournament_id: int) -> List[Player]:
-        """Get all players in a tournament."""
-        return db.query(Player).filter(Player.tournament_id == tournament_id).all()
+        """Get all players in a tournament, in schedule (join) order."""
+        return db.query(Player).filter(Player.tournament_id == tournament_id).order_by(Player.id).all()
+
+    @staticmethod
+    def get_player_ids(db: Session, tournament_id: int, pod: Optional[int] = None) -> List[int]:
+        """IDs of a tournament's (or one pod's) players in schedule (join) order."""
+        query = select(Player.id).where(Player.tournament_id == tournament_id)
+        if pod is not None:
+            query = query.where(Player.pod == pod)
+        return db.execute(query.order_by(Player.id)).scalars().all()
+
+    @staticmethod
+    def split_into_pods(player_ids: List[int], pod_size: int) -> List[List[int]]:
+        """Deal players into pods of at most pod_size whose sizes differ by at most one.
+
+        Every pod gets at least two players.
+        """
+        pod_count = max(1, min(-(-len(player_ids) // pod_size), len(player_ids) // 2))
+        return [player_ids[pod::pod_count] for pod in range(pod_count)]
+
+    @staticmethod
+    def total_rounds(tournament: Tournament, num_players: int) -> int:
+        """Rounds the tournament plays, including those not written yet."""
+        if tournament.pairing == "swiss":
+            return tournament.num_rounds or 0
+        if tournament.pairing == "pods":
+            pods = TournamentService.split_into_pods(list(range(num_players)), tournament.pod_size or DEFAULT_POD_SIZE)
+            return round_count(len(pods[0])) if num_players >= 2 else 0
+        return round_count(num_players)
 
     @staticmethod
     def generate_schedule(db: Session, tournament_id: int) -> dict:
-        """Generate round-robin schedule for tournament."""
+        """Generate round-robin schedule (or the first Swiss round) for tournament."""
         tournament = TournamentService.get_tournament(db, tournament_id)
         if not tournament:
             raise ValueError("Tournament not found")
 
-        players = TournamentService.get_tournament_players(db, tournament_id)
-        if len(players) < 2:
+        player_ids = TournamentService.get_player_ids(db, tournament_id)
+        if len(player_ids) < 2:
             raise ValueError("Need at least 2 players to generate schedule")
 
-        # Generate round-robin pairs
-        schedule = generate_round_robin_schedule(players)
-
-        total_matches = 0
-        # Create rounds and matches
-        for round_num, round_matches in enumerate(schedule, start=1):
-            round_obj = Round(
-                tournament_id=tournament_id,
-                round_number=round_num,
-                status="pending"
+        if tournament.pairing == "swiss":
+            # Swiss rounds are paired from the standings one at a time; more
+            # rounds than a round robin would force rematches
+            tournament.num_rounds = min(
+                tournament.num_rounds or swiss_round_count(len(player_ids)),
+                round_count(len(player_ids))
             )
-            db.add(round_obj)
-            db.flush()
-
-            for player1, player2 in round_matches:
-                match = Match(
-                    round_id=round_obj.id,
-                    player1_id=player1.id,
-                    player2_id=player2.id,
-                    status="pending"
-                )
-                db.add(match)
-                total_matches += 1
+            last_round = 1
+            total_matches = TournamentService._insert_swiss_round(db, tournament_id, player_ids, 1)
+        elif tournament.pairing == "pods":
+            # Each pod is its own round robin, written in full (pods are small)
+            tournament.pod_size = tournament.pod_size or DEFAULT_POD_SIZE
+            pods = TournamentService.split_into_pods(player_ids, tournament.pod_size)
+            db.execute(update(Player), [
+                {"id": player_id, "pod": pod}
+                for pod, pod_player_ids in enumerate(pods, start=1)
+                for player_id in pod_player_ids
+            ])
+            last_round, total_matches = TournamentService._insert_pod_rounds(db, tournament_id, pods)
+        else:
+            # Write the round-robin pairs, all rounds or only the first ones
+            total_rounds = round_count(len(player_ids))
+            last_round = total_rounds if SCHEDULE_LOOKAHEAD < 0 else min(total_rounds, 1 + SCHEDULE_LOOKAHEAD)
+            total_matches = TournamentService._insert_rounds(db, tournament_id, player_ids, 1, last_round)
 
         tournament.status = "in_progress"
         tournament.current_round = 1
         db.commit()
+        state_versions.bump(tournament_id, summary=True)
 
         return {
-            "rounds_created": len(schedule),
+            "rounds_created": last_round,
             "total_matches": total_matches,
             "message": "Schedule generated successfully"
         }
 
     @staticmethod
-    def get_standings(db: Session, tournament_id: int) -> List[dict]:
-        """Calculate and return tournament standings."""
-        players = TournamentService.get_tournament_players(db, tournament_id)
-        standings = []
+    def _insert_rounds(db: Session, tournament_id: int, player_ids: List[int], first_round: int, last_round: int) -> int:
+        """Write rounds first_round..last_round of the round-robin; returns the match count.
+
+        All rounds go in one batched INSERT and all matches in another. Round
+        IDs are read back in one query: RETURNING per row would cost a
+        statement per round on SQLite.
+        """
+        planned = TournamentService.planned_rounds(player_ids, first_round - 1, last_round)
+        db.execute(insert(Round), [
+            {
+                "tournament_id": tournament_id,
+                "round_number": round_num,
+                "status": "pending",
+                "remaining_matches": len(pairings)
+            }
+            for round_num, pairings in planned
+        ])
+        round_ids = db.execute(
+            select(Round.id).where(
+                Round.tournament_id == tournament_id,
+                Round.round_number >= first_round
+            ).order_by(Round.round_number)
+        ).scalars().all()
+
+        matches = [
+            {"round_id": round_id, "player1_id": player1_id, "player2_id": player2_id, "status": "pending"}
+            for round_id, (_, pairings) in zip(round_ids, planned)
+            for player1_id, player2_id in pairings
+        ]
+        db.execute(insert(Match), matches)
+        return len(matches)
+
+    @staticmethod
+    def _insert_pod_rounds(db: Session, tournament_id: int, pods: List[List[int]]) -> Tuple[int, int]:
+        """Write every pod's round robin; returns (rounds, matches).
+
+        Same three statements as _insert_rounds for all pods together. Round 1
+        of every pod starts right away, since pods advance on their own.
+        """
+        now = datetime.utcnow()
+        planned = [
+            (pod, round_num, pairings)
+            for pod, pod_player_ids in enumerate(pods, start=1)
+            for round_num, pairings in TournamentService.planned_rounds(pod_player_ids, 0)
+        ]
+        db.execute(insert(Round), [
+            {
+                "tournament_id": tournament_id,
+                "pod": pod,
+                "round_number": round_num,
+                "status": "in_progress" if round_num == 1 else "pending",
+                "started_at": now if round_num == 1 else None,
+                "remaining_matches": len(pairings)
+            }
+            for pod, round_num, pairings in planned
+        ])
+        round_ids = {
+            (pod, round_num): round_id
+            for round_id, pod, round_num in db.execute(
+                select(Round.id, Round.pod, Round.round_number).where(Round.tournament_id == tournament_id)
+            )
+        }
+
+        matches = [
+            {"round_id": round_ids[(pod, round_num)], "player1_id": player1_id, "player2_id": player2_id, "status": "pending"}
+            for pod, round_num, pairings in planned
+            for player1_id, player2_id in pairings
+        ]
+        db.execute(insert(Match), matches)
+        return len(round_ids), len(matches)
+
+    @staticmethod
+    def _materialize_rounds(db: Session, tournament_id: int, up_to_round: int):
+        """Write any rounds up to up_to_round that are not in the database yet."""
+        written = db.query(func.max(Round.round_number)).filter(Round.tournament_id == tournament_id).scalar() or 0
+        if written >= up_to_round:
+            return
+        player_ids = TournamentService.get_player_ids(db, tournament_id)
+        last_round = min(up_to_round, round_count(len(player_ids)))
+        if written >= last_round:
+            return
+        TournamentService._insert_rounds(db, tournament_id, player_ids, written + 1, last_round)
+
+    @staticmethod
+    def _insert_swiss_round(db: Session, tournament_id: int, player_ids: List[int], round_number: int) -> int:
+        """Pair a Swiss round from the results so far and write it; returns the match count.
+
+        Reads the pairing history and the standings in two queries. The bye,
+        if any, is scored as a win right away. Raises ValueError if no
+        pairing without rematches is left.
+        """
+        opponents = {player_id: set() for player_id in player_ids}
+        appearances = Counter()
+        history = db.execute(
+            select(Match.player1_id, Match.player2_id)
+            .join(Round, Match.round_id == Round.id)
+            .where(Round.tournament_id == tournament_id)
+        ).all()
+        for player1_id, player2_id in history:
+            opponents[player1_id].add(player2_id)
+            opponents[player2_id].add(player1_id)
+            appearances[player1_id] += 1
+            appearances[player2_id] += 1
+        # Anyone missing from an earlier round sat it out on a bye
+        had_bye = {player_id for player_id in player_ids if appearances[player_id] < round_number - 1}
+
+        points, records = {}, {}
+        for player_id, wins, played, player_points in db.query(
+            Standing.player_id, Standing.wins, Standing.matches_played, Standing.points
+        ).filter(Standing.tournament_id == tournament_id):
+            points[player_id] = player_points
+            records[player_id] = (wins, played)
+
+        ranked = rank_players(player_ids, points, opponents, records)
+        pairs, bye = pair_swiss_round(ranked, opponents, had_bye)
+
+        round_id = db.execute(insert(Round).values(
+            tournament_id=tournament_id, round_number=round_number, status="pending", remaining_matches=len(pairs)
+        )).inserted_primary_key[0]
+        db.execute(insert(Match), [
+            {"round_id": round_id, "player1_id": player1_id, "player2_id": player2_id, "status": "pending"}
+            for player1_id, player2_id in pairs
+        ])
+        if bye is not None:
+            StandingsService.record_bye(db, tournament_id, bye)
+        return len(pairs)
+
+    @staticmethod
+    def _pair_next_swiss_round(db: Session, tournament: Tournament, round_number: int):
+        """Write Swiss round round_number unless it exists or the event is over."""
+        if round_number > (tournament.num_rounds or 0):
+            return
+        written = db.query(func.max(Round.round_number)).filter(Round.tournament_id == tournament.id).scalar() or 0
+        if written >= round_number:
+            return
+        try:
+            TournamentService._insert_swiss_round(
+                db, tournament.id, TournamentService.get_player_ids(db, tournament.id), round_number
+            )
+        except ValueError:
+            # Everyone left has played each other: the tournament ends early
+            pass
+
+    @staticmethod
+    def planned_rounds(
+        player_ids: List[int],
+        after_round: int,
+        last_round: Optional[int] = None
+    ) -> List[Tuple[int, List[Tuple[int, int]]]]:
+        """(round_number, [(player1_id, player2_id)]) for the rounds after after_round.
 
-        for player in players:
-            # Count wins
-            wins = db.query(Match).filter(
-                Match.winner_id == player.id
-            ).count()
+        player_ids must be in join order, as generate_schedule uses them.
+        Each round is computed on its own, so only the requested rounds cost
+        anything.
+        """
+        if last_round is None:
+            last_round = round_count(len(player_ids))
+        return [
+            (round_num, [
+                (player_ids[i], player_ids[j])
+                for i, j in pairing_for_round(len(player_ids), round_num - 1)
+            ])
+            for round_num in range(after_round + 1, last_round + 1)
+        ]
 
-            # Count losses (matches where player participated but didn't win)
-            player_matches = db.query(Match).filter(
-                ((Match.player1_id == player.id) | (Match.player2_id == player.id)) &
-                (Match.status == "completed")
-            ).count()
+    @staticmethod
+    def get_standings(db: Session, tournament_id: int, pod: Optional[int] = None) -> List[dict]:
+        """Return tournament standings from the materialized standings rows.
+
+        In pod mode players are ranked within their pod; pass pod to get one
+        pod's table.
+        """
+        query = db.query(Player, Standing).outerjoin(
+            Standing, Standing.player_id == Player.id
+        ).filter(Player.tournament_id == tournament_id)
+        if pod is not None:
+            query = query.filter(Player.pod == pod)
+        rows = query.all()
 
-            losses = player_matches - wins
+        standings = []
+        for player, standing in rows:
+            wins = standing.wins if standing else 0
+            losses = standing.losses if standing else 0
+            points = standing.points if standing else 0
 
             # Parse colors
             colors = json.loads(player.colors) if player.colors else []
@@ -115,25 +325,38 @@ class TournamentService:
                 "colors": colors,
                 "wins": wins,
                 "losses": losses,
-                "points": wins * 3  # 3 points per win
+                "points": points,
+                "pod": player.pod
             })
 
-        # Sort by points (wins), then by name
-        standings.sort(key=lambda x: (-x["points"], x["name"]))
+        # Sort by pod, then points (wins), then by name
+        standings.sort(key=lambda x: (x["pod"] or 0, -x["points"], x["name"]))
 
-        # Add rank
-        for i, standing in enumerate(standings, start=1):
-            standing["rank"] = i
+        # Add rank, counting from 1 in each pod
+        rank, previous_pod = 0, None
+        for standing in standings:
+            rank = rank + 1 if standing["pod"] == previous_pod else 1
+            previous_pod = standing["pod"]
+            standing["rank"] = rank
 
         return standings
 
     @staticmethod
     def advance_to_next_round(db: Session, tournament_id: int) -> dict:
-        """Advance tournament to next round."""
+        """Advance tournament to next round (in pod mode, every pod)."""
         tournament = TournamentService.get_tournament(db, tournament_id)
         if not tournament:
             raise ValueError("Tournament not found")
 
+        if tournament.pairing == "pods":
+            playing = db.query(Round).filter(
+                Round.tournament_id == tournament_id,
+                Round.status == "in_progress"
+            ).all()
+            for round_obj in playing:
+                TournamentService._start_next_pod_round(db, round_obj)
+            return TournamentService._finish_pod_advance(db, tournament)
+
         current_round = db.query(Round).filter(
             Round.tournament_id == tournament_id,
             Round.round_number == tournament.current_round
@@ -143,8 +366,13 @@ class TournamentService:
             current_round.status = "completed"
             current_round.completed_at = datetime.utcnow()
 
-        # Check if there are more rounds
+        # Check if there are more rounds, writing the next ones if they were held
+        # back or, for Swiss, pairing the next one from the standings
         next_round_num = tournament.current_round + 1
+        if tournament.current_round > 0 and tournament.pairing == "swiss":
+            TournamentService._pair_next_swiss_round(db, tournament, next_round_num)
+        elif tournament.current_round > 0:
+            TournamentService._materialize_rounds(db, tournament_id, next_round_num + max(SCHEDULE_LOOKAHEAD, 0))
         next_round = db.query(Round).filter(
             Round.tournament_id == tournament_id,
             Round.round_number == next_round_num
@@ -160,6 +388,63 @@ class TournamentService:
             tournament.completed_at = datetime.utcnow()
 
         db.commit()
+        state_versions.bump(tournament_id, summary=True)
+
+        return {
+            "current_round": tournament.current_round,
+            "status": tournament.status
+        }
+
+    @staticmethod
+    def advance_pod(db: Session, round_obj: Round) -> dict:
+        """Move one pod on from round_obj to its next round.
+
+        Pods do not wait for each other: only this pod's round changes. Does
+        nothing if round_obj is no longer the pod's round in play.
+        """
+        tournament = round_obj.tournament
+        pod_round = round_obj.round_number
+        if round_obj.status == "in_progress":
+            next_round = TournamentService._start_next_pod_round(db, round_obj)
+            if next_round:
+                pod_round = next_round.round_number
+        result = TournamentService._finish_pod_advance(db, tournament)
+        result.update({"pod": round_obj.pod, "pod_round": pod_round})
+        return result
+
+    @staticmethod
+    def _start_next_pod_round(db: Session, round_obj: Round) -> Optional[Round]:
+        """Complete a pod's round and start its next one, if it has one."""
+        now = datetime.utcnow()
+        round_obj.status = "completed"
+        round_obj.completed_at = now
+        next_round = db.query(Round).filter(
+            Round.tournament_id == round_obj.tournament_id,
+            Round.pod == round_obj.pod,
+            Round.round_number == round_obj.round_number + 1
+        ).first()
+        if next_round:
+            next_round.status = "in_progress"
+            next_round.started_at = now
+        return next_round
+
+    @staticmethod
+    def _finish_pod_advance(db: Session, tournament: Tournament) -> dict:
+        """Commit pod round changes; the tournament's round is the slowest pod's."""
+        db.flush()
+        slowest = db.query(func.min(Round.round_number)).filter(
+            Round.tournament_id == tournament.id,
+            Round.status == "in_progress"
+        ).scalar()
+        if slowest is None:
+            # Every pod has played out
+            tournament.status = "completed"
+            tournament.completed_at = datetime.utcnow()
+        else:
+            tournament.current_round = slowest
+
+        db.commit()
+        state_versions.bump(tournament.id, summary=True)
 
         return {
             "current_round": tournament.current_round,
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the async live-match path (DB_ASYNC).
+
+Runs concurrent health updates against a file-backed SQLite database on one
+event loop, once through the sync MatchService.update_health (as the endpoint
+does without DB_ASYNC) and once through MatchService.update_health_async on
+an AsyncSession. A heartbeat task stands in for the WebSocket traffic served
+by the same loop and records how late it wakes up: with the sync path every
+commit stalls it.
+
+Usage:
+    python3 benchmark_async_db.py [--players 16] [--updates 25]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import benchmark_utils  # noqa: F401  (puts the backend on sys.path)
+from benchmark_utils import make_session_factory, print_table, seed_tournament
+
+from database.database import create_async_session_factory
+from models import Match, Round
+from services.match_service import MatchService
+from services.tournament_service import TournamentService
+
+HEARTBEAT_MS = 5
+
+
+def setup(url: str, num_players: int):
+    """Create a tournament whose first-round matches are all in progress."""
+    engine, SessionFactory = make_session_factory(url)
+    db = SessionFactory()
+    tournament = seed_tournament(db, num_players)
+    TournamentService.generate_schedule(db, tournament.id)
+    matches = db.query(Match).join(Round).filter(
+        Round.tournament_id == tournament.id,
+        Round.round_number == 1
+    ).all()
+    targets = []
+    for match in matches:
+        match.player1_health = match.player2_health = 20
+        match.status = "in_progress"
+        targets += [(match.id, match.player1_id), (match.id, match.player2_id)]
+    db.commit()
+    db.close()
+    return engine, SessionFactory, targets
+
+
+async def heartbeat(lags: list, stop: asyncio.Event):
+    """Wake every HEARTBEAT_MS and record how late each wake-up was."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(HEARTBEAT_MS / 1000)
+        lags.append((time.perf_counter() - start) * 1000 - HEARTBEAT_MS)
+
+
+async def run(targets, updates: int, update_once):
+    latencies, lags = [], []
+    stop = asyncio.Event()
+    beat = asyncio.create_task(heartbeat(lags, stop))
+
+    async def player(match_id: int, player_id: int):
+        for i in range(updates):
+            start = time.perf_counter()
+            await update_once(match_id, player_id, 1 if i % 2 else -1)
+            latencies.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(player(m, p) for m, p in targets))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await beat
+    return latencies, lags, elapsed
+
+
+def percentile(values, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sync vs async health updates")
+    parser.add_argument("--players", type=int, default=16)
+    parser.add_argument("--updates", type=int, default=25, help="Health updates per player")
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "benchmark.db")
+    url = f"sqlite:///{path}"
+    engine, SessionFactory, targets = setup(url, args.players)
+
+    async def sync_update(match_id, player_id, delta):
+        db = SessionFactory()
+        try:
+            MatchService.update_health(db, match_id, player_id, delta)
+        finally:
+            db.close()
+
+    async def run_async():
+        async_engine, AsyncSessionFactory = create_async_session_factory(url)
+
+        async def async_update(match_id, player_id, delta):
+            async with AsyncSessionFactory() as db:
+                await MatchService.update_health_async(db, match_id, player_id, delta)
+
+        try:
+            return await run(targets, args.updates, async_update)
+        finally:
+            await async_engine.dispose()
+
+    rows = []
+    for name, results in [
+        ("sync Session", asyncio.run(run(targets, args.updates, sync_update))),
+        ("AsyncSession", asyncio.run(run_async())),
+    ]:
+        latencies, lags, elapsed = results
+        rows.append([
+            name,
+            len(latencies),
+            f"{len(latencies) / elapsed:.0f}",
+            f"{percentile(latencies, 0.5):.1f}",
+            f"{percentile(latencies, 0.99):.1f}",
+            f"{percentile(lags, 0.99):.1f}",
+            f"{max(lags, default=0):.1f}"
+        ])
+    engine.dispose()
+    os.remove(path)
+
+    print(f"{len(targets)} concurrent players x {args.updates} health updates, file-backed SQLite\n")
+    print_table(
+        ["path", "updates", "updates/s", "p50 ms", "p99 ms", "loop lag p99 ms", "loop lag max ms"],
+        rows
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the cross-process broadcast bus (services/broadcast_bus.py).
+
+Starts several worker processes, each with its own UnixSocketBus in a shared
+temporary directory. One worker publishes a burst of messages; the others
+check that every message arrives, in order, and report delivery latency.
+Also checks that a state version bump in one worker reaches the others.
+
+Usage:
+    python3 benchmark_broadcast_bus.py [--workers 4] [--messages 2000]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+import benchmark_utils  # noqa: F401  (puts the backend on sys.path)
+from benchmark_utils import print_table
+
+
+def run_worker(index: int, path: str, args, ready, go, results):
+    from services.broadcast_bus import UnixSocketBus, _share_state
+    from services.state_version import state_versions
+
+    async def main():
+        bus = UnixSocketBus(path)
+        _share_state(bus)
+        latencies = []
+        order_ok = True
+        last_seq = -1
+        done = asyncio.Event()
+
+        async def on_message(payload):
+            nonlocal last_seq, order_ok
+            latencies.append((time.perf_counter() - payload["sent_at"]) * 1000)
+            order_ok = order_ok and payload["seq"] == last_seq + 1
+            last_seq = payload["seq"]
+            if payload["seq"] == args.messages - 1:
+                done.set()
+
+        bus.subscribe("bench", on_message)
+        await bus.start()
+        ready.put(index)
+        # Wait until every worker is bound and has announced itself
+        while go.empty():
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.2)
+
+        if index == 0:
+            state_versions.bump(1, summary=True)
+            for seq in range(args.messages):
+                await bus.publish("bench", {"seq": seq, "sent_at": time.perf_counter()})
+                if seq % 10 == 9:
+                    # Let receivers drain, as between real requests
+                    await asyncio.sleep(0.001)
+            results.put((index, None))
+        else:
+            try:
+                await asyncio.wait_for(done.wait(), 10)
+            except asyncio.TimeoutError:
+                pass
+            latencies.sort()
+            results.put((index, {
+                "received": len(latencies),
+                "in_order": order_ok,
+                "p50": latencies[len(latencies) // 2] if latencies else 0,
+                "p99": latencies[int(len(latencies) * 0.99)] if latencies else 0,
+                "version": state_versions.get(1),
+                "dropped": bus.dropped
+            }))
+        await asyncio.sleep(0.2)
+        await bus.stop()
+
+    asyncio.run(main())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Unix socket broadcast bus")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--messages", type=int, default=2000)
+    args = parser.parse_args()
+
+    # perf_counter is comparable across processes on Linux (CLOCK_MONOTONIC)
+    ctx = multiprocessing.get_context("fork")
+    ready, go, results = ctx.Queue(), ctx.Queue(), ctx.Queue()
+    path = tempfile.mkdtemp(prefix="mtg-bus-")
+    workers = [
+        ctx.Process(target=run_worker, args=(i, path, args, ready, go, results))
+        for i in range(args.workers)
+    ]
+    for worker in workers:
+        worker.start()
+    for _ in workers:
+        ready.get(timeout=10)
+    go.put(True)
+
+    rows = []
+    failed = False
+    for _ in workers:
+        index, result = results.get(timeout=30)
+        if result is None:
+            continue
+        ok = result["received"] == args.messages and result["in_order"] and result["version"] == 1
+        failed = failed or not ok
+        rows.append([
+            index,
+            result["received"],
+            "yes" if result["in_order"] else "NO",
+            result["version"],
+            f"{result['p50']:.3f}",
+            f"{result['p99']:.3f}"
+        ])
+    for worker in workers:
+        worker.join()
+    os.rmdir(path)
+
+    print(f"{args.workers} workers, {args.messages} messages published by worker 0\n")
+    print_table(["worker", "received", "in order", "state version", "p50 ms", "p99 ms"], sorted(rows))
+    if failed:
+        print("\nFAIL: a worker missed messages, saw them out of order, or missed the version bump")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark for TournamentService.generate_schedule.
+
+Compares the original implementation (a flush per round and an ORM add per
+match) with the batched INSERTs, reporting SQL statements and wall time for
+creating a full round-robin schedule.
+
+Usage:
+    python3 benchmark_generate_schedule.py [--players 20 100 500]
+"""
+
+import argparse
+
+from benchmark_utils import QueryCounter, make_session_factory, print_table, seed_tournament, timer
+
+from models import Match, Round
+from services.scheduler import generate_round_robin_schedule
+from services.tournament_service import TournamentService
+
+
+def legacy_generate_schedule(db, tournament_id: int):
+    """The original implementation: flush per round, ORM add per match."""
+    tournament = TournamentService.get_tournament(db, tournament_id)
+    players = TournamentService.get_tournament_players(db, tournament_id)
+    schedule = generate_round_robin_schedule(players)
+    for round_num, round_matches in enumerate(schedule, start=1):
+        round_obj = Round(tournament_id=tournament_id, round_number=round_num, status="pending")
+        db.add(round_obj)
+        db.flush()
+        for player1, player2 in round_matches:
+            db.add(Match(round_id=round_obj.id, player1_id=player1.id, player2_id=player2.id, status="pending"))
+    tournament.status = "in_progress"
+    tournament.current_round = 1
+    db.commit()
+
+
+def run(generate, num_players: int):
+    """Generate one schedule on a fresh database; return (statements, ms, matches)."""
+    engine, Session = make_session_factory()
+    db = Session()
+    tournament_id = seed_tournament(db, num_players).id
+    with QueryCounter(engine) as counter, timer() as elapsed:
+        generate(db, tournament_id)
+    matches = db.query(Match).count()
+    db.close()
+    engine.dispose()
+    return counter.count, elapsed["ms"], matches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark schedule generation")
+    parser.add_argument("--players", type=int, nargs="+", default=[20, 100, 500])
+    args = parser.parse_args()
+
+    rows = []
+    for num_players in args.players:
+        legacy_queries, legacy_ms, legacy_matches = run(legacy_generate_schedule, num_players)
+        queries, ms, matches = run(TournamentService.generate_schedule, num_players)
+        assert matches == legacy_matches == num_players * (num_players - 1) // 2
+        rows.append([
+            num_players, num_players - 1 + num_players % 2, matches,
+            legacy_queries, f"{legacy_ms:.1f}", queries, f"{ms:.1f}"
+        ])
+
+    print_table(
+        ["players", "rounds", "matches", "legacy queries", "legacy ms", "batched queries", "batched ms"],
+        rows
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Benchmark and idempotency check for POST /api/matches/{id}/health/batch.
+
+Sends bursts of -1 taps once as one request per tap (PUT .../health) and once
+as one batch per burst, through the endpoint functions, and compares SQL
+statements, time and broadcasts per tap. Then checks the batch rules: a
+replayed batch changes nothing and broadcasts nothing, a resend that overlaps
+an applied batch only applies the new taps, the same batch sent from several
+threads at once applies once, batches racing with single updates lose
+nothing, the match state reports the last applied seq for clients that lost
+their counter, and the write-behind buffer (HEALTH_WRITE_BEHIND) gives the
+same results. Exits 1 if a check fails.
+
+Usage:
+    python3 benchmark_health_batch.py [--bursts 50] [--taps 5]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+
+from benchmark_utils import QueryCounter, print_table, seed_tournament, timer
+
+from sqlalchemy.orm import sessionmaker
+
+import api.websockets
+import services.match_service
+from api.matches import update_health, update_health_batch
+from database.database import Base, create_db_engine
+from models import Match, MatchEvent
+from schemas.match import MatchHealthBatch, MatchHealthUpdate
+from services.health_buffer import HealthWriteBehind
+from services.live_match_store import live_matches
+from services.match_service import MatchService
+from services.tournament_service import TournamentService
+
+broadcasts = []
+
+
+async def count_broadcast(match_id, player_id, new_health, tournament_id=None):
+    broadcasts.append((match_id, player_id, new_health))
+
+
+def setup(starting_life: int):
+    """A file-backed database with one match in progress."""
+    path = tempfile.mktemp(suffix=".db")
+    engine = create_db_engine(f"sqlite:///{path}", "production")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = Session()
+    tournament_id = seed_tournament(db, 2).id
+    TournamentService.generate_schedule(db, tournament_id)
+    match = db.query(Match).one()
+    # Match IDs repeat across these databases; forget the previous one's entry
+    live_matches.discard(match.id, forward=False)
+    for player_id in (match.player1_id, match.player2_id):
+        MatchService.join_match(db, match.id, player_id, starting_life)
+    match_id, player_id = match.id, match.player1_id
+    db.close()
+    return path, engine, Session, match_id, player_id
+
+
+def teardown(path, engine):
+    engine.dispose()
+    os.remove(path)
+
+
+def batch(player_id: int, seqs, change: int = -1) -> MatchHealthBatch:
+    return MatchHealthBatch(player_id=player_id, deltas=[{"seq": s, "health_change": change} for s in seqs])
+
+
+def send_batch(Session, match_id: int, body: MatchHealthBatch) -> dict:
+    db = Session()
+    try:
+        return asyncio.run(update_health_batch(match_id, body, db))
+    finally:
+        db.close()
+
+
+def stored(Session, match_id: int):
+    """(player 1 health, player 1 health_change events)."""
+    db = Session()
+    try:
+        health = db.get(Match, match_id).player1_health
+        events = db.query(MatchEvent).filter(
+            MatchEvent.match_id == match_id,
+            MatchEvent.event_type == "health_change"
+        ).count()
+        return health, events
+    finally:
+        db.close()
+
+
+def compare(bursts: int, taps: int) -> list:
+    """[label, statements/tap, ms/tap, broadcasts/tap] per request style."""
+    rows = []
+    for label, batched in [("one PUT per tap", False), ("one batch per burst", True)]:
+        path, engine, Session, match_id, player_id = setup(bursts * taps + 20)
+        broadcasts.clear()
+        db = Session()
+        seq = 0
+        with QueryCounter(engine) as counter, timer() as elapsed:
+            for _ in range(bursts):
+                if batched:
+                    asyncio.run(update_health_batch(match_id, batch(player_id, range(seq + 1, seq + taps + 1)), db))
+                    seq += taps
+                else:
+                    for _ in range(taps):
+                        asyncio.run(update_health(match_id, MatchHealthUpdate(player_id=player_id, health_change=-1), db))
+        db.close()
+        total = bursts * taps
+        rows.append([label, f"{counter.count / total:.2f}", f"{elapsed['ms'] / total:.3f}",
+                     f"{len(broadcasts) / total:.2f}"])
+        teardown(path, engine)
+    return rows
+
+
+def check_rules() -> list:
+    failures = []
+    path, engine, Session, match_id, player_id = setup(100)
+
+    # Replay: nothing applied, nothing broadcast
+    first = send_batch(Session, match_id, batch(player_id, [1, 2, 3]))
+    before = stored(Session, match_id)
+    broadcasts.clear()
+    replay = send_batch(Session, match_id, batch(player_id, [1, 2, 3]))
+    if replay["applied"] or replay["new_health"] != first["new_health"] or stored(Session, match_id) != before:
+        failures.append(f"replayed batch changed the match: {replay}")
+    if broadcasts:
+        failures.append("replayed batch was broadcast")
+
+    # Resend of unacknowledged taps plus new ones: only the new ones apply
+    overlap = send_batch(Session, match_id, batch(player_id, [2, 3, 4, 5]))
+    if overlap["applied"] != 2 or overlap["last_seq"] != 5 or stored(Session, match_id) != (95, 5):
+        failures.append(f"overlapping batch: {overlap}, stored {stored(Session, match_id)}")
+
+    # The same batch from several threads at once applies once
+    body = batch(player_id, range(6, 16))
+    barrier = threading.Barrier(4)
+    results = []
+
+    def resend():
+        barrier.wait()
+        results.append(send_batch(Session, match_id, body))
+
+    threads = [threading.Thread(target=resend) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if sorted(r["applied"] for r in results) != [0, 0, 0, 10] or stored(Session, match_id) != (85, 15):
+        failures.append(f"concurrent resends applied {[r['applied'] for r in results]}, stored {stored(Session, match_id)}")
+
+    # Batches racing with single updates: every change lands
+    def singles():
+        db = Session()
+        for _ in range(40):
+            MatchService.update_health(db, match_id, player_id, +1)
+        db.close()
+
+    def batches():
+        for start in range(16, 56, 4):
+            send_batch(Session, match_id, batch(player_id, range(start, start + 4)))
+
+    threads = [threading.Thread(target=singles), threading.Thread(target=batches)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if stored(Session, match_id) != (85, 95):
+        failures.append(f"batches racing with single updates: stored {stored(Session, match_id)}, expected (85, 95)")
+
+    # A client without its counter (new device, cleared storage) resumes from the state
+    db = Session()
+    seqs = [live_matches.get_state(db, match_id, player_id)["your_health_seq"]]
+    live_matches.discard(match_id)
+    seqs.append(live_matches.get_state(db, match_id, player_id)["your_health_seq"])
+    db.close()
+    if seqs != [55, 55]:
+        failures.append(f"match state reports seq {seqs} (live, reloaded), expected 55")
+    teardown(path, engine)
+
+    # Write-behind buffer: same results, written at the flush
+    path, engine, Session, match_id, player_id = setup(20)
+    original = services.match_service.health_buffer
+    services.match_service.health_buffer = buffer = HealthWriteBehind(enabled=True, session_factory=Session)
+    try:
+        results = [MatchService.update_health_batch(None, match_id, player_id, [(s, -1) for s in seqs])
+                   for seqs in ([1, 2, 3], [1, 2, 3], [3, 4])]
+        buffer.flush()
+        if [r["applied"] for r in results] != [3, 0, 1] or stored(Session, match_id) != (16, 4):
+            failures.append(f"write-behind: applied {[r['applied'] for r in results]}, stored {stored(Session, match_id)}")
+        # Reloaded after a restart, the buffer still skips applied taps
+        services.match_service.health_buffer = HealthWriteBehind(enabled=True, session_factory=Session)
+        if MatchService.update_health_batch(None, match_id, player_id, [(4, -1)])["applied"]:
+            failures.append("write-behind: flushed seq not loaded back")
+    finally:
+        services.match_service.health_buffer = original
+    teardown(path, engine)
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched health updates")
+    parser.add_argument("--bursts", type=int, default=50)
+    parser.add_argument("--taps", type=int, default=5, help="Taps per burst")
+    args = parser.parse_args()
+
+    api.websockets.broadcast_health_update = count_broadcast
+    print(f"{args.bursts} bursts of {args.taps} taps\n")
+    print_table(["requests", "statements/tap", "ms/tap", "broadcasts/tap"], compare(args.bursts, args.taps))
+
+    failures = check_rules()
+    print()
+    for failure in failures:
+        print(f"✗ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✓ Replays and concurrent resends apply once, overlapping resends apply only new taps, "
+          "nothing lost racing single updates, write-behind matches")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Benchmark and crash-safety check for the health write-behind buffer
+(HEALTH_WRITE_BEHIND, services/health_buffer.py).
+
+Measures health-update throughput on a file-backed SQLite database with one
+commit per tap versus batched flushes, then checks the documented crash
+semantics: after a simulated crash the database holds exactly the changes of
+the last flush, and confirming a defeat always persists every pending change
+before the result. Also checks that changes of deleted matches are dropped
+instead of failing every later flush, and that a failed flush while ending a
+match keeps the match live. Exits 1 if a check fails.
+
+Usage:
+    python3 benchmark_health_buffer.py [--players 16] [--taps 2000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+os.environ["HEALTH_WRITE_BEHIND"] = "true"
+
+import benchmark_utils  # noqa: F401  (puts the backend on sys.path)
+from benchmark_utils import make_session_factory, print_table, seed_tournament, timer
+
+from models import Match, MatchEvent, Round
+from services.health_buffer import HealthWriteBehind, health_buffer
+from services.match_service import MatchService
+from services.tournament_service import TournamentService
+
+failures = []
+
+
+def check(condition: bool, message: str):
+    print(f"  [{'ok' if condition else 'FAIL'}] {message}")
+    if not condition:
+        failures.append(message)
+
+
+def setup(SessionFactory, num_players: int):
+    """Create a tournament with its first round in progress; return its matches."""
+    db = SessionFactory()
+    tournament = seed_tournament(db, num_players)
+    TournamentService.generate_schedule(db, tournament.id)
+    matches = db.query(Match).join(Round).filter(
+        Round.tournament_id == tournament.id,
+        Round.round_number == 1
+    ).all()
+    for match in matches:
+        match.player1_health = match.player2_health = 1000
+        match.status = "in_progress"
+    db.commit()
+    pairs = [(m.id, m.player1_id, m.player2_id) for m in matches]
+    db.close()
+    return pairs
+
+
+def event_count(SessionFactory, match_id: int) -> int:
+    db = SessionFactory()
+    try:
+        return db.query(MatchEvent).filter(MatchEvent.match_id == match_id).count()
+    finally:
+        db.close()
+
+
+def stored_health(SessionFactory, match_id: int):
+    db = SessionFactory()
+    try:
+        match = db.query(Match).filter(Match.id == match_id).first()
+        return match.player1_health, match.player2_health
+    finally:
+        db.close()
+
+
+def run_taps(SessionFactory, pairs, taps: int) -> float:
+    """Apply taps round-robin through MatchService; return taps per second."""
+    with timer() as elapsed:
+        for i in range(taps):
+            match_id, player1_id, player2_id = pairs[i % len(pairs)]
+            db = SessionFactory()
+            try:
+                MatchService.update_health(db, match_id, player1_id if i % 2 else player2_id, -1)
+            finally:
+                db.close()
+        health_buffer.flush()
+    return taps / (elapsed["ms"] / 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the health write-behind buffer")
+    parser.add_argument("--players", type=int, default=16)
+    parser.add_argument("--taps", type=int, default=2000)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "benchmark.db")
+    engine, SessionFactory = make_session_factory(f"sqlite:///{path}")
+    pairs = setup(SessionFactory, args.players)
+    health_buffer.session_factory = SessionFactory
+
+    rows = []
+    for enabled, label in [(False, "commit per tap"), (True, f"write-behind ({health_buffer.flush_events}/flush)")]:
+        health_buffer.enabled = enabled
+        rows.append([label, args.taps, f"{run_taps(SessionFactory, pairs, args.taps):.0f}"])
+    print(f"{args.taps} health taps across {len(pairs)} matches, file-backed SQLite\n")
+    print_table(["mode", "taps", "taps/s"], rows)
+
+    print("\nCrash safety")
+    match_id, player1_id, player2_id = pairs[0]
+    events_before = event_count(SessionFactory, match_id)
+
+    # A fresh buffer stands in for the process; dropping it simulates a crash
+    crashed = HealthWriteBehind(enabled=True, session_factory=SessionFactory, flush_events=10 ** 9)
+    start_health = stored_health(SessionFactory, match_id)
+    for _ in range(5):
+        crashed.update_health(match_id, player1_id, -1)
+    crashed.flush()
+    flushed_health = stored_health(SessionFactory, match_id)
+    for _ in range(3):
+        crashed.update_health(match_id, player1_id, -1)
+    del crashed
+
+    check(flushed_health == (start_health[0] - 5, start_health[1]), "flush writes the in-memory health")
+    check(stored_health(SessionFactory, match_id) == flushed_health,
+          "after a crash the stored health is the last flushed value")
+    check(event_count(SessionFactory, match_id) == events_before + 5,
+          "after a crash only flushed health changes are in match_events")
+
+    # Defeat flushes pending changes before the result is committed
+    match_id, player1_id, player2_id = pairs[1]
+    health_buffer.enabled = True
+    health_buffer.flush_events = 10 ** 9
+    health_before = stored_health(SessionFactory, match_id)
+    for _ in range(4):
+        MatchService.update_health(None, match_id, player2_id, -2)
+    pending = health_buffer.stats()["pending_events"]
+    db = SessionFactory()
+    MatchService.confirm_defeat(db, match_id, player2_id)
+    db.close()
+    check(pending == 4 and health_buffer.stats()["pending_events"] == 0,
+          "confirming a defeat flushes pending changes first")
+    check(stored_health(SessionFactory, match_id)[1] == health_before[1] - 8,
+          "the completed match stores its final health")
+    try:
+        MatchService.update_health(None, match_id, player2_id, -1)
+        rejected = False
+    except ValueError:
+        rejected = True
+    check(rejected, "health changes after the result are rejected")
+    for _ in range(2):
+        health_buffer.prune_ended()
+    check(health_buffer.stats()["ended_matches"] == 0, "ended matches are forgotten once the result is committed")
+
+    print("\nDeleted matches and failed flushes")
+    buffer = HealthWriteBehind(enabled=True, session_factory=SessionFactory, flush_events=10 ** 9)
+    (deleted_id, deleted_player, _), (kept_id, kept_player, _) = pairs[2], pairs[3]
+    kept_before = stored_health(SessionFactory, kept_id)
+    buffer.update_health(deleted_id, deleted_player, -1)
+    buffer.update_health(kept_id, kept_player, -1)
+    db = SessionFactory()
+    db.delete(db.get(Match, deleted_id))
+    db.commit()
+    db.close()
+    try:
+        buffer.flush()
+        flushed = True
+    except Exception:
+        flushed = False
+    check(flushed and buffer.stats()["pending_events"] == 0, "a flush drops changes of a deleted match")
+    check(stored_health(SessionFactory, kept_id)[0] == kept_before[0] - 1,
+          "changes of other matches in the same flush are written")
+
+    match_id, player1_id, _ = pairs[4]
+    buffer.update_health(match_id, player1_id, -1)
+    db = SessionFactory()
+    tournament_id = db.query(Round.tournament_id).join(Match).filter(Match.id == match_id).scalar()
+    db.close()
+    buffer.discard_tournament(tournament_id)
+    check(buffer.stats()["pending_events"] == 0 and buffer.stats()["tracked_matches"] == 0,
+          "deleting a tournament drops its live health and pending changes")
+
+    match_id, player1_id, _ = pairs[5]
+    health_before = stored_health(SessionFactory, match_id)
+    buffer.update_health(match_id, player1_id, -3)
+
+    def broken_session():
+        raise RuntimeError("database unavailable")
+
+    buffer.session_factory = broken_session
+    try:
+        buffer.end_match(match_id)
+        raised = False
+    except RuntimeError:
+        raised = True
+    buffer.session_factory = SessionFactory
+    check(raised, "a failed flush while ending a match aborts the result")
+    buffer.update_health(match_id, player1_id, -1)
+    buffer.end_match(match_id)
+    check(stored_health(SessionFactory, match_id)[0] == health_before[0] - 4,
+          "the match stays live and its final health is written by the next flush")
+
+    engine.dispose()
+    os.remove(path)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Concurrency check for match health updates (MatchService.update_health).
+
+Fires hundreds of health changes at one match from parallel threads, each
+with its own session, on a file-backed SQLite database (production profile).
+Checks that the final health is the starting life plus every change (no lost
+updates), that every change logged one event, and that the events chain
+(each old value is the previous new value). A second run starts at low life
+so changes clamp at 0 and go through the compare-and-set path. The original
+read-modify-write (load the match, add in Python, write it back) is run the
+same way for comparison. Exits 1 if the atomic update loses or misorders a
+change.
+
+Usage:
+    python3 benchmark_health_concurrency.py [--changes 400] [--threads 8]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+
+from benchmark_utils import QueryCounter, print_table, seed_tournament, timer
+
+from sqlalchemy.orm import sessionmaker
+
+from database.database import Base, create_db_engine
+from models import Match, MatchEvent
+from services.match_service import MatchService
+from services.tournament_service import TournamentService
+
+
+def legacy_update_health(db, match_id: int, player_id: int, health_change: int) -> dict:
+    """The original update: load the match, add in Python, write it back."""
+    match = db.query(Match).filter(Match.id == match_id).first()
+    if match.player1_id == player_id:
+        old_health = match.player1_health
+        match.player1_health = max(0, old_health + health_change)
+        new_health = match.player1_health
+    else:
+        old_health = match.player2_health
+        match.player2_health = max(0, old_health + health_change)
+        new_health = match.player2_health
+    db.add(MatchEvent(match_id=match_id, player_id=player_id, event_type="health_change",
+                      old_value=old_health, new_value=new_health))
+    db.commit()
+    return {"new_health": new_health}
+
+
+def setup(starting_life: int):
+    """A file-backed database with one match in progress."""
+    path = tempfile.mktemp(suffix=".db")
+    engine = create_db_engine(f"sqlite:///{path}", "production")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = Session()
+    tournament_id = seed_tournament(db, 2).id
+    TournamentService.generate_schedule(db, tournament_id)
+    match = db.query(Match).one()
+    for player_id in (match.player1_id, match.player2_id):
+        MatchService.join_match(db, match.id, player_id, starting_life)
+    match_id, player_ids = match.id, (match.player1_id, match.player2_id)
+    db.close()
+    return path, engine, Session, match_id, player_ids
+
+
+def fire(Session, update, match_id: int, changes, threads: int) -> list:
+    """Apply (player_id, change) pairs from parallel threads started together."""
+    barrier = threading.Barrier(threads)
+    errors = []
+
+    def worker(chunk):
+        db = Session()
+        try:
+            barrier.wait()
+            for player_id, change in chunk:
+                update(db, match_id, player_id, change)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            db.close()
+
+    workers = [threading.Thread(target=worker, args=(changes[i::threads],)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return errors
+
+
+def run(update, starting_life: int, changes, threads: int) -> dict:
+    """Apply changes concurrently; return what ended up stored and logged."""
+    path, engine, Session, match_id, player_ids = setup(starting_life)
+    try:
+        with timer() as elapsed:
+            errors = fire(Session, update, match_id, changes, threads)
+        db = Session()
+        match = db.query(Match).one()
+        stored = {player_ids[0]: match.player1_health, player_ids[1]: match.player2_health}
+        events = db.query(MatchEvent).filter(
+            MatchEvent.event_type == "health_change"
+        ).order_by(MatchEvent.id).all()
+        chains = {player_id: [(e.old_value, e.new_value) for e in events if e.player_id == player_id]
+                  for player_id in player_ids}
+        db.close()
+    finally:
+        engine.dispose()
+        os.remove(path)
+    return {"stored": stored, "chains": chains, "errors": errors, "ms": elapsed["ms"], "players": player_ids}
+
+
+def verify(result: dict, starting_life: int, changes, clamped: bool) -> list:
+    """Rule violations in one run."""
+    failures = [f"update failed: {e!r}" for e in result["errors"][:3]]
+    for player_id in result["players"]:
+        own = [c for p, c in changes if p == player_id]
+        chain = result["chains"][player_id]
+        stored = result["stored"][player_id]
+        if len(chain) != len(own):
+            failures.append(f"player {player_id}: {len(chain)} events for {len(own)} changes")
+        previous = starting_life
+        for old_value, new_value in chain:
+            if old_value != previous or new_value < 0:
+                failures.append(f"player {player_id}: event {old_value} -> {new_value} after {previous}")
+                break
+            previous = new_value
+        if stored != previous:
+            failures.append(f"player {player_id}: stored {stored}, last event {previous}")
+        if not clamped and stored != starting_life + sum(own):
+            failures.append(f"player {player_id}: stored {stored}, expected {starting_life + sum(own)}")
+        if clamped and any(new_value not in {max(0, old_value + c) for c in own} for old_value, new_value in chain):
+            failures.append(f"player {player_id}: an event does not apply one of the changes")
+        if clamped and sum(new - old == 1 for old, new in chain) != own.count(1):
+            # +1 never clamps, so each must show up as exactly one +1 event
+            failures.append(f"player {player_id}: +1 changes lost")
+    return failures
+
+
+def lost_updates(result: dict, starting_life: int, changes) -> int:
+    """Changes missing from the stored health (no clamping involved)."""
+    return sum(
+        abs(starting_life + sum(c for p, c in changes if p == player_id) - result["stored"][player_id])
+        for player_id in result["players"]
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent health update check")
+    parser.add_argument("--changes", type=int, default=400)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    rng = random.Random(args.changes)
+    # Deltas of 1 so every lost update costs exactly 1 health; the seeded
+    # match is players 1 and 2
+    player_ids = (1, 2)
+    swings = [(rng.choice(player_ids), rng.choice([-1, 1])) for _ in range(args.changes)]
+    drain = [(rng.choice(player_ids), rng.choice([-1, -1, -1, 1])) for _ in range(args.changes)]
+
+    rows, failures = [], []
+    high_life, low_life = args.changes * 2, 20
+    for label, update in [("read-modify-write (original)", legacy_update_health),
+                          ("atomic UPDATE", MatchService.update_health)]:
+        result = run(update, high_life, swings, args.threads)
+        rows.append([label, lost_updates(result, high_life, swings),
+                     sum(len(chain) for chain in result["chains"].values()),
+                     f"{result['ms'] / args.changes:.2f}"])
+        if update is MatchService.update_health:
+            failures += verify(result, high_life, swings, clamped=False)
+            clamped = run(update, low_life, drain, args.threads)
+            failures += [f"clamped: {f}" for f in verify(clamped, low_life, drain, clamped=True)]
+
+    print(f"{args.changes} health changes of ±1 on one match from {args.threads} threads\n")
+    print_table(["update", "lost updates", "events", "ms/change"], rows)
+
+    # Statements per change on an idle match
+    path, engine, Session, match_id, (player1_id, _) = setup(high_life)
+    db = Session()
+    with QueryCounter(engine) as counter:
+        MatchService.update_health(db, match_id, player1_id, -1)
+    db.close()
+    engine.dispose()
+    os.remove(path)
+    print(f"\nStatements per change: {counter.count}")
+
+    print()
+    for failure in failures[:20]:
+        print(f"✗ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✓ No lost updates; every change logged one event and the events chain, with and without clamping")
+
+
+if __name__ == "__main__":
+    main()
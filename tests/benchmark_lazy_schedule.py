@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark and consistency check for lazy round materialization
+(SCHEDULE_LOOKAHEAD).
+
+Generates the same round-robin once with the whole schedule written up front
+and once with only the current round plus the lookahead, reporting match
+rows and generation time. Then plays both tournaments round by round and
+checks that the schedule endpoint and a player's upcoming matches agree at
+every step. Exits 1 if they differ.
+
+Usage:
+    python3 benchmark_lazy_schedule.py [--players 200] [--lookahead 1] [--rounds 5]
+"""
+
+import argparse
+import sys
+
+from benchmark_utils import QueryCounter, make_session_factory, print_table, seed_tournament, timer
+
+import services.tournament_service as tournament_service
+from api.players import get_player_matches
+from api.tournament import get_schedule
+from models import Match, Player, Round
+from services.match_service import MatchService
+from services.tournament_service import TournamentService
+
+
+def create(num_players: int, lookahead: int):
+    """Seed and schedule a tournament; return (engine, db, tournament_id, stats row)."""
+    tournament_service.SCHEDULE_LOOKAHEAD = lookahead
+    engine, Session = make_session_factory()
+    db = Session()
+    tournament_id = seed_tournament(db, num_players).id
+    with QueryCounter(engine) as counter, timer() as elapsed:
+        TournamentService.generate_schedule(db, tournament_id)
+    label = "all rounds" if lookahead < 0 else f"lookahead {lookahead}"
+    row = [label, db.query(Round).count(), db.query(Match).count(), counter.count, f"{elapsed['ms']:.1f}"]
+    return engine, db, tournament_id, row
+
+
+def pairings(db, tournament_id: int):
+    """Schedule as comparable data (match IDs left out)."""
+    db.expire_all()
+    return [
+        (r.round_number, [(m.player1, m.player2, m.winner) for m in r.matches])
+        for r in get_schedule(tournament_id, db)["rounds"]
+    ]
+
+
+def upcoming(db, player_id: int):
+    db.expire_all()
+    return [(u.round_number, u.opponent) for u in get_player_matches(player_id, db).upcoming_matches]
+
+
+def finish_round(db, tournament_id: int):
+    """Complete every match of the current round, player 1 winning."""
+    tournament = TournamentService.get_tournament(db, tournament_id)
+    round_obj = db.query(Round).filter(
+        Round.tournament_id == tournament_id,
+        Round.round_number == tournament.current_round
+    ).one()
+    for match in list(round_obj.matches):
+        if match.status == "completed":
+            continue
+        for player_id in (match.player1_id, match.player2_id):
+            MatchService.join_match(db, match.id, player_id, 20)
+        MatchService.confirm_defeat(db, match.id, match.player2_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark lazy round materialization")
+    parser.add_argument("--players", type=int, default=200)
+    parser.add_argument("--lookahead", type=int, default=1)
+    parser.add_argument("--rounds", type=int, default=5, help="Rounds to play while comparing")
+    args = parser.parse_args()
+
+    eager = create(args.players, -1)
+    lazy = create(args.players, args.lookahead)
+    print(f"{args.players} players\n")
+    print_table(["written", "rounds", "match rows", "queries", "ms"], [eager[3], lazy[3]])
+
+    failures = []
+    for step in range(args.rounds + 1):
+        tournament_service.SCHEDULE_LOOKAHEAD = -1
+        eager_state = pairings(eager[1], eager[2])
+        tournament_service.SCHEDULE_LOOKAHEAD = args.lookahead
+        lazy_state = pairings(lazy[1], lazy[2])
+        player_id = lazy[1].query(Player.id).order_by(Player.id).first()[0]
+        if eager_state != lazy_state or upcoming(eager[1], player_id) != upcoming(lazy[1], player_id):
+            failures.append(step)
+        if step < args.rounds:
+            tournament_service.SCHEDULE_LOOKAHEAD = -1
+            finish_round(eager[1], eager[2])
+            tournament_service.SCHEDULE_LOOKAHEAD = args.lookahead
+            finish_round(lazy[1], lazy[2])
+
+    print(f"\nAfter {args.rounds} rounds: {lazy[1].query(Round).count()} rounds written (lazy) "
+          f"vs {eager[1].query(Round).count()} (all)")
+    if failures:
+        print(f"✗ Schedule or upcoming matches differ after rounds {failures}")
+        sys.exit(1)
+    print("✓ Schedule and upcoming matches match the fully written schedule at every round")
+
+
+if __name__ == "__main__":
+    main()
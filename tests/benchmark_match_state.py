@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark for GET /api/matches/{id}/state served from the live match store
+(services/live_match_store.py).
+
+Every player of the first round joins their match, then each player polls
+their match state. Reports SQL statements and latency per poll for a cold
+store (every read misses and loads from the database) and for the store as
+filled by join_match, and checks that health updates show up in the served
+state, that a health patch arriving after a newer one is ignored, and that a
+defeat evicts the match. Exits 1 if a warm read issues SQL or a check fails.
+
+Usage:
+    python3 benchmark_match_state.py [--players 20] [--polls 50]
+"""
+
+import argparse
+import sys
+
+import benchmark_utils  # noqa: F401  (puts the backend on sys.path)
+from benchmark_utils import QueryCounter, make_session_factory, print_table, seed_tournament, timer
+
+from models import Match, Round
+from services.live_match_store import live_matches
+from services.match_service import MatchService
+from services.tournament_service import TournamentService
+
+failures = []
+
+
+def check(condition: bool, message: str):
+    print(f"  [{'ok' if condition else 'FAIL'}] {message}")
+    if not condition:
+        failures.append(message)
+
+
+def poll_all(engine, SessionFactory, pollers, polls: int):
+    """Poll every (match, player) pair; return (statements per poll, ms per poll)."""
+    db = SessionFactory()
+    with QueryCounter(engine) as counter, timer() as elapsed:
+        for _ in range(polls):
+            for match_id, player_id in pollers:
+                live_matches.get_state(db, match_id, player_id)
+    db.close()
+    total = polls * len(pollers)
+    return counter.count / total, elapsed["ms"] / total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark live match state reads")
+    parser.add_argument("--players", type=int, default=20)
+    parser.add_argument("--polls", type=int, default=50, help="Polls per player")
+    args = parser.parse_args()
+
+    engine, SessionFactory = make_session_factory()
+    db = SessionFactory()
+    tournament = seed_tournament(db, args.players)
+    TournamentService.generate_schedule(db, tournament.id)
+    matches = db.query(Match).join(Round).filter(
+        Round.tournament_id == tournament.id,
+        Round.round_number == 1
+    ).all()
+    for match in matches:
+        for player_id in (match.player1_id, match.player2_id):
+            MatchService.join_match(db, match.id, player_id, tournament.starting_life)
+    pollers = [(m.id, pid) for m in matches for pid in (m.player1_id, m.player2_id)]
+    starting_life = tournament.starting_life
+    db.close()
+
+    rows = []
+    warm = poll_all(engine, SessionFactory, pollers, args.polls)
+    # A cold store misses on every read: drop the entries before each poll
+    db = SessionFactory()
+    with QueryCounter(engine) as counter, timer() as elapsed:
+        for _ in range(args.polls):
+            for match_id, player_id in pollers:
+                live_matches.discard(match_id, forward=False)
+                live_matches.get_state(db, match_id, player_id)
+    db.close()
+    total = args.polls * len(pollers)
+    rows.append(["database (miss)", f"{counter.count / total:.1f}", f"{elapsed['ms'] / total:.3f}"])
+    rows.append(["live store (hit)", f"{warm[0]:.1f}", f"{warm[1]:.3f}"])
+
+    print(f"{len(pollers)} players x {args.polls} state polls, in-memory SQLite\n")
+    print_table(["served from", "SQL/poll", "ms/poll"], rows)
+
+    print("\nChecks")
+    check(warm[0] == 0, "in-progress match state is served without SQL")
+
+    match_id, player_id = pollers[0]
+    opponent_id = pollers[1][1]
+    db = SessionFactory()
+    MatchService.update_health(db, match_id, player_id, -5)
+    with QueryCounter(engine) as counter:
+        state = live_matches.get_state(db, match_id, opponent_id)
+    check(state["opponent_health"] == starting_life - 5 and counter.count == 0,
+          "health updates are visible to the opponent without SQL")
+
+    # Two requests that commit in one order and patch the store in the other
+    patches = []
+    update_health = live_matches.update_health
+    live_matches.update_health = lambda mid, state: patches.append((mid, state))
+    try:
+        MatchService.update_health(db, match_id, player_id, -1)
+        MatchService.update_health(db, match_id, player_id, -1)
+    finally:
+        live_matches.update_health = update_health
+    for mid, patch in reversed(patches):
+        live_matches.update_health(mid, patch)
+    state = live_matches.get_state(db, match_id, player_id)
+    check(state["your_health"] == starting_life - 7, "a late patch does not overwrite a newer health")
+
+    tracked = live_matches.stats()["tracked_matches"]
+    MatchService.confirm_defeat(db, match_id, player_id)
+    check(live_matches.stats()["tracked_matches"] == tracked - 1, "a confirmed defeat evicts the match")
+    state = live_matches.get_state(db, match_id, player_id)
+    check(state["status"] == "completed" and state["your_health"] == starting_life - 7,
+          "a finished match is read from the database")
+    check(live_matches.stats()["tracked_matches"] == tracked - 1, "a finished match is not cached again")
+    db.close()
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
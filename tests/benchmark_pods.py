@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Benchmark and consistency check for pod mode (pairing="pods").
+
+First models event length with random match durations: with one global
+round barrier every round lasts as long as its slowest table in the whole
+event, while pods only wait on their own tables. Then plays a pod tournament
+through the service layer and checks that pods advance on their own, that
+every pod plays a full round robin of its own players, that standings rank
+within each pod, that the tournament completes once every pod has played
+out, and that the current round then shows each pod's last round. Exits 1 if
+a check fails.
+
+Usage:
+    python3 benchmark_pods.py [--players 64 128 256] [--pod-size 8] [--check-players 36]
+"""
+
+import argparse
+import random
+import sys
+from itertools import combinations
+
+from benchmark_utils import QueryCounter, make_session_factory, print_table, seed_tournament, timer
+
+from api.players import get_player_matches
+from fastapi import HTTPException
+
+from api.tournament import _build_current_round
+from models import Match, Player, Round
+from services.match_service import MatchService
+from services.scheduler import round_count
+from services.tournament_service import TournamentService
+
+
+def match_minutes(rng: random.Random) -> float:
+    """About 35 minutes; one table in twenty goes to time (50 minutes plus extra turns)."""
+    if rng.random() < 0.05:
+        return 50 + rng.random() * 10
+    return min(rng.lognormvariate(3.5, 0.3), 50)
+
+
+def event_minutes(num_players: int, pod_size: int, seed: int = 1):
+    """(pods, rounds, minutes with a global round barrier, minutes with independent pods)."""
+    rng = random.Random(seed)
+    pods = TournamentService.split_into_pods(list(range(num_players)), pod_size)
+    rounds = round_count(len(pods[0]))
+    # durations[round][pod] = longest match of that pod's round
+    durations = [
+        [max(match_minutes(rng) for _ in range(len(pod) // 2)) for pod in pods]
+        for _ in range(rounds)
+    ]
+    barrier = sum(max(round_durations) for round_durations in durations)
+    independent = max(sum(durations[r][p] for r in range(rounds)) for p in range(len(pods)))
+    return len(pods), rounds, barrier, independent
+
+
+def play_round(db, round_obj: Round):
+    """Join and finish every open match of a round, player 1 winning."""
+    for match in list(round_obj.matches):
+        if match.status == "completed":
+            continue
+        for player_id in (match.player1_id, match.player2_id):
+            MatchService.join_match(db, match.id, player_id, 20)
+        MatchService.confirm_defeat(db, match.id, match.player2_id)
+
+
+def pod_round(db, tournament_id: int, pod: int):
+    return db.query(Round).filter(
+        Round.tournament_id == tournament_id,
+        Round.pod == pod,
+        Round.status == "in_progress"
+    ).first()
+
+
+def check_service(num_players: int, pod_size: int) -> list:
+    engine, Session = make_session_factory()
+    db = Session()
+    tournament = seed_tournament(db, num_players)
+    tournament.pairing = "pods"
+    tournament.pod_size = pod_size
+    db.commit()
+    tournament_id = tournament.id
+
+    failures = []
+    with QueryCounter(engine) as counter, timer() as elapsed:
+        TournamentService.generate_schedule(db, tournament_id)
+    print(f"\nGenerated {num_players} players in pods of up to {pod_size}: "
+          f"{counter.count} statements, {elapsed['ms']:.1f} ms")
+
+    pods = {}
+    for player_id, pod in db.query(Player.id, Player.pod).filter(Player.tournament_id == tournament_id):
+        pods.setdefault(pod, []).append(player_id)
+    if len(pods) < 2:
+        return ["need at least two pods for the check"]
+
+    # Play pod 1 to the end while every other pod sits in round 1
+    rounds_in_pod = round_count(len(pods[1]))
+    while pod_round(db, tournament_id, 1):
+        play_round(db, pod_round(db, tournament_id, 1))
+    db.expire_all()
+    tournament = TournamentService.get_tournament(db, tournament_id)
+    others = [pod_round(db, tournament_id, pod) for pod in pods if pod != 1]
+    if any(r is None or r.round_number != 1 for r in others):
+        failures.append("other pods moved when pod 1 finished its rounds")
+    if tournament.status != "in_progress" or tournament.current_round != 1:
+        failures.append(f"tournament at round {tournament.current_round} ({tournament.status}), expected 1 (in_progress)")
+    live_pods = {m.pod for m in _build_current_round(db, tournament_id)["matches"]}
+    if live_pods != set(pods) - {1}:
+        failures.append(f"current round shows pods {sorted(live_pods)}")
+    upcoming = get_player_matches(pods[2][0], db).upcoming_matches
+    if len(upcoming) != round_count(len(pods[2])) - 1 or any(u.round_number < 2 for u in upcoming):
+        failures.append(f"pod 2 player sees {len(upcoming)} upcoming matches")
+    print(f"Pod 1 played {rounds_in_pod} rounds while pods 2..{len(pods)} stayed in round 1")
+
+    # Play out the rest, pods at different speeds
+    rng = random.Random(num_players)
+    while True:
+        playing = [pod for pod in pods if pod_round(db, tournament_id, pod)]
+        if not playing:
+            break
+        play_round(db, pod_round(db, tournament_id, rng.choice(playing)))
+    db.expire_all()
+    tournament = TournamentService.get_tournament(db, tournament_id)
+    if tournament.status != "completed":
+        failures.append(f"tournament {tournament.status} after every pod finished")
+    try:
+        current = _build_current_round(db, tournament_id)
+        final_pods = {m.pod for m in current["matches"]}
+        if final_pods != set(pods) or current["status"] != "completed":
+            failures.append(f"finished event shows pods {sorted(final_pods)} ({current['status']}) as current")
+        elif len(current["matches"]) != sum(len(player_ids) // 2 for player_ids in pods.values()):
+            failures.append(f"finished event shows {len(current['matches'])} matches, expected each pod's last round")
+    except HTTPException as e:
+        failures.append(f"current round of a finished event: {e.status_code} {e.detail}")
+
+    pod_of = {player_id: pod for pod, player_ids in pods.items() for player_id in player_ids}
+    played = [frozenset(pair) for pair in db.query(Match.player1_id, Match.player2_id)]
+    expected = {frozenset(pair) for player_ids in pods.values() for pair in combinations(player_ids, 2)}
+    if len(played) != len(set(played)) or set(played) != expected:
+        failures.append("pods did not each play exactly one full round robin")
+    if any(pod_of[a] != pod_of[b] for a, b in played):
+        failures.append("a match crosses pods")
+
+    standings = TournamentService.get_standings(db, tournament_id)
+    for pod, player_ids in pods.items():
+        ranks = sorted(s["rank"] for s in standings if s["pod"] == pod)
+        if ranks != list(range(1, len(player_ids) + 1)):
+            failures.append(f"pod {pod} ranks {ranks}")
+    if TournamentService.get_standings(db, tournament_id, pod=2) != [s for s in standings if s["pod"] == 2]:
+        failures.append("per-pod standings differ from the pod's rows in the full table")
+
+    db.close()
+    engine.dispose()
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pod mode")
+    parser.add_argument("--players", type=int, nargs="+", default=[64, 128, 256])
+    parser.add_argument("--pod-size", type=int, default=8)
+    parser.add_argument("--check-players", type=int, default=36)
+    args = parser.parse_args()
+
+    rows = []
+    for num_players in args.players:
+        pods, rounds, barrier, independent = event_minutes(num_players, args.pod_size)
+        rows.append([num_players, pods, rounds, f"{barrier:.0f}", f"{independent:.0f}",
+                     f"{(1 - independent / barrier) * 100:.0f}%"])
+    print("Modelled event length (minutes)\n")
+    print_table(["players", "pods", "rounds", "global barrier", "independent pods", "saved"], rows)
+
+    failures = check_service(args.check_players, args.pod_size)
+    print()
+    for failure in failures:
+        print(f"✗ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✓ Pods advance independently, play their own round robins and rank within the pod")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark for connection pool sizing and the pool metrics (DB_POOL_*).
+
+Simulates many phones hitting the API at once: each thread checks out a
+connection, runs a standings query and holds the connection for a simulated
+request time. Runs once per pool size and prints the same counters that
+GET /api/admin/metrics reports under "database_pool".
+
+Usage:
+    python3 benchmark_pool.py [--phones 200] [--pool-sizes 5 10 20] [--hold-ms 20]
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+import benchmark_utils  # noqa: F401  (puts the backend on sys.path)
+from benchmark_utils import print_table, seed_tournament
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import sessionmaker
+
+import database.database as database
+from database.database import Base, create_db_engine, get_pool_stats
+from services.tournament_service import TournamentService
+
+
+def run(pool_size: int, args, path: str, tournament_id: int):
+    database.DB_POOL_SIZE = pool_size
+    database.DB_MAX_OVERFLOW = args.max_overflow
+    database.DB_POOL_TIMEOUT = args.timeout
+    engine = create_db_engine(f"sqlite:///{path}")
+    SessionFactory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    peak = {"checked_out": 0}
+    start_gate = threading.Barrier(args.phones)
+
+    def phone():
+        start_gate.wait()
+        for _ in range(args.requests):
+            db = SessionFactory()
+            try:
+                TournamentService.get_standings(db, tournament_id)
+                peak["checked_out"] = max(peak["checked_out"], engine.pool.checkedout())
+                time.sleep(args.hold_ms / 1000)
+            except PoolTimeoutError:
+                pass
+            finally:
+                db.close()
+
+    threads = [threading.Thread(target=phone) for _ in range(args.phones)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    stats = get_pool_stats(engine)
+    engine.dispose()
+    return [
+        pool_size,
+        args.max_overflow,
+        peak["checked_out"],
+        stats["checkouts"],
+        stats["timeouts"],
+        f"{stats['wait_ms_avg']:.1f}",
+        f"{stats['wait_ms_max']:.1f}",
+        f"{elapsed:.2f}"
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark connection pool sizing")
+    parser.add_argument("--phones", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=3, help="Requests per phone")
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[5, 10, 20])
+    parser.add_argument("--max-overflow", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=2.0, help="Pool timeout in seconds")
+    parser.add_argument("--hold-ms", type=float, default=20, help="Simulated request time per checkout")
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "benchmark.db")
+    setup_engine = create_db_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=setup_engine)
+    db = sessionmaker(bind=setup_engine)()
+    tournament_id = seed_tournament(db, 32).id
+    db.close()
+    setup_engine.dispose()
+
+    rows = [run(size, args, path, tournament_id) for size in args.pool_sizes]
+    os.remove(path)
+
+    print(f"{args.phones} phones x {args.requests} requests, {args.hold_ms:g} ms per request, "
+          f"pool timeout {args.timeout:g}s\n")
+    print_table(
+        ["pool size", "max overflow", "peak checked out", "checkouts", "timeouts",
+         "wait avg ms", "wait max ms", "total s"],
+        rows
+    )
+
+
+if __name__ == "__main__":
+    main()
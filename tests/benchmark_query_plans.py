@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Query-plan check for the hot-path queries against a large history.
+
+Seeds thousands of finished tournaments plus one live tournament, runs the
+endpoints and services that phones and dashboards hit during a round while
+recording every SELECT and UPDATE they issue, and runs EXPLAIN QUERY PLAN on
+each. Exits 1 if any of them scans a whole table (or a whole index) instead
+of searching an index, so a missing index shows up before history makes it
+slow. Walking an index in ORDER BY order up to a LIMIT (the current
+tournament) is allowed.
+
+Usage:
+    python3 benchmark_query_plans.py [--tournaments 2000] [--players 8]
+"""
+
+import argparse
+import random
+import re
+import sys
+from datetime import datetime, timedelta
+
+import benchmark_utils  # noqa: F401  (puts the backend on sys.path)
+from benchmark_utils import make_session_factory, print_table, seed_tournament, timer
+
+from sqlalchemy import event, insert
+
+from api.players import get_player_matches, join_tournament
+from api.tournament import _build_current_round, _build_current_tournament, _build_standings, get_schedule
+from models import Match, MatchEvent, Player, Round, Tournament
+from schemas.player import PlayerJoin
+from services.live_match_store import live_matches
+from services.match_service import MatchService
+from services.scheduler import generate_round_robin_schedule
+from services.tournament_service import TournamentService
+
+# Tables that grow with history; a SCAN of any of them fails the check
+HISTORY_TABLES = {"tournaments", "players", "rounds", "matches", "match_events", "standings"}
+SCAN = re.compile(r"^SCAN (\w+)")
+
+
+def seed_history(engine, num_tournaments: int, num_players: int):
+    """Bulk-insert finished round-robin tournaments with match events."""
+    rng = random.Random(1)
+    started = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        for t in range(num_tournaments):
+            created = started + timedelta(hours=t)
+            tournament_id = conn.execute(insert(Tournament).values(
+                name=f"History {t}", max_players=num_players, status="completed",
+                current_round=num_players - 1, created_at=created, completed_at=created
+            )).inserted_primary_key[0]
+            conn.execute(insert(Player), [
+                {"tournament_id": tournament_id, "name": f"Player {i}"} for i in range(num_players)
+            ])
+            player_ids = [row[0] for row in conn.execute(
+                Player.__table__.select().with_only_columns(Player.id).where(Player.tournament_id == tournament_id)
+            )]
+            players = [Player(id=pid) for pid in player_ids]
+            for round_number, pairings in enumerate(generate_round_robin_schedule(players), start=1):
+                round_id = conn.execute(insert(Round).values(
+                    tournament_id=tournament_id, round_number=round_number, status="completed"
+                )).inserted_primary_key[0]
+                rows = []
+                for player1, player2 in pairings:
+                    rows.append({
+                        "round_id": round_id, "player1_id": player1.id, "player2_id": player2.id,
+                        "player1_health": 0, "player2_health": 7, "status": "completed",
+                        "winner_id": rng.choice([player1.id, player2.id])
+                    })
+                conn.execute(insert(Match), rows)
+        match_rows = conn.execute(Match.__table__.select().with_only_columns(Match.id, Match.player1_id)).all()
+        conn.execute(insert(MatchEvent), [
+            {"match_id": match_id, "player_id": player_id, "event_type": "health_change", "old_value": 20, "new_value": 13}
+            for match_id, player_id in match_rows for _ in range(3)
+        ])
+
+
+def hot_path(db, tournament_id: int, registration_id: int, player_id: int, match_id: int):
+    """(label, callable) for every query path used while a round is played."""
+    return [
+        ("current tournament", lambda: _build_current_tournament(db)),
+        ("current round", lambda: _build_current_round(db, tournament_id)),
+        ("standings", lambda: _build_standings(db, tournament_id)),
+        ("schedule", lambda: get_schedule(tournament_id, db)),
+        ("player matches", lambda: get_player_matches(player_id, db)),
+        ("match state (miss)", lambda: live_matches.load(db, match_id)),
+        ("health update", lambda: MatchService.update_health(db, match_id, player_id, -1)),
+        ("round completion", lambda: (MatchService._record_completion(db, db.get(Match, match_id)), db.rollback())),
+        ("join (name check)", lambda: join_tournament(PlayerJoin(tournament_id=registration_id, name="Newcomer"), db)),
+        ("player wins", lambda: db.query(Match).filter(Match.winner_id == player_id).count()),
+        ("player open matches", lambda: db.query(Match).filter(
+            (Match.player1_id == player_id) | (Match.player2_id == player_id),
+            Match.status != "completed"
+        ).all()),
+        ("match history", lambda: db.query(MatchEvent).filter(
+            MatchEvent.match_id == match_id
+        ).order_by(MatchEvent.timestamp).all()),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check hot-path query plans for full scans")
+    parser.add_argument("--tournaments", type=int, default=2000)
+    parser.add_argument("--players", type=int, default=8)
+    args = parser.parse_args()
+
+    engine, SessionFactory = make_session_factory()
+    with timer() as elapsed:
+        seed_history(engine, args.tournaments, args.players)
+    print(f"Seeded {args.tournaments} finished tournaments in {elapsed['ms'] / 1000:.1f}s")
+
+    db = SessionFactory()
+    registration = seed_tournament(db, 3)
+    registration.max_players = 4
+    db.commit()
+    registration_id = registration.id
+    tournament = seed_tournament(db, args.players)
+    tournament_id = tournament.id
+    TournamentService.generate_schedule(db, tournament_id)
+    match = db.query(Match).join(Round).filter(
+        Round.tournament_id == tournament_id,
+        Round.round_number == 1
+    ).first()
+    match_id, player_id = match.id, match.player1_id
+    for pid in (match.player1_id, match.player2_id):
+        MatchService.join_match(db, match_id, pid, 20)
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE")):
+            statements.append((statement, parameters))
+
+    rows = []
+    failures = []
+    raw = engine.raw_connection()
+    for label, run in hot_path(db, tournament_id, registration_id, player_id, match_id):
+        statements.clear()
+        db.expire_all()
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            run()
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        scans = []
+        for statement, parameters in statements:
+            for detail in raw.execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall():
+                found = SCAN.match(detail[-1])
+                if not found or found.group(1) not in HISTORY_TABLES:
+                    continue
+                # Walking an index in ORDER BY order stops at the LIMIT
+                if "USING INDEX" in detail[-1] and " LIMIT " in statement:
+                    continue
+                scans.append(detail[-1])
+        if scans:
+            failures.append((label, scans))
+        rows.append([label, len(statements), "FULL SCAN" if scans else "ok"])
+    raw.close()
+    db.close()
+
+    print()
+    print_table(["query path", "statements", "plan"], rows)
+    for label, scans in failures:
+        print(f"\n{label}:")
+        for detail in scans:
+            print(f"  {detail}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Concurrency check for round-completion tracking (Round.remaining_matches).
+
+Plays rounds on a file-backed SQLite database (production profile) and
+fires the last defeats of every round from parallel threads, each with its
+own session, released together by a barrier. Checks that each round
+advances exactly once and the tournament ends on the right round, and that
+two requests confirming the same match count it once. The same run with the
+original check (COUNT the round's open matches after every defeat) is shown
+for comparison, along with SQL statements per defeat. Exits 1 if the
+counter-based check double-advances or misses an advance.
+
+Usage:
+    python3 benchmark_round_completion.py [--players 16] [--parallel 4] [--trials 3]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+
+from benchmark_utils import QueryCounter, print_table, seed_tournament
+
+from sqlalchemy.orm import sessionmaker
+
+from database.database import Base, create_db_engine
+from models import Match, Round
+from services.match_service import MatchService
+from services.tournament_service import TournamentService
+
+
+def legacy_check_round_completion(db, round_id: int, remaining_matches=None) -> dict:
+    """The original check: COUNT the round's open matches after each defeat."""
+    round_obj = db.query(Round).filter(Round.id == round_id).first()
+    incomplete = db.query(Match).filter(Match.round_id == round_id, Match.status != "completed").count()
+    if incomplete == 0:
+        result = TournamentService.advance_to_next_round(db, round_obj.tournament_id)
+        return {"round_completed": True, "new_round": result["current_round"]}
+    return {"round_completed": False}
+
+
+def in_parallel(Session, calls):
+    """Run each call(db) in its own thread and session, started together."""
+    barrier = threading.Barrier(len(calls))
+    results = [None] * len(calls)
+
+    def worker(index, call):
+        db = Session()
+        try:
+            barrier.wait()
+            results[index] = call(db)
+        except ValueError as e:
+            results[index] = e
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=worker, args=(i, call)) for i, call in enumerate(calls)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def defeat(match_id: int, loser_id: int):
+    return lambda db: MatchService.confirm_defeat(db, match_id, loser_id)
+
+
+def play(num_players: int, parallel: int, legacy: bool) -> dict:
+    """Play a whole round robin, finishing each round with parallel defeats."""
+    path = tempfile.mktemp(suffix=".db")
+    engine = create_db_engine(f"sqlite:///{path}", "production")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    original = MatchService.check_round_completion
+    if legacy:
+        MatchService.check_round_completion = staticmethod(legacy_check_round_completion)
+
+    stats = {"rounds": 0, "advances": 0, "double": 0, "missed": 0, "statements": []}
+    try:
+        db = Session()
+        tournament_id = seed_tournament(db, num_players).id
+        TournamentService.generate_schedule(db, tournament_id)
+
+        while True:
+            db.expire_all()
+            tournament = TournamentService.get_tournament(db, tournament_id)
+            if tournament.status == "completed":
+                break
+            start_round = tournament.current_round
+            round_obj = db.query(Round).filter(
+                Round.tournament_id == tournament_id,
+                Round.round_number == start_round
+            ).one()
+            matches = list(round_obj.matches)
+            for match in matches:
+                for player_id in (match.player1_id, match.player2_id):
+                    MatchService.join_match(db, match.id, player_id, 20)
+
+            # Finish all but the last few one at a time, counting statements
+            serial, last = matches[:-parallel], matches[-parallel:]
+            for match in serial:
+                with QueryCounter(engine) as counter:
+                    MatchService.confirm_defeat(db, match.id, match.player2_id)
+                stats["statements"].append(counter.count)
+
+            results = in_parallel(Session, [defeat(m.id, m.player2_id) for m in last])
+            advanced = sum(
+                1 for r in results if isinstance(r, dict) and r["round_info"].get("round_completed")
+            )
+            stats["rounds"] += 1
+            stats["advances"] += advanced
+            db.expire_all()
+            tournament = TournamentService.get_tournament(db, tournament_id)
+            if advanced > 1 or tournament.current_round > start_round + 1:
+                stats["double"] += 1
+            if tournament.status != "completed" and tournament.current_round == start_round:
+                stats["missed"] += 1
+                break  # Stuck: nothing will advance this round
+        db.close()
+    finally:
+        MatchService.check_round_completion = original
+        engine.dispose()
+        os.remove(path)
+    return stats
+
+
+def same_match_twice(num_players: int) -> list:
+    """Confirm one match from two requests at once; it must count once."""
+    path = tempfile.mktemp(suffix=".db")
+    engine = create_db_engine(f"sqlite:///{path}", "production")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = Session()
+    tournament_id = seed_tournament(db, num_players).id
+    TournamentService.generate_schedule(db, tournament_id)
+    round_obj = db.query(Round).filter(Round.tournament_id == tournament_id, Round.round_number == 1).one()
+    match = round_obj.matches[0]
+    for player_id in (match.player1_id, match.player2_id):
+        MatchService.join_match(db, match.id, player_id, 20)
+
+    results = in_parallel(Session, [defeat(match.id, match.player1_id), defeat(match.id, match.player2_id)])
+    db.expire_all()
+    failures = []
+    if sum(isinstance(r, dict) for r in results) != 1:
+        failures.append(f"same match confirmed twice: {results}")
+    if round_obj.remaining_matches != len(round_obj.matches) - 1:
+        failures.append(f"round counts {round_obj.remaining_matches} open matches after one completion")
+    db.close()
+    engine.dispose()
+    os.remove(path)
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Round-completion concurrency check")
+    parser.add_argument("--players", type=int, default=16)
+    parser.add_argument("--parallel", type=int, default=4, help="Final defeats fired at once per round")
+    parser.add_argument("--trials", type=int, default=3)
+    args = parser.parse_args()
+    parallel = min(args.parallel, args.players // 2)
+
+    rows, failures = [], []
+    for label, legacy in [("COUNT per defeat (original)", True), ("remaining_matches counter", False)]:
+        totals = {"rounds": 0, "advances": 0, "double": 0, "missed": 0, "statements": []}
+        for _ in range(args.trials):
+            stats = play(args.players, parallel, legacy)
+            for key in ("rounds", "advances", "double", "missed"):
+                totals[key] += stats[key]
+            totals["statements"] += stats["statements"]
+        statements = sum(totals["statements"]) / max(1, len(totals["statements"]))
+        rows.append([label, totals["rounds"], totals["advances"], totals["double"], totals["missed"], f"{statements:.1f}"])
+        if not legacy and (totals["double"] or totals["missed"] or totals["advances"] != totals["rounds"]):
+            failures.append(f"counter: {totals['double']} double and {totals['missed']} missed advances")
+
+    print(f"{args.players} players, last {parallel} defeats of each round in parallel, {args.trials} trials\n")
+    print_table(["round check", "rounds", "advances", "double", "missed", "statements/defeat"], rows)
+
+    failures += same_match_twice(args.players)
+    print()
+    for failure in failures:
+        print(f"✗ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✓ Every round advanced exactly once; a match confirmed twice at once counted once")
+
+
+if __name__ == "__main__":
+    main()
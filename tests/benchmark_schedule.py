@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark and query-count check for GET /api/tournament/{id}/schedule.
+
+The schedule endpoint must emit a fixed number of SQL statements regardless
+of player count. The script exits non-zero if any run exceeds
+MAX_SCHEDULE_QUERIES.
+
+Usage:
+    python3 benchmark_schedule.py [--players 4 8 20 64]
+"""
+
+import argparse
+import sys
+
+from benchmark_utils import make_session_factory, measure, seed_tournament, complete_matches, print_table
+
+from models import Match
+from services.tournament_service import TournamentService
+from api.tournament import get_schedule
+
+# tournament lookup + rounds + matches (selectin) + player names
+MAX_SCHEDULE_QUERIES = 4
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the schedule endpoint")
+    parser.add_argument("--players", type=int, nargs="+", default=[4, 8, 20, 64])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = []
+    failures = []
+    for num_players in args.players:
+        engine, Session = make_session_factory()
+        db = Session()
+        tournament_id = seed_tournament(db, num_players).id
+        TournamentService.generate_schedule(db, tournament_id)
+        complete_matches(db, db.query(Match).all(), fraction=0.5)
+        total_matches = db.query(Match).count()
+
+        # Start from an empty identity map so every call loads from the database
+        def run():
+            db.expire_all()
+            return get_schedule(tournament_id, db)
+
+        queries, elapsed_ms = measure(engine, run, args.repeat)
+        response = run()
+        assert sum(len(r.matches) for r in response["rounds"]) == total_matches
+
+        if queries > MAX_SCHEDULE_QUERIES:
+            failures.append(num_players)
+
+        rows.append([num_players, len(response["rounds"]), total_matches, queries, f"{elapsed_ms:.2f}"])
+        db.close()
+        engine.dispose()
+
+    print_table(["players", "rounds", "matches", "queries", "ms"], rows)
+
+    if failures:
+        print(f"\n✗ Schedule exceeded {MAX_SCHEDULE_QUERIES} queries for player counts: {failures}")
+        sys.exit(1)
+    print(f"\n✓ Schedule stays within {MAX_SCHEDULE_QUERIES} queries at every size")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark and equivalence check for the round-robin pairing functions
+(services/scheduler.py).
+
+Checks that pairing_for_round and opponent_of reproduce the original
+rotate-the-list schedule exactly (existing tournaments keep their pairings),
+then times one round and one opponent lookup against building the whole
+schedule. Exits 1 on a mismatch.
+
+Usage:
+    python3 benchmark_scheduler.py [--players 20 100 500 2000]
+"""
+
+import argparse
+import sys
+
+import benchmark_utils  # noqa: F401  (puts the backend on sys.path)
+from benchmark_utils import print_table, timer
+
+from services.scheduler import opponent_of, pairing_for_round, round_count
+
+
+def legacy_schedule(players):
+    """The original implementation: rotate the whole list every round."""
+    players_list = players.copy()
+    n = len(players_list)
+    if n % 2 == 1:
+        players_list.append(None)
+        n += 1
+    rounds = []
+    for _ in range(n - 1):
+        rounds.append([
+            (players_list[i], players_list[n - 1 - i])
+            for i in range(n // 2)
+            if players_list[i] is not None and players_list[n - 1 - i] is not None
+        ])
+        players_list = [players_list[0]] + [players_list[-1]] + players_list[1:-1]
+    return rounds
+
+
+def check_equivalence(max_players: int) -> bool:
+    for n in range(2, max_players + 1):
+        schedule = legacy_schedule(list(range(n)))
+        for round_index, pairs in enumerate(schedule):
+            if pairing_for_round(n, round_index) != pairs:
+                return False
+            opponents = {a: b for a, b in pairs}
+            opponents.update({b: a for a, b in pairs})
+            if any(opponent_of(n, p, round_index) != opponents.get(p) for p in range(n)):
+                return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark round-robin pairing functions")
+    parser.add_argument("--players", type=int, nargs="+", default=[20, 100, 500, 2000])
+    parser.add_argument("--check-up-to", type=int, default=64, help="Verify every player count up to this")
+    args = parser.parse_args()
+
+    ok = check_equivalence(args.check_up_to)
+    print(f"{'✓' if ok else '✗'} pairing_for_round / opponent_of match the original schedule "
+          f"for 2..{args.check_up_to} players\n")
+
+    rows = []
+    for n in args.players:
+        players = list(range(n))
+        middle = round_count(n) // 2
+        with timer() as full:
+            legacy_schedule(players)
+        with timer() as one_round:
+            pairing_for_round(n, middle)
+        with timer() as all_opponents:
+            for round_index in range(round_count(n)):
+                opponent_of(n, n // 2, round_index)
+        rows.append([
+            n,
+            f"{full['ms']:.2f}",
+            f"{one_round['ms']:.3f}",
+            f"{all_opponents['ms']:.3f}"
+        ])
+    print_table(["players", "whole schedule ms", "one round ms", "one player's opponents ms"], rows)
+
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
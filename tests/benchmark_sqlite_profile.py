@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the SQLite tuning profiles (SQLITE_PROFILE).
+
+For each profile, writer threads commit health updates while reader threads
+poll standings and the current round against the same file-backed database,
+as dashboards do during a busy round. Reports throughput, latency and
+"database is locked" errors on both sides.
+
+Usage:
+    python3 benchmark_sqlite_profile.py [--writers 2] [--readers 4] [--seconds 3]
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+import benchmark_utils  # noqa: F401  (puts the backend on sys.path)
+from benchmark_utils import print_table, seed_tournament
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from database.database import Base, SQLITE_PROFILES, create_db_engine
+from models import Match, Round
+from services.match_service import MatchService
+from services.tournament_service import TournamentService
+
+
+def setup(SessionFactory, num_players: int):
+    """Create a tournament with its first round in progress; return (id, targets)."""
+    db = SessionFactory()
+    tournament = seed_tournament(db, num_players)
+    TournamentService.generate_schedule(db, tournament.id)
+    matches = db.query(Match).join(Round).filter(
+        Round.tournament_id == tournament.id,
+        Round.round_number == 1
+    ).all()
+    for match in matches:
+        match.player1_health = match.player2_health = 20
+        match.status = "in_progress"
+    targets = [(m.id, m.player1_id) for m in matches] + [(m.id, m.player2_id) for m in matches]
+    db.commit()
+    tournament_id = tournament.id
+    db.close()
+    return tournament_id, targets
+
+
+def percentile(values, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+def run_profile(profile: str, args):
+    path = os.path.join(tempfile.mkdtemp(), "benchmark.db")
+    engine = create_db_engine(f"sqlite:///{path}", sqlite_profile=profile)
+    Base.metadata.create_all(bind=engine)
+    SessionFactory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    tournament_id, targets = setup(SessionFactory, args.players)
+
+    stop = threading.Event()
+    results = {"write": [], "read": [], "write_errors": 0, "read_errors": 0}
+    lock = threading.Lock()
+
+    def worker(kind: str, index: int):
+        latencies, errors, i = [], 0, 0
+        while not stop.is_set():
+            db = SessionFactory()
+            start = time.perf_counter()
+            try:
+                if kind == "write":
+                    match_id, player_id = targets[(index + i) % len(targets)]
+                    MatchService.update_health(db, match_id, player_id, 1 if i % 2 else -1)
+                else:
+                    TournamentService.get_standings(db, tournament_id)
+                    db.query(Match).join(Round).filter(Round.tournament_id == tournament_id).all()
+                latencies.append((time.perf_counter() - start) * 1000)
+            except OperationalError:
+                errors += 1
+                db.rollback()
+            finally:
+                db.close()
+            i += 1
+        with lock:
+            results[kind] += latencies
+            results[f"{kind}_errors"] += errors
+
+    threads = [threading.Thread(target=worker, args=("write", i)) for i in range(args.writers)]
+    threads += [threading.Thread(target=worker, args=("read", i)) for i in range(args.readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    return [
+        profile,
+        f"{len(results['write']) / args.seconds:.0f}",
+        f"{percentile(results['write'], 0.99):.1f}",
+        results["write_errors"],
+        f"{len(results['read']) / args.seconds:.0f}",
+        f"{percentile(results['read'], 0.99):.1f}",
+        results["read_errors"]
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SQLite tuning profiles")
+    parser.add_argument("--players", type=int, default=32)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=3)
+    parser.add_argument("--profiles", nargs="+", default=sorted(SQLITE_PROFILES))
+    args = parser.parse_args()
+
+    rows = [run_profile(profile, args) for profile in args.profiles]
+    print(f"{args.writers} writer / {args.readers} reader threads for {args.seconds:g}s, "
+          f"{args.players} players, file-backed SQLite\n")
+    print_table(
+        ["profile", "writes/s", "write p99 ms", "write errors", "reads/s", "read p99 ms", "read errors"],
+        rows
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark for TournamentService.get_standings.
+
+Compares the original per-player COUNT implementation, the grouped
+aggregate query used to rebuild standings, and the materialized standings
+read, reporting SQL statements and latency per call.
+
+Usage:
+    python3 benchmark_standings.py [--players 8 20 64 256]
+"""
+
+import argparse
+import json
+
+from benchmark_utils import make_session_factory, measure, seed_tournament, complete_matches, print_table
+
+from models import Match, Player
+from services.tournament_service import TournamentService, get_avatar_url
+from services.standings_service import StandingsService
+
+
+def legacy_standings(db, tournament_id: int):
+    """The original implementation: two COUNT queries per player."""
+    players = db.query(Player).filter(Player.tournament_id == tournament_id).all()
+    standings = []
+    for player in players:
+        wins = db.query(Match).filter(Match.winner_id == player.id).count()
+        played = db.query(Match).filter(
+            ((Match.player1_id == player.id) | (Match.player2_id == player.id)) &
+            (Match.status == "completed")
+        ).count()
+        standings.append({
+            "player_id": player.id,
+            "name": player.name,
+            "avatar_url": get_avatar_url(player.avatar_path),
+            "colors": json.loads(player.colors) if player.colors else [],
+            "wins": wins,
+            "losses": played - wins,
+            "points": wins * 3,
+            "pod": player.pod  # Not in the original; None outside pod mode
+        })
+    standings.sort(key=lambda x: (-x["points"], x["name"]))
+    for i, standing in enumerate(standings, start=1):
+        standing["rank"] = i
+    return standings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tournament standings")
+    parser.add_argument("--players", type=int, nargs="+", default=[8, 20, 64, 256])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = []
+    for num_players in args.players:
+        engine, Session = make_session_factory()
+        db = Session()
+        tournament = seed_tournament(db, num_players)
+        TournamentService.generate_schedule(db, tournament.id)
+        complete_matches(db, db.query(Match).all(), fraction=0.5)
+        StandingsService.rebuild(db, tournament.id)
+
+        # All implementations must agree before we compare their cost
+        assert legacy_standings(db, tournament.id) == TournamentService.get_standings(db, tournament.id)
+
+        legacy_q, legacy_ms = measure(engine, lambda: legacy_standings(db, tournament.id), args.repeat)
+        agg_q, agg_ms = measure(engine, lambda: StandingsService.compute_from_matches(db, tournament.id), args.repeat)
+        read_q, read_ms = measure(engine, lambda: TournamentService.get_standings(db, tournament.id), args.repeat)
+
+        rows.append([
+            num_players,
+            db.query(Match).count(),
+            legacy_q, f"{legacy_ms:.2f}",
+            agg_q, f"{agg_ms:.2f}",
+            read_q, f"{read_ms:.2f}"
+        ])
+        db.close()
+        engine.dispose()
+
+    print_table(
+        ["players", "matches", "legacy queries", "legacy ms",
+         "aggregate queries", "aggregate ms", "materialized queries", "materialized ms"],
+        rows
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Benchmark and property check for Swiss pairing (services/swiss.py).
+
+Times pairing one round against player count over a simulated event with
+random results, then checks the pairing rules on many random events:
+nobody plays the same opponent twice or twice in a round, the bye only
+repeats when no other player can take it, and pairing only gives up when no
+rematch-free pairing exists (checked by brute force on small fields).
+Finally plays a Swiss tournament through TournamentService and checks the
+written rounds and that each bye is scored as a win, the same way when the
+standings are rebuilt. Exits 1 on a rule violation or a round over the time budget.
+
+Usage:
+    python3 benchmark_swiss.py [--players 100 1000 2000 5000] [--budget-ms 100] [--events 200]
+"""
+
+import argparse
+import random
+import sys
+
+from benchmark_utils import make_session_factory, print_table, seed_tournament, timer
+
+from models import Match, Round, Standing
+from services.match_service import MatchService
+from services.standings_service import StandingsService
+from services.swiss import pair_swiss_round, rank_players, swiss_round_count
+from services.tournament_service import TournamentService
+
+
+def has_perfect_pairing(players, opponents) -> bool:
+    """Brute force: can players be paired without a rematch?"""
+    if not players:
+        return True
+    first, rest = players[0], players[1:]
+    return any(
+        other not in opponents[first] and has_perfect_pairing([p for p in rest if p != other], opponents)
+        for other in rest
+    )
+
+
+def simulate(num_players: int, rounds: int, seed: int, brute_force: bool = False):
+    """Play random results for up to rounds rounds.
+
+    Returns (rounds played, per-round pairing ms, list of rule violations).
+    """
+    rng = random.Random(seed)
+    player_ids = list(range(1, num_players + 1))
+    points = {p: 0 for p in player_ids}
+    records = {p: (0, 0) for p in player_ids}
+    opponents = {p: set() for p in player_ids}
+    had_bye = set()
+    timings, errors = [], []
+
+    def can_pair_without(bye_players):
+        return any(has_perfect_pairing([p for p in player_ids if p != b], opponents) for b in bye_players)
+
+    for round_number in range(1, rounds + 1):
+        ranked = rank_players(player_ids, points, opponents, records)
+        try:
+            with timer() as elapsed:
+                pairs, bye = pair_swiss_round(ranked, opponents, had_bye)
+        except ValueError:
+            if brute_force:
+                possible = (has_perfect_pairing(player_ids, opponents) if num_players % 2 == 0
+                            else can_pair_without(player_ids))
+                if possible:
+                    errors.append(f"{num_players} players, round {round_number}: gave up on a possible pairing")
+            return round_number - 1, timings, errors
+        timings.append(elapsed["ms"])
+
+        if bye in had_bye and brute_force and can_pair_without([p for p in player_ids if p not in had_bye]):
+            errors.append(f"{num_players} players, round {round_number}: repeated bye")
+        if bye is not None:
+            had_bye.add(bye)
+
+        seen = {bye} if bye is not None else set()
+        for player1, player2 in pairs:
+            if player2 in opponents[player1]:
+                errors.append(f"{num_players} players, round {round_number}: rematch {player1}-{player2}")
+            if player1 in seen or player2 in seen or player1 == player2:
+                errors.append(f"{num_players} players, round {round_number}: player paired twice")
+            seen.update((player1, player2))
+            opponents[player1].add(player2)
+            opponents[player2].add(player1)
+            winner, loser = (player1, player2) if rng.random() < 0.5 else (player2, player1)
+            points[winner] += 3
+            records[winner] = (records[winner][0] + 1, records[winner][1] + 1)
+            records[loser] = (records[loser][0], records[loser][1] + 1)
+        if len(seen) != num_players:
+            errors.append(f"{num_players} players, round {round_number}: {num_players - len(seen)} left unpaired")
+    return rounds, timings, errors
+
+
+def check_tournament(num_players: int) -> list:
+    """Play a Swiss event through the service layer; return rule violations."""
+    engine, Session = make_session_factory()
+    db = Session()
+    tournament = seed_tournament(db, num_players)
+    tournament.pairing = "swiss"
+    db.commit()
+    TournamentService.generate_schedule(db, tournament.id)
+
+    rng = random.Random(num_players)
+    while tournament.status != "completed":
+        round_obj = db.query(Round).filter(
+            Round.tournament_id == tournament.id,
+            Round.round_number == tournament.current_round
+        ).one()
+        # The last defeat of a round advances the tournament
+        for match in list(round_obj.matches):
+            for player_id in (match.player1_id, match.player2_id):
+                MatchService.join_match(db, match.id, player_id, 20)
+            MatchService.confirm_defeat(db, match.id, rng.choice([match.player1_id, match.player2_id]))
+        db.refresh(tournament)
+
+    errors = []
+    rounds = db.query(Round).filter(Round.tournament_id == tournament.id).count()
+    if rounds != swiss_round_count(num_players):
+        errors.append(f"service: {rounds} rounds written, expected {swiss_round_count(num_players)}")
+    pairs = [frozenset(p) for p in db.query(Match.player1_id, Match.player2_id).all()]
+    if len(pairs) != len(set(pairs)):
+        errors.append(f"service: {len(pairs) - len(set(pairs))} rematches")
+
+    standings = db.query(Standing).filter(Standing.tournament_id == tournament.id).all()
+    byes = rounds * num_players - 2 * len(pairs)
+    if any(s.matches_played != rounds or s.points != 3 * s.wins for s in standings):
+        errors.append("service: a bye is not scored as a match won")
+    if sum(s.wins for s in standings) != len(pairs) + byes:
+        errors.append(f"service: {sum(s.wins for s in standings)} wins for {len(pairs)} matches and {byes} byes")
+    if StandingsService.rebuild(db, tournament.id):
+        errors.append("service: rebuilding the standings scores byes differently")
+    db.close()
+    engine.dispose()
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Swiss pairing")
+    parser.add_argument("--players", type=int, nargs="+", default=[100, 1000, 2000, 5000])
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="Longest allowed round pairing")
+    parser.add_argument("--events", type=int, default=200, help="Random events per small field size")
+    args = parser.parse_args()
+
+    rows, failures = [], []
+    for num_players in args.players:
+        rounds = swiss_round_count(num_players)
+        _, timings, errors = simulate(num_players, rounds, seed=num_players)
+        failures += errors
+        worst = max(timings)
+        if worst > args.budget_ms:
+            failures.append(f"{num_players} players: a round took {worst:.1f} ms")
+        rows.append([num_players, rounds, f"{sum(timings) / len(timings):.2f}", f"{worst:.2f}"])
+    print_table(["players", "rounds", "mean ms/round", "worst ms/round"], rows)
+
+    # Small fields, played until pairing runs out, cover the repair paths
+    events = 0
+    for num_players in range(2, 13):
+        for seed in range(args.events):
+            _, _, errors = simulate(num_players, num_players, seed, brute_force=True)
+            failures += errors
+            events += 1
+    for num_players in (64, 301):
+        for seed in range(20):
+            _, _, errors = simulate(num_players, 40, seed)
+            failures += errors
+            events += 1
+    failures += check_tournament(37)
+
+    print()
+    for failure in failures[:20]:
+        print(f"✗ {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"✓ {events} random events and a service-level tournament: no rematches, "
+          f"byes rotate and score a win, pairing only stops when no rematch-free pairing exists")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Shared helpers for the backend benchmark scripts.
+
+The benchmarks talk to the service layer directly (no running server needed)
+using an in-memory SQLite database, and count the SQL statements each
+operation emits.
+"""
+
+import os
+import random
+import sys
+import time
+from contextlib import contextmanager
+from typing import Callable, List, Tuple
+
+# Make the backend packages importable when run from the tests directory
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend"))
+sys.path.insert(0, BACKEND_DIR)
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database.database import Base
+from models import Tournament, Player, Match
+
+
+def make_session_factory(url: str = "sqlite://"):
+    """Create a fresh database with all tables and return (engine, sessionmaker)."""
+    if url == "sqlite://":
+        engine = create_engine(
+            url,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+    else:
+        engine = create_engine(url, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+class QueryCounter:
+    """Counts SQL statements executed on an engine while active."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+@contextmanager
+def timer():
+    """Yield a dict whose 'ms' key holds the elapsed time once the block exits."""
+    result = {"ms": 0.0}
+    start = time.perf_counter()
+    yield result
+    result["ms"] = (time.perf_counter() - start) * 1000
+
+
+def measure(engine, fn: Callable, repeat: int = 5) -> Tuple[int, float]:
+    """Run fn repeatedly, returning (statements per call, best wall time in ms)."""
+    best = float("inf")
+    queries = 0
+    for _ in range(repeat):
+        with QueryCounter(engine) as counter, timer() as elapsed:
+            fn()
+        queries = counter.count
+        best = min(best, elapsed["ms"])
+    return queries, best
+
+
+def seed_tournament(db, num_players: int, starting_life: int = 20) -> Tournament:
+    """Create a tournament with registered players (no schedule yet)."""
+    tournament = Tournament(
+        name=f"Benchmark {num_players}",
+        max_players=num_players,
+        starting_life=starting_life,
+        status="registration"
+    )
+    db.add(tournament)
+    db.flush()
+
+    colors = ["W", "U", "B", "R", "G"]
+    for i in range(num_players):
+        db.add(Player(
+            tournament_id=tournament.id,
+            name=f"Player {i:04d}",
+            colors='["%s"]' % random.choice(colors)
+        ))
+    db.commit()
+    db.refresh(tournament)
+    return tournament
+
+
+def complete_matches(db, matches: List[Match], fraction: float = 0.5, seed: int = 1):
+    """Mark a random fraction of matches completed with a random winner."""
+    rng = random.Random(seed)
+    for match in matches:
+        if rng.random() < fraction:
+            match.status = "completed"
+            match.winner_id = rng.choice([match.player1_id, match.player2_id])
+    db.commit()
+
+
+def print_table(headers: List[str], rows: List[list]):
+    """Print a simple aligned table."""
+    widths = [max(len(str(h)), *(len(str(r[i])) for r in rows)) for i, h in enumerate(headers)]
+    line = "  ".join(str(h).rjust(w) for h, w in zip(headers, widths))
+    print(line)
+    print("-" * len(line))
+    for row in rows:
+        print("  ".join(str(c).rjust(w) for c, w in zip(row, widths)))
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Benchmark for WebSocket fan-out in api/websockets.ConnectionManager.
+
+Simulates dashboard sockets in-process (no server needed), a few of which are
+deliberately slow, and compares the original sequential fan-out against the
+queued per-connection writers. Reports how long each broadcast blocks the
+caller and how long fast clients wait for their messages.
+
+A second run replays a burst of +1/-1 health taps across many matches and
+compares the frames each dashboard receives with and without a coalescing
+window (WS_COALESCE_MS).
+
+Usage:
+    python3 benchmark_websockets.py [--sockets 500] [--slow 5] [--slow-delay 0.2]
+                                    [--taps 1000] [--duration 2] [--coalesce-ms 50 100]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+
+# Tighter limits than production so slow consumers are detected within the run
+os.environ.setdefault("WS_SEND_TIMEOUT", "0.5")
+os.environ.setdefault("WS_SEND_QUEUE_SIZE", "8")
+
+import benchmark_utils  # noqa: F401  (puts the backend on sys.path)
+from benchmark_utils import print_table
+
+from api.websockets import ConnectionManager
+
+
+class FakeWebSocket:
+    """Stands in for a client socket; each send takes `delay` seconds."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.received = 0
+        self.last_received_at = 0.0
+        self.closed = False
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.received += 1
+        self.last_received_at = time.perf_counter()
+
+    async def send_json(self, message: dict):
+        await self.send_text(json.dumps(message))
+
+    async def close(self, code: int = 1000):
+        self.closed = True
+
+
+async def legacy_broadcast(sockets, message: dict):
+    """The original fan-out: serialize and await each socket in turn."""
+    for socket in sockets:
+        try:
+            await socket.send_json(message)
+        except Exception:
+            pass
+
+
+def make_sockets(total: int, slow: int, slow_delay: float):
+    return [FakeWebSocket(slow_delay if i < slow else 0) for i in range(total)]
+
+
+def message(i: int) -> dict:
+    return {"type": "health_update", "match_id": i % 10, "player_id": i % 20, "new_health": 20 - i % 20}
+
+
+async def run_legacy(args):
+    sockets = make_sockets(args.sockets, args.slow, args.slow_delay)
+    fast = sockets[args.slow:]
+    start = time.perf_counter()
+    block_ms = []
+    for i in range(args.broadcasts):
+        t0 = time.perf_counter()
+        await legacy_broadcast(sockets, message(i))
+        block_ms.append((time.perf_counter() - t0) * 1000)
+    delivered_ms = (max(s.last_received_at for s in fast) - start) * 1000
+    return block_ms, delivered_ms, sum(s.received for s in fast), 0
+
+
+async def run_queued(args):
+    sockets = make_sockets(args.sockets, args.slow, args.slow_delay)
+    fast = sockets[args.slow:]
+    manager = ConnectionManager()
+    for socket in sockets:
+        await manager.connect_dashboard(socket)
+
+    start = time.perf_counter()
+    block_ms = []
+    for i in range(args.broadcasts):
+        t0 = time.perf_counter()
+        await manager.broadcast_to_dashboard(message(i))
+        block_ms.append((time.perf_counter() - t0) * 1000)
+        # Let writer tasks run between broadcasts, as between real requests
+        await asyncio.sleep(0)
+
+    expected = args.broadcasts * len(fast)
+    while sum(s.received for s in fast) < expected:
+        await asyncio.sleep(0.001)
+    delivered_ms = (max(s.last_received_at for s in fast) - start) * 1000
+
+    # Give the send timeout a chance to evict the stalled clients
+    await asyncio.sleep(float(os.environ["WS_SEND_TIMEOUT"]) + 0.1)
+    disconnected = sum(1 for s in sockets[:args.slow] if s.closed)
+
+    for socket in list(manager.dashboard_connections):
+        manager.disconnect_dashboard(socket)
+    return block_ms, delivered_ms, sum(s.received for s in fast), disconnected
+
+
+async def run_taps(args, coalesce_ms: float):
+    """Replay health taps spread over args.duration and count frames per dashboard."""
+    sockets = make_sockets(args.sockets, 0, 0)
+    manager = ConnectionManager(coalesce_ms=coalesce_ms)
+    for socket in sockets:
+        await manager.connect_dashboard(socket)
+
+    rng = random.Random(1)
+    health = {}
+    pause = args.duration / args.taps
+    for i in range(args.taps):
+        match_id = rng.randrange(args.matches)
+        player_id = match_id * 2 + rng.randrange(2)
+        health[player_id] = health.get(player_id, 20) + rng.choice((-1, 1))
+        await manager.broadcast_to_dashboard(
+            {"type": "health_update", "match_id": match_id, "player_id": player_id, "new_health": health[player_id]}
+        )
+        # Taps arrive as separate requests: writers run in between
+        await asyncio.sleep(pause)
+    # Closing messages flush the last batch, as a match_complete would
+    await manager.broadcast_to_dashboard({"type": "round_complete", "round_number": 1})
+    while any(c.queue.qsize() for c in manager.dashboard_connections.values()):
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.05)
+
+    frames = max(s.received for s in sockets)
+    for socket in list(manager.dashboard_connections):
+        manager.disconnect_dashboard(socket)
+    return frames, manager.messages_sent
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark WebSocket fan-out")
+    parser.add_argument("--sockets", type=int, default=500)
+    parser.add_argument("--slow", type=int, default=5, help="Number of deliberately slow sockets")
+    parser.add_argument("--slow-delay", type=float, default=0.2, help="Seconds per send on slow sockets")
+    parser.add_argument("--broadcasts", type=int, default=10)
+    parser.add_argument("--taps", type=int, default=1000, help="Health taps in the coalescing run")
+    parser.add_argument("--matches", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=2.0, help="Seconds the taps are spread over")
+    parser.add_argument("--coalesce-ms", type=float, nargs="+", default=[50, 100])
+    args = parser.parse_args()
+
+    rows = []
+    for name, runner in [("sequential", run_legacy), ("queued", run_queued)]:
+        block_ms, delivered_ms, received, disconnected = asyncio.run(runner(args))
+        rows.append([
+            name,
+            f"{sum(block_ms) / len(block_ms):.2f}",
+            f"{max(block_ms):.2f}",
+            f"{delivered_ms:.1f}",
+            received,
+            disconnected
+        ])
+
+    print(f"{args.sockets} sockets ({args.slow} slow at {args.slow_delay}s/send), {args.broadcasts} broadcasts\n")
+    print_table(
+        ["fan-out", "avg block ms", "max block ms", "fast clients done ms", "fast msgs", "slow disconnected"],
+        rows
+    )
+
+    rows = []
+    for window in [0] + args.coalesce_ms:
+        frames, sent = asyncio.run(run_taps(args, window))
+        rows.append([f"{window:g}", frames, sent])
+    print(f"\n{args.taps} health taps across {args.matches} matches in {args.duration:g}s, {args.sockets} dashboards\n")
+    print_table(["coalesce ms", "frames per dashboard", "frames sent total"], rows)
+
+
+if __name__ == "__main__":
+    main()